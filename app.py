@@ -5,7 +5,10 @@ from datetime import datetime
 
 sys.path.insert(0, os.path.dirname(__file__))
 
-from src.storage.local_db import get_health_records, get_orders, get_active_reminders
+from src.integrations.reminder_scheduler import get_reminder_scheduler
+from src.storage.local_db import (
+    get_dashboard_stats, get_recent_records, get_recent_orders, get_adherence_summary, adherence_rate, doses_today
+)
 
 st.set_page_config(
     page_title="AI Health Copilot",
@@ -64,10 +67,13 @@ with col2:
 
 st.markdown("---")
 
-# Load data
-health_records = get_health_records()
-orders = get_orders()
-reminders = get_active_reminders()
+# Fires medication reminders and records missed doses in the background
+get_reminder_scheduler()
+
+# Load data: counts are maintained on write; only the five latest records/orders are read
+stats = get_dashboard_stats()
+recent_records = get_recent_records(5)
+recent_orders = get_recent_orders(5)
 
 # Stats
 st.subheader("📊 Quick Stats")
@@ -77,7 +83,7 @@ col1, col2, col3, col4 = st.columns(4)
 with col1:
     st.markdown(f"""
     <div class="stat-card">
-        <h2 style="margin:0;">{len(health_records)}</h2>
+        <h2 style="margin:0;">{stats['health_records']}</h2>
         <p style="margin:0;">Health Records</p>
     </div>
     """, unsafe_allow_html=True)
@@ -85,7 +91,7 @@ with col1:
 with col2:
     st.markdown(f"""
     <div class="stat-card" style="background: linear-gradient(135deg, #3B82F6 0%, #2563EB 100%);">
-        <h2 style="margin:0;">{len(orders)}</h2>
+        <h2 style="margin:0;">{stats['orders']}</h2>
         <p style="margin:0;">Medicine Orders</p>
     </div>
     """, unsafe_allow_html=True)
@@ -93,20 +99,34 @@ with col2:
 with col3:
     st.markdown(f"""
     <div class="stat-card" style="background: linear-gradient(135deg, #10B981 0%, #059669 100%);">
-        <h2 style="margin:0;">{len(reminders)}</h2>
+        <h2 style="margin:0;">{stats['active_reminders']}</h2>
         <p style="margin:0;">Active Reminders</p>
     </div>
     """, unsafe_allow_html=True)
 
 with col4:
-    pending = len([o for o in orders if o.get('status') == 'pending'])
     st.markdown(f"""
     <div class="stat-card" style="background: linear-gradient(135deg, #F59E0B 0%, #D97706 100%);">
-        <h2 style="margin:0;">{pending}</h2>
+        <h2 style="margin:0;">{stats['pending_orders']}</h2>
         <p style="margin:0;">Pending Orders</p>
     </div>
     """, unsafe_allow_html=True)
 
+if stats['records_by_severity']:
+    st.caption("Health records by severity: " + ", ".join(
+        f"{severity.title()} {count}" for severity, count in sorted(stats['records_by_severity'].items())
+    ))
+
+# Medication adherence
+adherence = get_adherence_summary()
+today_doses = doses_today(adherence, datetime.now().date().isoformat())
+rate = adherence_rate(adherence)
+
+col1, col2, col3 = st.columns(3)
+col1.metric("💊 Doses Taken Today", today_doses['taken'], delta=f"-{today_doses['missed']} missed" if today_doses['missed'] else None)
+col2.metric("📈 Adherence", f"{rate:.0%}" if rate is not None else "—")
+col3.metric("🔥 Streak", adherence['current_streak'], help=f"Best: {adherence['best_streak']} doses in a row")
+
 st.markdown("---")
 
 # Quick Actions
@@ -141,9 +161,8 @@ col1, col2 = st.columns(2)
 
 with col1:
     st.subheader("📝 Recent Health Records")
-    if health_records:
-        recent = sorted(health_records, key=lambda x: x.get('timestamp', ''), reverse=True)[:5]
-        for record in recent:
+    if recent_records:
+        for record in recent_records:
             with st.expander(f"Record - {record.get('timestamp', '')[:10]}"):
                 st.write(f"**Symptoms:** {record.get('symptoms', 'N/A')}")
                 st.write(f"**Severity:** {record.get('severity', 'N/A')}")
@@ -152,8 +171,7 @@ with col1:
 
 with col2:
     st.subheader("📦 Recent Orders")
-    if orders:
-        recent_orders = sorted(orders, key=lambda x: x.get('order_date', ''), reverse=True)[:5]
+    if recent_orders:
         for order in recent_orders:
             with st.expander(f"Order #{order.get('id', 'N/A')[-6:]}"):
                 st.write(f"**Medicine:** {order.get('medicine', 'N/A')}")
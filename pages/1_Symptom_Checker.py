@@ -124,7 +124,7 @@ if st.button("🔍 Analyze Symptoms", type="primary", use_container_width=True):
             st.markdown("---")
             st.subheader("💊 Suggested OTC Medicines")
             
-            medicines = get_medicine_recommendations(analysis['otc_medicine_category'])
+            medicines = get_medicine_recommendations(analysis['otc_medicine_category'], symptoms, age)
             
             if medicines:
                 for med in medicines:
@@ -5,6 +5,7 @@ import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from src.storage.local_db import get_medicine_database
+from src.ai.medicine_search import search_medicines
 
 st.set_page_config(page_title="Medicine Guide", page_icon="💊", layout="wide")
 
@@ -33,23 +34,8 @@ selected_category = st.selectbox(
     format_func=lambda x: category_names.get(x, x.title()) if x != "All" else "All Categories"
 )
 
-# Get medicines
-medicines = []
-if selected_category == "All":
-    for category in db.values():
-        medicines.extend(category)
-else:
-    medicines = db.get(selected_category, [])
-
-# Search filter
-if search:
-    search_lower = search.lower()
-    medicines = [
-        med for med in medicines
-        if search_lower in med['name'].lower() 
-        or search_lower in med['use'].lower()
-        or any(search_lower in brand.lower() for brand in med['brands'])
-    ]
+# Get medicines (ranked, typo-tolerant search)
+medicines = search_medicines(search, None if selected_category == "All" else selected_category)
 
 st.write(f"**Showing {len(medicines)} medicines**")
 
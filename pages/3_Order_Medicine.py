@@ -1,14 +1,19 @@
 import streamlit as st
 import sys
 import os
+import uuid
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
+from src.integrations.ocr_scanner import get_prescription_scanner
 from src.mcp.pharmacy_server import pharmacy_mcp
 from src.storage.local_db import add_order, get_orders
 
 st.set_page_config(page_title="Order Medicine", page_icon="🛒", layout="wide")
 
+# Advances placed orders through their delivery stages in the background
+pharmacy_mcp.lifecycle.start_ticker()
+
 st.title("🛒 Order Medicine")
 
 # Pre-fill if coming from other page
@@ -29,8 +34,15 @@ medicine_name = st.text_input(
 
 quantity = st.number_input("Quantity", min_value=1, max_value=10, value=1)
 
+# Idempotency key for the order placed from a search: double clicks and reruns of
+# one confirmation return the same order. A new search or a placed order rotates
+# it, so ordering the same medicine again is a new order.
+if 'order_nonce' not in st.session_state:
+    st.session_state.order_nonce = uuid.uuid4().hex
+
 # Search
 if st.button("🔍 Search Pharmacies", type="primary", disabled=not medicine_name):
+    st.session_state.order_nonce = uuid.uuid4().hex
     with st.spinner("Searching..."):
         # Check prescription
         rx_check = pharmacy_mcp.check_prescription_required(medicine_name)
@@ -51,15 +63,27 @@ if st.button("🔍 Search Pharmacies", type="primary", disabled=not medicine_nam
                 st.stop()
             else:
                 st.success("✅ Prescription uploaded!")
+                
+                scan = get_prescription_scanner().scan_one(uploaded_file)
+                if scan.get('error'):
+                    st.warning(f"⚠️ {scan['error']}")
+                elif scan['medicines']:
+                    st.write("**Found on prescription:** " + ", ".join(m['name'] for m in scan['medicines']))
+                    if rx_check.get('generic') and rx_check['generic'] not in {m['generic'] for m in scan['medicines']}:
+                        st.warning(f"⚠️ {medicine_name} was not found on the prescription; the pharmacist will verify it")
+                else:
+                    st.info("ℹ️ Could not read medicine names; the pharmacist will verify the prescription")
         else:
             st.success(f"✅ {rx_check['message']}")
         
-        # Search pharmacies
-        results = pharmacy_mcp.search_medicine(medicine_name)
+        # Search pharmacies, rendering each offer as soon as it arrives
+        header = st.empty()
+        header.subheader("📍 Searching pharmacies...")
+        found = 0
         
-        st.subheader(f"📍 Found {len(results)} Pharmacies")
-        
-        for idx, result in enumerate(results):
+        for result in pharmacy_mcp.stream_search(medicine_name):
+            found += 1
+            header.subheader(f"📍 Found {found} Pharmacies")
             pharmacy = result['pharmacy']
             
             if not result['in_stock']:
@@ -69,7 +93,8 @@ if st.button("🔍 Search Pharmacies", type="primary", disabled=not medicine_nam
             
             with col1:
                 st.markdown(f"### {pharmacy['name']}")
-                st.write(f"📍 {pharmacy['location']} ({pharmacy['distance']})")
+                distance = f"{result['distance_km']:.1f} km" if result.get('distance_km') is not None else pharmacy['distance']
+                st.write(f"📍 {pharmacy['location']} ({distance})")
                 st.write(f"⭐ {pharmacy['rating']}/5")
             
             with col2:
@@ -93,8 +118,10 @@ if st.button("🔍 Search Pharmacies", type="primary", disabled=not medicine_nam
                 total = final_price * quantity + pharmacy['delivery_fee']
                 st.metric("Total", f"₹{total}")
                 
-                if st.button("🛒 Order", key=f"order_{idx}", use_container_width=True, type="primary"):
-                    order_result = pharmacy_mcp.place_order(medicine_name, pharmacy['id'], quantity)
+                if st.button("🛒 Order", key=f"order_{pharmacy['id']}", use_container_width=True, type="primary"):
+                    idempotency_key = f"{st.session_state.order_nonce}:{pharmacy['id']}"
+                    order_result = pharmacy_mcp.place_order(medicine_name, pharmacy['id'], quantity,
+                                                            idempotency_key=idempotency_key)
                     
                     order_data = {
                         'order_id': order_result['order_id'],
@@ -108,7 +135,8 @@ if st.button("🔍 Search Pharmacies", type="primary", disabled=not medicine_nam
                         'estimated_delivery': order_result['estimated_delivery']
                     }
                     
-                    add_order(order_data)
+                    add_order(order_data, idempotency_key=idempotency_key)
+                    st.session_state.order_nonce = uuid.uuid4().hex
                     
                     st.success(f"""
                     ✅ **Order Placed!**
@@ -121,28 +149,34 @@ if st.button("🔍 Search Pharmacies", type="primary", disabled=not medicine_nam
                     st.balloons()
             
             st.markdown("---")
+        
+        if not found:
+            header.subheader("📍 No pharmacies responded in time")
 
 # Track Order
 st.markdown("---")
 st.subheader("📦 Track Order")
 
-track_id = st.text_input("Order ID", placeholder="ORD12345")
+track_id = st.text_input("Order ID", placeholder="ORD_01J...")
 
 if st.button("🔍 Track", disabled=not track_id):
-    tracking = pharmacy_mcp.track_order(track_id)
-    
-    st.success(f"**Order:** {tracking['order_id']}")
-    st.write(f"**Status:** {tracking['status']}")
-    st.write(f"**Updated:** {tracking['last_updated']}")
+    tracking = pharmacy_mcp.track_order(track_id.strip())
     
-    st.markdown("---")
-    st.subheader("Timeline")
-    
-    for step in tracking['timeline']:
-        if step['completed']:
-            st.success(f"✅ {step['status']} - {step['time']}")
-        else:
-            st.info(f"⏳ {step['status']} - {step['time']}")
+    if 'error' in tracking:
+        st.error(f"❌ {tracking['error']}")
+    else:
+        st.success(f"**Order:** {tracking['order_id']}")
+        st.write(f"**Status:** {tracking['status']}")
+        st.write(f"**Updated:** {tracking['last_updated']}")
+        
+        st.markdown("---")
+        st.subheader("Timeline")
+        
+        for step in tracking['timeline']:
+            if step['completed']:
+                st.success(f"✅ {step['status']} - {step['time']}")
+            else:
+                st.info(f"⏳ {step['status']} - {step['time']}")
 
 # Recent Orders
 st.markdown("---")
@@ -5,10 +5,19 @@ from datetime import datetime
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-from src.storage.local_db import add_reminder, get_active_reminders, deactivate_reminder
+from src.integrations.reminder_scheduler import get_reminder_scheduler
+from src.storage.local_db import (
+    add_reminder, get_active_reminders, deactivate_reminder, record_dose, dose_event_id, get_dose_events_for_day,
+    get_adherence_stats, get_adherence_summary, adherence_rate, doses_today, next_dose_at,
+    settle_missed_doses
+)
+from src.storage.reminder_schedule import current_dose, format_minutes, minutes_on
 
 st.set_page_config(page_title="Reminders", page_icon="⏰", layout="wide")
 
+# Fires medication reminders and records missed doses in the background
+get_reminder_scheduler()
+
 st.title("⏰ Medication Reminders")
 
 st.info("📱 Set reminders to never miss your medication!")
@@ -64,6 +73,10 @@ st.markdown("---")
 st.subheader("📋 Active Reminders")
 
 reminders = get_active_reminders()
+settle_missed_doses(reminders)
+now = datetime.now()
+today = now.date().isoformat()
+adherence = get_adherence_stats([r['id'] for r in reminders])
 
 if not reminders:
     st.info("No reminders yet. Add one above!")
@@ -84,10 +97,23 @@ else:
                 for t in reminder.get('times', []):
                     st.success(f"• {t}")
                 st.write(f"**Duration:** {reminder.get('duration_days')} days")
+                next_dose = next_dose_at(reminder)
+                if next_dose is not None:
+                    st.write(f"**Next dose:** {datetime.fromtimestamp(next_dose).strftime('%a %I:%M %p')}")
+                stats = adherence[reminder['id']]
+                rate = adherence_rate(stats)
+                if rate is not None:
+                    st.write(f"**Adherence:** {rate:.0%} ({stats['taken']} taken, {stats['missed']} missed)")
+                    st.write(f"**Streak:** 🔥 {stats['current_streak']} (best {stats['best_streak']})")
             
             with col3:
                 if st.button("✅ Taken", key=f"taken_{reminder.get('id')}", use_container_width=True):
-                    st.success("Marked!")
+                    minutes = current_dose(reminder['schedule'], now)
+                    if minutes is None:
+                        st.info("No dose scheduled today")
+                    else:
+                        record_dose(reminder['id'], today, minutes)
+                        st.rerun()
                 
                 if st.button("🗑️ Delete", key=f"del_{reminder.get('id')}", use_container_width=True):
                     deactivate_reminder(reminder.get('id'))
@@ -97,23 +123,25 @@ else:
 st.markdown("---")
 st.subheader("📅 Today's Schedule")
 
-if reminders:
-    schedule = {}
-    for reminder in reminders:
-        for time in reminder.get('times', []):
-            if time not in schedule:
-                schedule[time] = []
-            schedule[time].append(reminder)
-    
-    for time in sorted(schedule.keys(), key=lambda x: datetime.strptime(x, "%I:%M %p")):
-        st.markdown(f"### ⏰ {time}")
-        for reminder in schedule[time]:
+taken = {e['id'] for e in get_dose_events_for_day(today) if e['status'] == 'taken'}
+schedule = {}
+for reminder in reminders:
+    for minutes in minutes_on(reminder['schedule'], now.date()):
+        schedule.setdefault(minutes, []).append(reminder)
+
+if schedule:
+    for minutes in sorted(schedule):
+        st.markdown(f"### ⏰ {format_minutes(minutes)}")
+        for reminder in schedule[minutes]:
             col1, col2 = st.columns([3, 1])
             with col1:
                 st.write(f"💊 {reminder.get('medicine')} - {reminder.get('dosage')}")
             with col2:
-                if st.button("✅ Done", key=f"done_{time}_{reminder.get('id')}"):
-                    st.success("✓")
+                if dose_event_id(reminder['id'], today, minutes) in taken:
+                    st.success("✓ Taken")
+                elif st.button("✅ Done", key=f"done_{minutes}_{reminder.get('id')}"):
+                    record_dose(reminder['id'], today, minutes)
+                    st.rerun()
 else:
     st.info("No schedule for today")
 
@@ -160,6 +188,10 @@ with st.sidebar:
     st.markdown("---")
     
     st.metric("Active", len(reminders))
+    summary = get_adherence_summary()
+    st.metric("Doses Taken Today", doses_today(summary, today)['taken'])
+    rate = adherence_rate(summary)
+    st.metric("Adherence", f"{rate:.0%}" if rate is not None else "—")
     
     st.markdown("---")
     
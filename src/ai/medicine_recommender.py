@@ -0,0 +1,151 @@
+import re
+from typing import Dict, List, Union
+
+from src.ai.symptom_analyzer import (
+    SYMPTOM_CATEGORIES, ParsedSymptoms, parse_symptoms, detect_symptom_category
+)
+from src.storage.local_db import cached_for_catalogue
+
+# Feature bit per symptom keyword
+FEATURE_KEYWORDS = sorted({kw for keywords in SYMPTOM_CATEGORIES.values() for kw in keywords})
+FEATURE_BITS = {keyword: 1 << i for i, keyword in enumerate(FEATURE_KEYWORDS)}
+
+USE_WEIGHT = 2
+CATEGORY_KEYWORD_WEIGHT = 1
+CATEGORY_MATCH_BONUS = 3
+
+# Contraindication flags
+FEVER = 1 << 0
+STOMACH_ULCER = 1 << 1
+CHILD = 1 << 2
+PREGNANCY = 1 << 3
+LIVER_DISEASE = 1 << 4
+
+# Warning text -> contraindication flag
+WARNING_RULES = [
+    (re.compile(r"\bif fever\b|fever present"), FEVER),
+    (re.compile(r"stomach ulcer|\bulcers?\b"), STOMACH_ULCER),
+    (re.compile(r"not for children|children under|under \d+ years"), CHILD),
+    (re.compile(r"pregnan"), PREGNANCY),
+    (re.compile(r"liver disease"), LIVER_DISEASE),
+]
+
+# Patient text -> condition flag (fever is also set from the temperature)
+CONDITION_RULES = [
+    (re.compile(r"\bfever\b|\bfeverish\b"), FEVER),
+    (re.compile(r"\bulcers?\b"), STOMACH_ULCER),
+    (re.compile(r"pregnan"), PREGNANCY),
+    (re.compile(r"liver disease|hepatitis|cirrhosis"), LIVER_DISEASE),
+]
+
+def feature_mask(keywords) -> int:
+    mask = 0
+    for keyword in keywords:
+        mask |= FEATURE_BITS.get(keyword, 0)
+    return mask
+
+def patient_flags(parsed: ParsedSymptoms, age: int = None) -> int:
+    """Contraindication flags that apply to this patient"""
+    flags = 0
+    if parsed.temperature and parsed.temperature >= 100.4:
+        flags |= FEVER
+    for pattern, flag in CONDITION_RULES:
+        if pattern.search(parsed.text):
+            flags |= flag
+    if age is not None and age < 12:
+        flags |= CHILD
+    return flags
+
+class MedicineRecommender:
+    """Ranks catalogue medicines against parsed symptoms using precomputed bitsets.
+
+    Each medicine gets a keyword mask for its category, a keyword mask for
+    its "use" text and a contraindication mask from its warnings, so a
+    request is a handful of integer ANDs and popcounts per candidate.
+    """
+
+    def __init__(self, catalogue: Dict[str, List[Dict]]):
+        self.medicines = []
+        self.category_masks = []
+        self.use_masks = []
+        self.contraindications = []
+        self.categories = []
+        self.by_feature: Dict[int, List[int]] = {}
+        self.by_category: Dict[str, List[int]] = {}
+
+        for category, medicines in catalogue.items():
+            category_mask = feature_mask(SYMPTOM_CATEGORIES.get(category, []))
+            for med in medicines:
+                idx = len(self.medicines)
+                use_text = med.get("use", "").lower()
+                use_mask = feature_mask(kw for kw in FEATURE_KEYWORDS if kw in use_text)
+                warnings = " ".join(med.get("warnings", [])).lower()
+                contraindications = 0
+                for pattern, flag in WARNING_RULES:
+                    if pattern.search(warnings):
+                        contraindications |= flag
+
+                self.medicines.append(med)
+                self.categories.append(category)
+                self.category_masks.append(category_mask)
+                self.use_masks.append(use_mask)
+                self.contraindications.append(contraindications)
+                self.by_category.setdefault(category, []).append(idx)
+                mask = category_mask | use_mask
+                while mask:
+                    bit = mask & -mask
+                    self.by_feature.setdefault(bit, []).append(idx)
+                    mask ^= bit
+
+    def recommend(self, symptoms: Union[str, ParsedSymptoms], age: int = None,
+                  category: str = None, limit: int = None,
+                  include_contraindicated: bool = False, only_category: bool = False) -> List[Dict]:
+        """Ranked {"medicine", "category", "score", "contraindicated", "warnings"} dicts.
+
+        With only_category, candidates come from `category` alone and the
+        symptom keywords only decide their order.
+        """
+        parsed = parse_symptoms(symptoms)
+        if category is None:
+            category = detect_symptom_category(parsed)
+        query = feature_mask(parsed.hits)
+        flags = patient_flags(parsed, age)
+
+        # Candidates: medicines sharing a symptom keyword or in the detected category
+        candidates = set(self.by_category.get(category, []))
+        mask = 0 if only_category else query
+        while mask:
+            bit = mask & -mask
+            candidates.update(self.by_feature.get(bit, []))
+            mask ^= bit
+
+        results = []
+        for idx in candidates:
+            conflict = self.contraindications[idx] & flags
+            if conflict and not include_contraindicated:
+                continue
+            score = (USE_WEIGHT * (self.use_masks[idx] & query).bit_count()
+                     + CATEGORY_KEYWORD_WEIGHT * (self.category_masks[idx] & query).bit_count())
+            if self.categories[idx] == category:
+                score += CATEGORY_MATCH_BONUS
+            results.append((score, idx, conflict))
+
+        results.sort(key=lambda item: (-item[0], item[1]))
+        return [
+            {
+                "medicine": self.medicines[idx],
+                "category": self.categories[idx],
+                "score": score,
+                "contraindicated": bool(conflict),
+                "warnings": self.medicines[idx].get("warnings", []) if conflict else []
+            }
+            for score, idx, conflict in results[:limit]
+        ]
+
+get_recommender = cached_for_catalogue(MedicineRecommender)
+
+def recommend_medicines(symptoms: Union[str, ParsedSymptoms], age: int = None,
+                        category: str = None, limit: int = None, only_category: bool = False) -> List[Dict]:
+    """Medicines suited to the symptoms, with contraindicated ones left out"""
+    return [r["medicine"] for r in get_recommender().recommend(symptoms, age, category, limit,
+                                                               only_category=only_category)]
@@ -0,0 +1,155 @@
+import bisect
+import re
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+from src.storage.local_db import cached_for_catalogue
+
+# Field weights: a hit on the name or a brand outranks a hit in "use"
+FIELD_WEIGHTS = {"name": 3.0, "brands": 3.0, "generic": 2.0, "use": 1.0}
+EXACT_BONUS = 1.0
+PREFIX_FACTOR = 0.8
+SUBSTRING_FACTOR = 0.6
+FUZZY_FACTOR = 0.5
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+def _trigrams(token: str, padded: bool = True) -> set:
+    if padded:
+        token = f"${token}$"
+    return {token[i:i + 3] for i in range(len(token) - 2)}
+
+def max_typos(token: str) -> int:
+    """Allowed edit distance for a query token"""
+    if len(token) < 4:
+        return 0
+    return 1 if len(token) < 8 else 2
+
+def bounded_edit_distance(a: str, b: str, limit: int) -> int:
+    """Levenshtein distance, giving up (returning limit + 1) once it exceeds limit"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char_a != char_b)
+            ))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+class MedicineSearchIndex:
+    """Token and trigram inverted index over the medicine catalogue"""
+
+    def __init__(self, catalogue: Dict[str, List[Dict]]):
+        self.medicines: List[Tuple[str, Dict]] = []
+        self.postings: Dict[str, Dict[int, float]] = defaultdict(dict)
+        self.gram_index: Dict[str, set] = defaultdict(set)
+        self._expansions: Dict[str, List[Tuple[str, float]]] = {}
+
+        for category, medicines in catalogue.items():
+            for med in medicines:
+                doc_id = len(self.medicines)
+                self.medicines.append((category, med))
+                fields = {
+                    "name": med.get("name", ""),
+                    "generic": med.get("generic", ""),
+                    "brands": " ".join(med.get("brands", [])),
+                    "use": med.get("use", ""),
+                }
+                for field, text in fields.items():
+                    for token in tokenize(text):
+                        weight = FIELD_WEIGHTS[field]
+                        if self.postings[token].get(doc_id, 0) < weight:
+                            self.postings[token][doc_id] = weight
+
+        self.vocabulary = sorted(self.postings)
+        for token in self.vocabulary:
+            for gram in _trigrams(token):
+                self.gram_index[gram].add(token)
+
+    def _expand(self, query_token: str) -> List[Tuple[str, float]]:
+        """Vocabulary tokens matching a query token, with a match-quality factor"""
+        if query_token in self._expansions:
+            return self._expansions[query_token]
+
+        matches = {}
+        if query_token in self.postings:
+            matches[query_token] = 1.0 + EXACT_BONUS
+
+        if len(query_token) >= 3:
+            # Prefix / substring: every unpadded trigram of the query must occur
+            grams = _trigrams(query_token, padded=False)
+            candidates = set.intersection(*(self.gram_index.get(g, set()) for g in grams))
+            for token in candidates:
+                if token == query_token:
+                    continue
+                if token.startswith(query_token):
+                    matches[token] = max(matches.get(token, 0), PREFIX_FACTOR)
+                elif query_token in token:
+                    matches[token] = max(matches.get(token, 0), SUBSTRING_FACTOR)
+        else:
+            start = bisect.bisect_right(self.vocabulary, query_token)
+            for token in self.vocabulary[start:]:
+                if not token.startswith(query_token):
+                    break
+                matches[token] = PREFIX_FACTOR
+
+        # Typos: one edit changes at most three padded trigrams
+        limit = max_typos(query_token)
+        if limit:
+            grams = _trigrams(query_token)
+            shared = defaultdict(int)
+            for gram in grams:
+                for token in self.gram_index.get(gram, ()):
+                    shared[token] += 1
+            needed = max(1, len(grams) - 3 * limit)
+            for token, count in shared.items():
+                if count < needed or token in matches:
+                    continue
+                distance = bounded_edit_distance(query_token, token, limit)
+                if distance <= limit:
+                    matches[token] = FUZZY_FACTOR / distance
+
+        expansion = list(matches.items())
+        if len(self._expansions) > 4096:
+            self._expansions.clear()
+        self._expansions[query_token] = expansion
+        return expansion
+
+    def search(self, query: str, category: str = None, limit: int = None) -> List[Dict]:
+        """Medicines ranked by relevance; all medicines in catalogue order for an empty query"""
+        query_tokens = tokenize(query or "")
+        if not query_tokens:
+            return [med for cat, med in self.medicines if category is None or cat == category][:limit]
+
+        scores = defaultdict(float)
+        matched_terms = defaultdict(int)
+        for query_token in query_tokens:
+            best = {}
+            for token, factor in self._expand(query_token):
+                for doc_id, weight in self.postings[token].items():
+                    best[doc_id] = max(best.get(doc_id, 0), weight * factor)
+            for doc_id, score in best.items():
+                scores[doc_id] += score
+                matched_terms[doc_id] += 1
+
+        ranked = sorted(
+            (doc_id for doc_id in scores
+             if category is None or self.medicines[doc_id][0] == category),
+            key=lambda doc_id: (-matched_terms[doc_id], -scores[doc_id], doc_id)
+        )
+        return [self.medicines[doc_id][1] for doc_id in ranked[:limit]]
+
+get_medicine_search_index = cached_for_catalogue(MedicineSearchIndex)
+
+def search_medicines(query: str, category: str = None, limit: int = None) -> List[Dict]:
+    return get_medicine_search_index().search(query, category, limit)
@@ -1,7 +1,16 @@
 import os
 from dotenv import load_dotenv
+import asyncio
 import json
 import re
+import sqlite3
+import time
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Iterable, Iterator, NamedTuple, Optional, Tuple, Union
+
+from src.ai.response_cache import ResponseCache, prompt_version
 
 load_dotenv()
 
@@ -32,21 +41,113 @@ EMERGENCY_KEYWORDS = [
     "severe burn", "choking", "poisoning", "overdose"
 ]
 
+# Severity indicators, most severe first
+SEVERITY_KEYWORDS = [
+    ("severe", ["unbearable", "worst", "extreme", "excruciating", "10/10", "9/10",
+                "severe", "bad", "intense", "terrible", "7/10", "8/10"]),
+    ("moderate", ["moderate", "painful", "5/10", "6/10"]),
+]
+
+# "severe" combined with one of these is treated as an emergency
+SEVERE_PAIN_KEYWORDS = ["pain", "bleeding", "headache"]
+EXTREME_PAIN_KEYWORDS = ["10/10", "9/10", "unbearable", "worst"]
+
+# Keywords for each category
+SYMPTOM_CATEGORIES = {
+    "pain_fever": ["headache", "head pain", "fever", "temperature", "body pain", 
+                   "body ache", "muscle pain", "joint pain", "back pain", "migraine"],
+    "cold_cough": ["cold", "cough", "sneeze", "runny nose", "stuffy nose", 
+                  "sore throat", "throat pain", "congestion", "phlegm"],
+    "acidity": ["acidity", "heartburn", "acid reflux", "burning chest", 
+               "sour taste", "indigestion", "bloating", "gas"],
+    "digestive": ["diarrhea", "loose motion", "stomach pain", "stomach ache",
+                 "nausea", "vomiting", "constipation", "cramping"],
+    "skin": ["rash", "itching", "skin rash", "allergy", "hives", 
+            "red spots", "swelling", "skin irritation"]
+}
+
+def _trie_pattern(words) -> str:
+    """Build a regex alternation factored by common prefixes"""
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node) -> str:
+        alternatives = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not alternatives:
+            return ""
+        if len(alternatives) == 1 and "" not in node:
+            return alternatives[0]
+        group = "(?:" + "|".join(alternatives) + ")"
+        return group + "?" if "" in node else group
+
+    return build(trie)
+
+def _build_keyword_matcher():
+    """Compile every keyword table into one matcher, once at import time"""
+    keywords = set(EMERGENCY_KEYWORDS + SEVERE_PAIN_KEYWORDS + EXTREME_PAIN_KEYWORDS)
+    for _, words in SEVERITY_KEYWORDS:
+        keywords.update(words)
+    for words in SYMPTOM_CATEGORIES.values():
+        keywords.update(words)
+    
+    # The lookahead reports the longest keyword starting at every position.
+    # Shorter keywords starting there are substrings of it, so each hit
+    # expands to all keywords it contains.
+    pattern = re.compile("(?=(" + _trie_pattern(keywords) + "))")
+    contains = {
+        keyword: frozenset(other for other in keywords if other in keyword)
+        for keyword in keywords
+    }
+    return pattern, contains
+
+_KEYWORD_PATTERN, _KEYWORD_CONTAINS = _build_keyword_matcher()
+
+# Patterns to match temperature, tried in order
+TEMPERATURE_PATTERNS = [
+    re.compile(r'(\d+\.?\d*)\s*°?f'),  # 100F, 100°F, 100.5F
+    re.compile(r'(\d+\.?\d*)\s*degree'),  # 100 degree
+    re.compile(r'temperature\s+(?:is\s+)?(\d+\.?\d*)'),  # temperature is 100
+    re.compile(r'fever\s+(?:of\s+)?(\d+\.?\d*)'),  # fever of 100
+    re.compile(r'(?:above|over|more than)\s+(\d+\.?\d*)'),  # above 100
+]
+
+class ParsedSymptoms(NamedTuple):
+    """Symptom text parsed once and shared by every analysis helper"""
+    text: str
+    temperature: float
+    hits: frozenset
+
+def normalize_symptoms(symptoms: str) -> str:
+    """Lowercase and collapse whitespace"""
+    return " ".join(symptoms.lower().split())
+
+def match_keywords(text: str) -> frozenset:
+    """Find every emergency, severity and category keyword in one pass"""
+    hits = set()
+    for keyword in set(_KEYWORD_PATTERN.findall(text.lower())):
+        hits.update(_KEYWORD_CONTAINS[keyword])
+    return frozenset(hits)
+
+@lru_cache(maxsize=1024)
+def _parse_normalized(text: str) -> ParsedSymptoms:
+    return ParsedSymptoms(text, extract_temperature(text), match_keywords(text))
+
+def parse_symptoms(symptoms: Union[str, ParsedSymptoms]) -> ParsedSymptoms:
+    """Parse symptom text, reusing the result for repeated inputs"""
+    if isinstance(symptoms, ParsedSymptoms):
+        return symptoms
+    return _parse_normalized(normalize_symptoms(symptoms))
+
 def extract_temperature(text: str) -> float:
     """Extract temperature from text"""
     text_lower = text.lower()
     
-    # Patterns to match temperature
-    patterns = [
-        r'(\d+\.?\d*)\s*°?f',  # 100F, 100°F, 100.5F
-        r'(\d+\.?\d*)\s*degree',  # 100 degree
-        r'temperature\s+(?:is\s+)?(\d+\.?\d*)',  # temperature is 100
-        r'fever\s+(?:of\s+)?(\d+\.?\d*)',  # fever of 100
-        r'(?:above|over|more than)\s+(\d+\.?\d*)',  # above 100
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, text_lower)
+    for pattern in TEMPERATURE_PATTERNS:
+        match = pattern.search(text_lower)
         if match:
             try:
                 temp = float(match.group(1))
@@ -97,82 +198,65 @@ def assess_fever_severity(temperature: float) -> dict:
             "reason": "Temperature is normal or slightly elevated"
         }
 
-def detect_severity_indicators(text: str) -> str:
+def detect_severity_indicators(text: Union[str, ParsedSymptoms]) -> str:
     """Detect severity from text indicators"""
-    text_lower = text.lower()
+    hits = parse_symptoms(text).hits
     
     # Check for severity keywords
-    if any(word in text_lower for word in ["unbearable", "worst", "extreme", "excruciating", "10/10", "9/10"]):
-        return "severe"
-    elif any(word in text_lower for word in ["severe", "bad", "intense", "terrible", "7/10", "8/10"]):
-        return "severe"
-    elif any(word in text_lower for word in ["moderate", "painful", "5/10", "6/10"]):
-        return "moderate"
-    else:
-        return "mild"
+    for severity, keywords in SEVERITY_KEYWORDS:
+        if hits.intersection(keywords):
+            return severity
+    return "mild"
 
-def check_emergency(symptoms: str) -> bool:
+def check_emergency(symptoms: Union[str, ParsedSymptoms]) -> bool:
     """Enhanced emergency detection with temperature checking"""
-    symptoms_lower = symptoms.lower()
+    parsed = parse_symptoms(symptoms)
+    hits = parsed.hits
     
     # Check temperature first
-    temp = extract_temperature(symptoms)
+    temp = parsed.temperature
     if temp and temp >= 105:
         return True
     
     # Check for emergency keywords
-    for keyword in EMERGENCY_KEYWORDS:
-        if keyword in symptoms_lower:
-            return True
+    if hits.intersection(EMERGENCY_KEYWORDS):
+        return True
     
     # Check for severe pain indicators
-    if "severe" in symptoms_lower and any(word in symptoms_lower for word in ["pain", "bleeding", "headache"]):
+    if "severe" in hits and hits.intersection(SEVERE_PAIN_KEYWORDS):
         return True
     
     # Check for numeric severity
-    if any(word in symptoms_lower for word in ["10/10", "9/10", "unbearable", "worst"]):
+    if hits.intersection(EXTREME_PAIN_KEYWORDS):
         return True
     
     return False
 
-def detect_symptom_category(symptoms: str) -> str:
+def detect_symptom_category(symptoms: Union[str, ParsedSymptoms]) -> str:
     """Detect symptom category"""
-    symptoms_lower = symptoms.lower()
+    parsed = parse_symptoms(symptoms)
+    hits = parsed.hits
     
     # Fever category if temperature mentioned
-    temp = extract_temperature(symptoms)
+    temp = parsed.temperature
     if temp:
         return "pain_fever"
     
-    # Keywords for each category
-    categories = {
-        "pain_fever": ["headache", "head pain", "fever", "temperature", "body pain", 
-                       "body ache", "muscle pain", "joint pain", "back pain", "migraine"],
-        "cold_cough": ["cold", "cough", "sneeze", "runny nose", "stuffy nose", 
-                      "sore throat", "throat pain", "congestion", "phlegm"],
-        "acidity": ["acidity", "heartburn", "acid reflux", "burning chest", 
-                   "sour taste", "indigestion", "bloating", "gas"],
-        "digestive": ["diarrhea", "loose motion", "stomach pain", "stomach ache",
-                     "nausea", "vomiting", "constipation", "cramping"],
-        "skin": ["rash", "itching", "skin rash", "allergy", "hives", 
-                "red spots", "swelling", "skin irritation"]
-    }
-    
     # Count matches
     scores = {}
-    for category, keywords in categories.items():
-        score = sum(1 for keyword in keywords if keyword in symptoms_lower)
+    for category, keywords in SYMPTOM_CATEGORIES.items():
+        score = len(hits.intersection(keywords))
         if score > 0:
             scores[category] = score
     
     return max(scores, key=scores.get) if scores else None
 
-def get_enhanced_analysis(symptoms: str, age: int = None) -> dict:
+def get_enhanced_analysis(symptoms: Union[str, ParsedSymptoms], age: int = None) -> dict:
     """Enhanced fallback analysis with temperature awareness"""
-    symptoms_lower = symptoms.lower()
+    parsed = parse_symptoms(symptoms)
     
     # Extract temperature
-    temp = extract_temperature(symptoms)
+    temp = parsed.temperature
     
     # Assess fever severity if temperature found
     fever_assessment = None
@@ -208,7 +292,7 @@ def get_enhanced_analysis(symptoms: str, age: int = None) -> dict:
             }
     
     # Detect general severity
-    severity_from_text = detect_severity_indicators(symptoms)
+    severity_from_text = detect_severity_indicators(parsed)
     
     # Determine final severity (use worse of the two)
     if fever_assessment:
@@ -222,7 +306,7 @@ def get_enhanced_analysis(symptoms: str, age: int = None) -> dict:
         final_severity = severity_from_text
     
     # Detect category
-    category = detect_symptom_category(symptoms)
+    category = detect_symptom_category(parsed)
     
     # Build response based on category
     if category == "pain_fever":
@@ -439,43 +523,40 @@ def get_enhanced_analysis(symptoms: str, age: int = None) -> dict:
         "disclaimer": "⚠️ This is NOT a medical diagnosis."
     }
 
-def analyze_symptoms(symptoms: str, age: int = None, gender: str = None) -> dict:
-    """Main analysis function with enhanced temperature detection"""
+def get_emergency_analysis(symptoms: Union[str, ParsedSymptoms]) -> dict:
+    """Emergency response for symptoms flagged by check_emergency"""
+    parsed = parse_symptoms(symptoms)
+    temp = parsed.temperature
+    temp_msg = f" (Temperature: {temp}°F)" if temp and temp >= 105 else ""
     
-    # Emergency check
-    if check_emergency(symptoms):
-        temp = extract_temperature(symptoms)
-        temp_msg = f" (Temperature: {temp}°F)" if temp and temp >= 105 else ""
-        
-        return {
-            "emergency": True,
-            "severity": "EMERGENCY",
-            "temperature": temp,
-            "message": f"⚠️ MEDICAL EMERGENCY DETECTED{temp_msg}",
-            "action": "Call emergency services (911/108) immediately or go to nearest ER",
-            "possible_conditions": [],
-            "recommendations": [
-                "🚨 DO NOT DELAY - This is a medical emergency",
-                "Call 911/108 NOW",
-                "Go to nearest emergency room immediately",
-                "If unable to transport, call ambulance"
-            ],
-            "disclaimer": "🚨 MEDICAL EMERGENCY - Professional help required immediately."
-        }
+    return {
+        "emergency": True,
+        "severity": "EMERGENCY",
+        "temperature": temp,
+        "message": f"⚠️ MEDICAL EMERGENCY DETECTED{temp_msg}",
+        "action": "Call emergency services (911/108) immediately or go to nearest ER",
+        "possible_conditions": [],
+        "recommendations": [
+            "🚨 DO NOT DELAY - This is a medical emergency",
+            "Call 911/108 NOW",
+            "Go to nearest emergency room immediately",
+            "If unable to transport, call ambulance"
+        ],
+        "disclaimer": "🚨 MEDICAL EMERGENCY - Professional help required immediately."
+    }
+
+def build_analysis_prompt(symptoms: str, parsed: ParsedSymptoms, age: int = None, gender: str = None) -> str:
+    """Build the Gemini prompt for a symptom analysis"""
+    temp = parsed.temperature
+    temp_context = f"IMPORTANT: Patient reports temperature of {temp}°F. " if temp else ""
     
-    # Try AI first
-    if GEMINI_AVAILABLE:
-        try:
-            temp = extract_temperature(symptoms)
-            temp_context = f"IMPORTANT: Patient reports temperature of {temp}°F. " if temp else ""
-            
-            context = temp_context
-            if age:
-                context += f"Patient age: {age} years. "
-            if gender:
-                context += f"Gender: {gender}. "
-            
-            prompt = f"""You are a medical AI assistant. Analyze these symptoms carefully.
+    context = temp_context
+    if age:
+        context += f"Patient age: {age} years. "
+    if gender:
+        context += f"Gender: {gender}. "
+    
+    return f"""You are a medical AI assistant. Analyze these symptoms carefully.
 
 {context}
 Symptoms: {symptoms}
@@ -501,27 +582,101 @@ Provide analysis in EXACT JSON format (no markdown, just pure JSON):
   "otc_medicine_category": "pain_fever" | "cold_cough" | "acidity" | "digestive" | null
 }}"""
 
+def parse_model_response(text: str, parsed: ParsedSymptoms) -> Optional[dict]:
+    """Extract the JSON analysis from a model reply and apply temperature overrides"""
+    text = text.strip()
+    text = text.replace('```json', '').replace('```', '').strip()
+    
+    json_start = text.find('{')
+    json_end = text.rfind('}') + 1
+    
+    if json_start < 0 or json_end <= json_start:
+        return None
+    
+    analysis = json.loads(text[json_start:json_end])
+    
+    # Override severity if high temperature detected
+    temp = parsed.temperature
+    if temp:
+        fever_check = assess_fever_severity(temp)
+        if fever_check["severity"] == "severe" and analysis.get("severity") == "mild":
+            analysis["severity"] = "severe"
+        analysis["temperature"] = temp
+        analysis["temperature_status"] = fever_check["message"]
+    
+    analysis['disclaimer'] = "⚠️ This is NOT a medical diagnosis. Consult a doctor for proper medical advice."
+    return analysis
+
+# Changes whenever the prompt template changes, invalidating cached replies
+PROMPT_VERSION = prompt_version(
+    build_analysis_prompt("", ParsedSymptoms("", 100.0, frozenset()), 1, "-")
+)
+
+_response_cache = None
+
+def get_response_cache() -> ResponseCache:
+    """Shared on-disk cache of model replies, opened on first use"""
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = ResponseCache()
+    return _response_cache
+
+def _response_cache_key(parsed: ParsedSymptoms, age: int = None, gender: str = None) -> str:
+    return ResponseCache.make_key(parsed.text, age, gender, PROMPT_VERSION)
+
+# Cache failures (locked or corrupt database file) are logged and treated as
+# misses, so they never stand between the user and the model
+def _open_response_cache() -> Optional[ResponseCache]:
+    try:
+        return get_response_cache()
+    except (sqlite3.Error, OSError) as e:
+        print(f"⚠️ Response cache unavailable: {e}")
+        return None
+
+def _cache_get(cache: Optional[ResponseCache], key: str) -> Optional[str]:
+    if cache is None:
+        return None
+    try:
+        return cache.get(key)
+    except (sqlite3.Error, OSError) as e:
+        print(f"⚠️ Response cache read failed: {e}")
+        return None
+
+def _cache_put(cache: Optional[ResponseCache], key: str, text: str):
+    if cache is None:
+        return
+    try:
+        cache.put(key, text)
+    except (sqlite3.Error, OSError) as e:
+        print(f"⚠️ Response cache write failed: {e}")
+
+def analyze_symptoms(symptoms: str, age: int = None, gender: str = None) -> dict:
+    """Main analysis function with enhanced temperature detection"""
+    parsed = parse_symptoms(symptoms)
+    
+    # Emergency check
+    if check_emergency(parsed):
+        return get_emergency_analysis(parsed)
+    
+    # Try AI first
+    if GEMINI_AVAILABLE:
+        cache = _open_response_cache()
+        cache_key = _response_cache_key(parsed, age, gender)
+        
+        # Cached replies still go through parse_model_response,
+        # so the temperature override always runs
+        cached = _cache_get(cache, cache_key)
+        if cached is not None:
+            analysis = parse_model_response(cached, parsed)
+            if analysis:
+                return analysis
+        
+        try:
+            prompt = build_analysis_prompt(symptoms, parsed, age, gender)
             response = model.generate_content(prompt)
-            text = response.text.strip()
-            text = text.replace('```json', '').replace('```', '').strip()
-            
-            json_start = text.find('{')
-            json_end = text.rfind('}') + 1
-            
-            if json_start >= 0 and json_end > json_start:
-                json_text = text[json_start:json_end]
-                analysis = json.loads(json_text)
-                
-                # Override severity if high temperature detected
-                temp = extract_temperature(symptoms)
-                if temp:
-                    fever_check = assess_fever_severity(temp)
-                    if fever_check["severity"] == "severe" and analysis.get("severity") == "mild":
-                        analysis["severity"] = "severe"
-                    analysis["temperature"] = temp
-                    analysis["temperature_status"] = fever_check["message"]
-                
-                analysis['disclaimer'] = "⚠️ This is NOT a medical diagnosis. Consult a doctor for proper medical advice."
+            analysis = parse_model_response(response.text, parsed)
+            if analysis:
+                _cache_put(cache, cache_key, response.text)
                 print("✅ AI analysis successful")
                 return analysis
                 
@@ -529,10 +684,132 @@ Provide analysis in EXACT JSON format (no markdown, just pure JSON):
             print(f"⚠️ AI error: {e}, using enhanced fallback")
     
     # Use enhanced fallback
-    return get_enhanced_analysis(symptoms, age)
+    return get_enhanced_analysis(parsed, age)
+
+# Cap on concurrent model calls made by analyze_symptoms_async
+MAX_CONCURRENT_MODEL_CALLS = 4
+MODEL_TIMEOUT_SECONDS = 8.0
+
+_model_semaphores = weakref.WeakKeyDictionary()
+
+def _get_model_semaphore() -> asyncio.Semaphore:
+    """One semaphore per event loop, so Streamlit reruns on fresh loops stay safe"""
+    loop = asyncio.get_running_loop()
+    semaphore = _model_semaphores.get(loop)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_MODEL_CALLS)
+        _model_semaphores[loop] = semaphore
+    return semaphore
+
+def _release_when_done(semaphore: asyncio.Semaphore, call: asyncio.Future):
+    def done(call: asyncio.Future):
+        semaphore.release()
+        if not call.cancelled():
+            call.exception()  # a late failure is expected, not an unretrieved error
+    call.add_done_callback(done)
+
+async def _generate_content(ai_model, prompt: str, semaphore: asyncio.Semaphore) -> str:
+    await semaphore.acquire()
+    if hasattr(ai_model, "generate_content_async"):
+        try:
+            response = await ai_model.generate_content_async(prompt)
+        finally:
+            semaphore.release()
+    else:
+        # A timed-out await cannot stop the worker thread, so its slot is held
+        # until the thread returns rather than until the caller gives up
+        call = asyncio.ensure_future(asyncio.to_thread(ai_model.generate_content, prompt))
+        _release_when_done(semaphore, call)
+        response = await asyncio.shield(call)
+    return response.text
 
-def get_medicine_recommendations(symptom_category: str) -> list:
-    """Get medicine recommendations"""
+async def analyze_symptoms_async(symptoms: str, age: int = None, gender: str = None,
+                                 ai_model=None, timeout: float = MODEL_TIMEOUT_SECONDS,
+                                 semaphore: asyncio.Semaphore = None,
+                                 cache: ResponseCache = None) -> dict:
+    """Async analysis that races the model against the rule-based fallback.
+    
+    The rule-based analysis is computed while the model call is in flight.
+    If the model errors, returns unparseable output or misses the deadline,
+    the rule-based answer is returned. ai_model defaults to the configured
+    Gemini model; any object with generate_content(prompt) (or an async
+    generate_content_async) returning an object with .text will do.
+    Replies are cached in `cache`, which defaults to the shared response
+    cache when the configured Gemini model is used.
+    """
+    parsed = parse_symptoms(symptoms)
+    
+    # Emergency check
+    if check_emergency(parsed):
+        return get_emergency_analysis(parsed)
+    
+    if ai_model is None:
+        if not GEMINI_AVAILABLE:
+            return get_enhanced_analysis(parsed, age)
+        ai_model = model
+        cache = cache or _open_response_cache()
+    
+    cache_key = _response_cache_key(parsed, age, gender)
+    cached = _cache_get(cache, cache_key)
+    if cached is not None:
+        analysis = parse_model_response(cached, parsed)
+        if analysis:
+            return analysis
+    
+    prompt = build_analysis_prompt(symptoms, parsed, age, gender)
+    model_task = asyncio.create_task(
+        _generate_content(ai_model, prompt, semaphore or _get_model_semaphore())
+    )
+    fallback_task = asyncio.create_task(asyncio.to_thread(get_enhanced_analysis, parsed, age))
+    
+    try:
+        text = await asyncio.wait_for(model_task, timeout)
+        analysis = parse_model_response(text, parsed)
+        if analysis:
+            _cache_put(cache, cache_key, text)
+            fallback_task.cancel()
+            return analysis
+    except asyncio.TimeoutError:
+        print(f"⚠️ AI timed out after {timeout}s, using enhanced fallback")
+    except Exception as e:
+        print(f"⚠️ AI error: {e}, using enhanced fallback")
+    
+    return await fallback_task
+
+def get_medicine_recommendations(symptom_category: str, symptoms: str = None, age: int = None) -> list:
+    """Medicines for the category, ranked by the symptoms and screened for contraindications when given"""
+    if symptoms:
+        from src.ai.medicine_recommender import recommend_medicines
+        return recommend_medicines(symptoms, age, category=symptom_category, only_category=True)
     from src.storage.local_db import get_medicine_database
     db = get_medicine_database()
-    return db.get(symptom_category, [])
\ No newline at end of file
+    return db.get(symptom_category, [])
+
+def _analyze_batch_item(item: Tuple[str, Optional[int], Optional[str]]) -> dict:
+    """Rule-based analysis of one batch item, timed inside the worker"""
+    symptoms, age, gender = item
+    start = time.perf_counter()
+    parsed = parse_symptoms(symptoms)
+    if check_emergency(parsed):
+        analysis = get_emergency_analysis(parsed)
+    else:
+        analysis = get_enhanced_analysis(parsed, age)
+    return {
+        "analysis": analysis,
+        "latency_ms": (time.perf_counter() - start) * 1000
+    }
+
+def analyze_symptoms_batch(items: Iterable[Tuple[str, Optional[int], Optional[str]]],
+                           max_workers: int = None, chunksize: int = 32) -> Iterator[dict]:
+    """Analyze many (symptoms, age, gender) tuples across a process pool.
+    
+    Uses the rule-based path only (emergency check, then get_enhanced_analysis).
+    Results are yielded in input order as soon as each one is ready, each as
+    {"index", "analysis", "latency_ms"} where latency_ms is the time spent
+    analyzing that item in its worker.
+    """
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        results = executor.map(_analyze_batch_item, items, chunksize=chunksize)
+        for index, result in enumerate(results):
+            result["index"] = index
+            yield result
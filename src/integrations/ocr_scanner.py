@@ -0,0 +1,190 @@
+"""Prescription OCR: decode → downscale → binarize → OCR → medicine names.
+
+Uploads are streamed to disk and hashed (see uploads.py), then decoded one
+page at a time; each page is preprocessed and OCR'd before the next one is
+decoded, so a worker holds a single page. Uploads run in a thread pool
+(Pillow decoding and Tesseract both work outside the GIL). The page count
+and text are cached by the SHA-256 of the upload, so re-uploading the same
+file costs nothing.
+
+OCR_ENGINE=tesseract uses pytesseract when it is installed; the default
+`stub` engine runs offline and returns text embedded in the image metadata.
+"""
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, Dict, List, Union
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from src.integrations.uploads import MAX_PAGE_SIDE, StoredUpload, iter_pages, save_upload
+from src.mcp.drug_schedule import get_drug_schedule_index, normalize_drug_name
+
+MAX_IMAGE_SIDE = MAX_PAGE_SIDE
+BINARIZE_THRESHOLD = 160
+DEFAULT_MAX_WORKERS = 4
+CACHE_ENTRIES = 64
+MAX_NAME_WORDS = 3
+
+Upload = Union[bytes, BinaryIO]
+
+def preprocess_image(image: Image.Image, max_side: int = MAX_IMAGE_SIDE,
+                     threshold: int = BINARIZE_THRESHOLD) -> Image.Image:
+    """Upright grayscale copy no larger than max_side, thresholded to black and white"""
+    gray = ImageOps.exif_transpose(image).convert("L")
+    gray.thumbnail((max_side, max_side))
+    return gray.point([255 if v >= threshold else 0 for v in range(256)], "1")
+
+# OCR engines: anything with recognize(image) -> str
+class StubOCREngine:
+    """Offline engine for development: returns text stored in the image metadata (e.g. a PNG tEXt chunk)"""
+
+    TEXT_KEYS = ("prescription", "Description", "Comment", "comment")
+
+    def recognize(self, image: Image.Image) -> str:
+        for key in self.TEXT_KEYS:
+            value = image.info.get(key)
+            if value:
+                return value.decode("utf-8", "ignore") if isinstance(value, bytes) else str(value)
+        return ""
+
+class TesseractOCREngine:
+    def __init__(self, lang: str = "eng", config: str = "--psm 6"):
+        import pytesseract
+        self.pytesseract = pytesseract
+        self.lang = lang
+        self.config = config
+
+    def recognize(self, image: Image.Image) -> str:
+        return self.pytesseract.image_to_string(image, lang=self.lang, config=self.config)
+
+def get_ocr_engine(name: str = None):
+    name = (name or os.getenv("OCR_ENGINE", "stub")).lower()
+    if name == "tesseract":
+        try:
+            return TesseractOCREngine()
+        except ImportError:
+            print("⚠️ pytesseract not installed, using the stub OCR engine")
+    return StubOCREngine()
+
+def extract_medicine_names(text: str) -> List[Dict]:
+    """Medicines from the schedule/catalogue index mentioned in OCR text, in order of appearance"""
+    index = get_drug_schedule_index()
+    found = {}
+    for line in text.splitlines():
+        words = line.split()
+        i = 0
+        while i < len(words):
+            # Longest multi-word name first ('MS Contin'), then a single (possibly misspelled) word
+            for n in range(min(MAX_NAME_WORDS, len(words) - i), 0, -1):
+                phrase = " ".join(words[i:i + n])
+                drug = index.exact.get(normalize_drug_name(phrase)) if n > 1 else index.lookup(phrase)
+                if drug is not None:
+                    break
+            if drug is not None and drug.get("generic"):
+                key = drug["generic"]
+                if key not in found:
+                    found[key] = {
+                        "name": phrase,
+                        "generic": drug["generic"],
+                        "schedule": drug["schedule"],
+                        "prescription_required": index.schedules[drug["schedule"]]["prescription_required"]
+                    }
+                i += n
+            else:
+                i += 1
+    return list(found.values())
+
+class PrescriptionScanner:
+    def __init__(self, engine=None, max_workers: int = DEFAULT_MAX_WORKERS, cache_entries: int = CACHE_ENTRIES):
+        self.engine = engine or get_ocr_engine()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ocr")
+        self.cache_entries = cache_entries
+        self._cache: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _save(upload: Upload):
+        try:
+            return save_upload(upload)
+        except ValueError as e:
+            return e
+
+    def _read(self, stored: StoredUpload):
+        """{"page_count", "texts"} for one upload, or the error that stopped decoding"""
+        texts = []
+        try:
+            for page in iter_pages(stored):
+                texts.append(self.engine.recognize(preprocess_image(page)))
+        except ValueError as e:
+            return e
+        except (UnidentifiedImageError, OSError):
+            return ValueError("Could not read image: unsupported or corrupt file")
+        return {"page_count": len(texts), "texts": texts}
+
+    def _cached(self, digest: str):
+        with self._lock:
+            entry = self._cache.get(digest)
+            if entry is not None:
+                self._cache.move_to_end(digest)
+            return entry
+
+    def _store(self, digest: str, entry: Dict):
+        with self._lock:
+            self._cache[digest] = entry
+            self._cache.move_to_end(digest)
+            while len(self._cache) > self.cache_entries:
+                self._cache.popitem(last=False)
+
+    def scan(self, uploads: List[Upload]) -> List[Dict]:
+        """Read every upload; results are in input order"""
+        stored = list(self.executor.map(self._save, uploads))
+
+        entries, missing, errors = {}, {}, {}
+        for item in stored:
+            if isinstance(item, Exception) or item.sha256 in entries or item.sha256 in missing:
+                continue
+            entry = self._cached(item.sha256)
+            if entry is None:
+                missing[item.sha256] = item
+            else:
+                entries[item.sha256] = entry
+
+        for digest, result in zip(missing, self.executor.map(self._read, missing.values())):
+            if isinstance(result, Exception):
+                errors[digest] = str(result)
+                continue
+            entries[digest] = result
+            self._store(digest, result)
+
+        results = []
+        for item in stored:
+            error = str(item) if isinstance(item, Exception) else errors.get(item.sha256)
+            if error:
+                results.append({"hash": getattr(item, "sha256", None), "pages": 0, "text": "",
+                                "medicines": [], "error": error})
+                continue
+            entry = entries[item.sha256]
+            text = "\n".join(entry["texts"])
+            results.append({
+                "hash": item.sha256,
+                "pages": entry["page_count"],
+                "text": text,
+                "medicines": extract_medicine_names(text),
+                "cached": item.sha256 not in missing
+            })
+        return results
+
+    def scan_one(self, upload: Upload) -> Dict:
+        return self.scan([upload])[0]
+
+_scanner = None
+_scanner_lock = threading.Lock()
+
+def get_prescription_scanner() -> PrescriptionScanner:
+    global _scanner
+    with _scanner_lock:
+        if _scanner is None:
+            _scanner = PrescriptionScanner()
+        return _scanner
@@ -0,0 +1,186 @@
+"""HTTP client for real pharmacy backends.
+
+Each endpoint serves `GET {base_url}/medicines/search?name=<medicine>` and
+answers with JSON like
+    {"price": 120, "in_stock": true, "quantity_available": 12, "discount": 5}
+
+PharmacyAPIClient.search_medicine has the same interface and result shape as
+PharmacyMCPServer.search_medicine, so either can back the Order page.
+"""
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError, as_completed
+from typing import Dict, Iterator, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+DEFAULT_TIMEOUT = (2.0, 5.0)  # (connect, read) seconds
+DEFAULT_CACHE_TTL = 60
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_STREAM_DEADLINE = 10.0
+
+class CircuitBreaker:
+    """Stops calling an endpoint after repeated failures, retrying after a cool-down"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = 0.0
+        self.state = self.CLOSED
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == self.OPEN:
+                if time.monotonic() - self.opened_at < self.reset_timeout:
+                    return False
+                # Let a single trial request through
+                self.state = self.HALF_OPEN
+                return True
+            return self.state == self.CLOSED
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.state = self.CLOSED
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+class TTLCache:
+    def __init__(self, ttl_seconds: float, max_entries: int = 10000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._data: Dict = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            if len(self._data) >= self.max_entries:
+                now = time.monotonic()
+                self._data = {k: v for k, v in self._data.items() if v[0] >= now}
+                if len(self._data) >= self.max_entries:
+                    self._data.pop(next(iter(self._data)))
+            self._data[key] = (time.monotonic() + self.ttl_seconds, value)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+class PharmacyAPIClient:
+    """Pooled, retrying fan-out client over several pharmacy endpoints"""
+
+    def __init__(self, endpoints: List[Dict], timeout=DEFAULT_TIMEOUT, max_workers: int = DEFAULT_MAX_WORKERS,
+                 cache_ttl: float = DEFAULT_CACHE_TTL, retries: int = 2,
+                 failure_threshold: int = 3, reset_timeout: float = 30.0,
+                 session: requests.Session = None):
+        # endpoints: [{"pharmacy": {...same fields as PharmacyMCPServer pharmacies...}, "base_url": "http://..."}]
+        self.endpoints = endpoints
+        self.pharmacies = [endpoint["pharmacy"] for endpoint in endpoints]
+        self.timeout = timeout
+        self.cache = TTLCache(cache_ttl)
+        self.breakers = {
+            endpoint["pharmacy"]["id"]: CircuitBreaker(failure_threshold, reset_timeout)
+            for endpoint in endpoints
+        }
+        self.session = session or requests.Session()
+        retry = Retry(total=retries, backoff_factor=0.2, status_forcelist=[429, 502, 503, 504],
+                      allowed_methods=["GET"], raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=max(1, len(endpoints)), pool_maxsize=max_workers, max_retries=retry)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pharmacy-api")
+
+    @classmethod
+    def from_config(cls, path: str, **kwargs) -> "PharmacyAPIClient":
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f), **kwargs)
+
+    def fetch_offer(self, endpoint: Dict, medicine_name: str) -> Optional[Dict]:
+        """One pharmacy's offer, from cache when fresh; None if unavailable"""
+        pharmacy = endpoint["pharmacy"]
+        key = (pharmacy["id"], " ".join(medicine_name.lower().split()))
+        cached = self.cache.get(key)
+        if cached is not None:
+            return dict(cached, medicine_name=medicine_name)
+
+        breaker = self.breakers[pharmacy["id"]]
+        if not breaker.allow():
+            return None
+        try:
+            response = self.session.get(
+                f"{endpoint['base_url'].rstrip('/')}/medicines/search",
+                params={"name": medicine_name},
+                timeout=self.timeout
+            )
+            response.raise_for_status()
+            data = response.json()
+            offer = {
+                "pharmacy": pharmacy,
+                "medicine_name": medicine_name,
+                "price": int(data["price"]),
+                "in_stock": bool(data.get("in_stock", True)),
+                "quantity_available": int(data.get("quantity_available", 0)),
+                "discount": int(data.get("discount", 0))
+            }
+        except (requests.RequestException, ValueError, KeyError, TypeError) as e:
+            breaker.record_failure()
+            print(f"⚠️ {pharmacy['name']} unavailable: {e}")
+            return None
+
+        breaker.record_success()
+        self.cache.set(key, offer)
+        # Callers get their own copy so annotating it cannot alter later cache hits
+        return dict(offer)
+
+    def search_medicine(self, medicine_name: str, lat: float = None, lon: float = None,
+                        radius_km: float = None) -> List[Dict]:
+        """Same result shape as PharmacyMCPServer.search_medicine; unreachable pharmacies are skipped.
+        
+        Location arguments are accepted for interface compatibility; endpoints
+        are already scoped to the configured pharmacies.
+        """
+        offers = self.executor.map(lambda endpoint: self.fetch_offer(endpoint, medicine_name), self.endpoints)
+        return sorted((offer for offer in offers if offer), key=lambda x: x['price'])
+
+    def stream_search(self, medicine_name: str, lat: float = None, lon: float = None,
+                      radius_km: float = None, deadline: float = DEFAULT_STREAM_DEADLINE) -> Iterator[Dict]:
+        """Yield each pharmacy's offer as soon as it arrives, giving up on the rest at the deadline (seconds)"""
+        futures = [self.executor.submit(self.fetch_offer, endpoint, medicine_name) for endpoint in self.endpoints]
+        try:
+            for future in as_completed(futures, timeout=deadline):
+                offer = future.result()
+                if offer:
+                    yield offer
+        except FuturesTimeoutError:
+            print(f"⚠️ Pharmacy search hit the {deadline}s deadline")
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+        self.session.close()
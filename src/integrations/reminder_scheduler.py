@@ -0,0 +1,227 @@
+"""Background scheduler that fires medication reminders.
+
+Every reminder sits in a min-heap keyed by its next occurrence (a Unix
+timestamp from its compact schedule), so the scheduler sleeps until the
+earliest one is due and only touches the entries that fire. After firing, an
+entry is pushed back at its next occurrence until the schedule ends
+(`duration_days` from `start_date`). New reminders are
+picked up incrementally through the created_at index; deactivated ones are
+dropped when they next come due.
+
+Doses that were not marked taken within DOSE_WINDOW_SECONDS are recorded
+as missed (settle_missed_doses): for every reminder at startup, for each
+reminder when it fires, and for a finished reminder once its last dose's
+window has passed.
+
+The Streamlit app starts the shared scheduler (get_reminder_scheduler) in a
+background thread; it can also run on its own:
+
+    python -m src.integrations.reminder_scheduler
+"""
+import heapq
+import itertools
+import os
+import sys
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.storage.local_db import (
+    DOSE_WINDOW_SECONDS, get_active_reminders, get_reminders, get_reminders_since, settle_missed_doses
+)
+from src.storage.reminder_schedule import next_occurrence, schedule_from_reminder
+
+DEFAULT_SYNC_SECONDS = 30.0
+# Occurrences missed by more than this (e.g. while the scheduler was down) are skipped, not sent late
+MISSED_GRACE_SECONDS = 15 * 60
+# Pause before retrying after a failed firing pass (e.g. the database was locked)
+RETRY_SECONDS = 5.0
+
+class ConsoleNotifier:
+    """Default notifier: prints the reminder. Any object with notify(reminder, fire_at) works."""
+
+    def notify(self, reminder: Dict, fire_at: datetime):
+        print(f"⏰ {fire_at.strftime('%I:%M %p')} - time to take {reminder.get('medicine')} "
+              f"({reminder.get('dosage') or 'as prescribed'})")
+
+class ReminderScheduler:
+    def __init__(self, notifier=None, clock: Callable[[], datetime] = datetime.now,
+                 sync_interval: float = DEFAULT_SYNC_SECONDS):
+        self.notifier = notifier or ConsoleNotifier()
+        self.clock = clock
+        self.sync_interval = sync_interval
+        self.heap: List[Tuple[int, int, str]] = []
+        self.reminders: Dict[str, Dict] = {}
+        self.cancelled: Set[str] = set()
+        self.finishing: Dict[str, int] = {}  # finished reminder id -> when its last dose can be settled
+        self._seq = itertools.count()
+        self._synced_until: Optional[str] = None
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def add(self, reminder: Dict, now: datetime = None):
+        """Schedule an active reminder at its next occurrence"""
+        if not reminder.get('active', True) or reminder['id'] in self.reminders:
+            return
+        now_ts = int((now or self.clock()).timestamp())
+        schedule = reminder.get('schedule') or schedule_from_reminder(reminder)
+        due = next_occurrence(schedule, now_ts - 1)
+        with self._lock:
+            self.reminders[reminder['id']] = reminder
+            if due is not None:
+                heapq.heappush(self.heap, (due, next(self._seq), reminder['id']))
+        self._wakeup.set()
+
+    def cancel(self, reminder_id: str):
+        with self._lock:
+            if self.reminders.pop(reminder_id, None) is not None:
+                self.cancelled.add(reminder_id)
+            self.finishing.pop(reminder_id, None)
+
+    def load(self):
+        """Schedule all active reminders (one full read at startup)"""
+        now = self.clock()
+        self._synced_until = now.isoformat()
+        reminders = get_active_reminders()
+        for reminder in reminders:
+            self.add(reminder, now)
+        self._settle(reminders)
+
+    def sync(self):
+        """Pick up reminders created since the last sync"""
+        if self._synced_until is None:
+            return self.load()
+        now = self.clock()
+        # Re-read a little overlap; already scheduled ids are skipped
+        since = (datetime.fromisoformat(self._synced_until) - timedelta(seconds=5)).isoformat()
+        self._synced_until = now.isoformat()
+        for reminder in get_reminders_since(since):
+            self.add(reminder, now)
+
+        now_ts = int(now.timestamp())
+        finished = [reminder_id for reminder_id, settle_at in self.finishing.items() if settle_at <= now_ts]
+        if finished:
+            for reminder_id in finished:
+                del self.finishing[reminder_id]
+            self._settle(list(get_reminders(finished).values()))
+
+    def run_pending(self) -> List[Tuple[Dict, datetime]]:
+        """Fire every entry due now and reschedule it; returns what fired"""
+        now = int(self.clock().timestamp())
+        due = []
+        with self._lock:
+            while self.heap and self.heap[0][0] <= now:
+                entry = heapq.heappop(self.heap)
+                if entry[2] not in self.cancelled:
+                    due.append(entry)
+        if not due:
+            return []
+
+        # Reminders can be deactivated from another process: re-read them in one batch
+        try:
+            current = get_reminders([reminder_id for _, _, reminder_id in due])
+        except Exception:
+            # Put the popped entries back so the next pass fires them
+            with self._lock:
+                for entry in due:
+                    heapq.heappush(self.heap, entry)
+            raise
+        self._settle([reminder for reminder in current.values() if reminder.get('active', True)])
+        fired, rescheduled = [], []
+        for fire_at, _, reminder_id in due:
+            reminder = current.get(reminder_id)
+            if not reminder or not reminder.get('active', True):
+                self.cancel(reminder_id)
+                continue
+            schedule = reminder.get('schedule') or schedule_from_reminder(reminder)
+            if now - fire_at <= MISSED_GRACE_SECONDS:
+                fire_time = datetime.fromtimestamp(fire_at)
+                try:
+                    self.notifier.notify(reminder, fire_time)
+                    fired.append((reminder, fire_time))
+                except Exception as e:
+                    print(f"⚠️ Reminder notification failed: {e}")
+            next_fire = next_occurrence(schedule, max(now, fire_at))
+            if next_fire is not None:
+                rescheduled.append((next_fire, next(self._seq), reminder_id))
+            else:
+                self.finishing[reminder_id] = fire_at + DOSE_WINDOW_SECONDS + 1
+        with self._lock:
+            for entry in rescheduled:
+                heapq.heappush(self.heap, entry)
+        return fired
+
+    def _settle(self, reminders: List[Dict]):
+        """Record doses of these reminders whose window has passed untaken as missed"""
+        try:
+            settle_missed_doses(reminders, int(self.clock().timestamp()))
+        except Exception as e:
+            print(f"⚠️ Recording missed doses failed: {e}")
+
+    def seconds_until_next(self) -> Optional[float]:
+        with self._lock:
+            if not self.heap:
+                return None
+            return max(0.0, self.heap[0][0] - self.clock().timestamp())
+
+    def _run(self):
+        next_sync = 0.0
+        while not self._stop.is_set():
+            now = self.clock().timestamp()
+            if now >= next_sync:
+                try:
+                    self.sync()
+                except Exception as e:
+                    print(f"⚠️ Reminder sync failed: {e}")
+                next_sync = now + self.sync_interval
+            try:
+                self.run_pending()
+                wait = min(x for x in (self.seconds_until_next(), next_sync - now) if x is not None)
+            except Exception as e:
+                print(f"⚠️ Reminder firing failed: {e}")
+                wait = RETRY_SECONDS
+            self._wakeup.clear()
+            self._wakeup.wait(max(wait, 0.01))
+
+    def start(self):
+        """Run in a background thread (no-op if already running)"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="reminder-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+def get_reminder_scheduler() -> ReminderScheduler:
+    """Process-wide scheduler, started on first use and restarted if its thread has died"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = ReminderScheduler()
+        _scheduler.start()
+        return _scheduler
+
+def main():
+    scheduler = ReminderScheduler()
+    print("✅ Reminder scheduler running")
+    scheduler.start()
+    try:
+        scheduler._thread.join()
+    except KeyboardInterrupt:
+        scheduler.stop()
+
+if __name__ == "__main__":
+    main()
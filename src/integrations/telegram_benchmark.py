@@ -0,0 +1,201 @@
+"""Throughput benchmark for the Telegram bot against a local fake Bot API.
+
+The fake server queues synthetic user messages for getUpdates, records every
+sendMessage and answers 429 (with retry_after) when the bot exceeds the
+global or per-chat rate limit. The report gives replies/s, reply latency
+percentiles, rate-limit hits and whether each chat's replies arrived in order.
+
+    python -m src.integrations.telegram_benchmark --chats 100 --messages 3
+    python -m src.integrations.telegram_benchmark --rate 1000 --chat-interval 0
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from collections import defaultdict, deque
+from typing import Dict, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.ai.symptom_analyzer import analyze_symptoms
+from src.integrations.telegram_bot import GLOBAL_RATE, PER_CHAT_INTERVAL, Outbox, TelegramBot
+from src.mcp.load_test import percentile
+
+SAMPLE_SYMPTOMS = ["fever 101 and headache", "dry cough and sore throat", "acidity after meals",
+                   "loose motions since morning", "runny nose and sneezing", "body ache and tiredness"]
+
+class FakeBotAPIServer:
+    """Minimal Bot API: getUpdates (long poll) and sendMessage with rate limiting"""
+
+    def __init__(self, rate: float = GLOBAL_RATE, per_chat_interval: float = PER_CHAT_INTERVAL,
+                 slack: float = 0.1):
+        self.rate = rate
+        self.per_chat_interval = per_chat_interval
+        self.slack = slack
+        self.updates: List[Dict] = []
+        self.new_updates = asyncio.Event()
+        self.sent: Dict[int, List[str]] = defaultdict(list)
+        self.sent_at: Dict[int, List[float]] = defaultdict(list)
+        self.recent_sends: deque = deque()
+        self.last_send: Dict[int, float] = {}
+        self.rate_limited = 0
+        self.total_sent = 0
+        self.all_sent = asyncio.Event()
+        self.expected = 0
+        self.writers = set()
+
+    def add_message(self, chat_id: int, text: str):
+        update_id = len(self.updates) + 1
+        self.updates.append({
+            "update_id": update_id,
+            "message": {"message_id": update_id, "chat": {"id": chat_id, "type": "private"},
+                        "date": int(time.time()), "text": text}
+        })
+        self.new_updates.set()
+
+    async def get_updates(self, params: Dict):
+        offset = params.get("offset") or 0
+        start = max(0, offset - 1)
+        if start >= len(self.updates):
+            self.new_updates.clear()
+            try:
+                await asyncio.wait_for(self.new_updates.wait(), timeout=params.get("timeout", 0))
+            except asyncio.TimeoutError:
+                pass
+        return {"ok": True, "result": self.updates[start:start + 100]}
+
+    def send_message(self, params: Dict):
+        now = time.monotonic()
+        chat_id = params["chat_id"]
+        while self.recent_sends and now - self.recent_sends[0] > 1.0:
+            self.recent_sends.popleft()
+        too_fast_chat = now - self.last_send.get(chat_id, -1e9) < self.per_chat_interval * (1 - self.slack)
+        too_fast_global = len(self.recent_sends) >= self.rate * (1 + self.slack)
+        if too_fast_chat or too_fast_global:
+            self.rate_limited += 1
+            return {"ok": False, "error_code": 429, "description": "Too Many Requests: retry after 1",
+                    "parameters": {"retry_after": 1}}
+        self.recent_sends.append(now)
+        self.last_send[chat_id] = now
+        self.sent[chat_id].append(params["text"])
+        self.sent_at[chat_id].append(now)
+        self.total_sent += 1
+        if self.expected and self.total_sent >= self.expected:
+            self.all_sent.set()
+        return {"ok": True, "result": {"message_id": self.total_sent, "chat": {"id": chat_id}}}
+
+    async def close_connections(self):
+        self.new_updates.set()  # release pending long polls
+        for writer in list(self.writers):
+            writer.close()
+        while self.writers:
+            await asyncio.sleep(0.01)
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.writers.add(writer)
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                _, target, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get("content-length", 0))
+                params = json.loads(await reader.readexactly(length)) if length else {}
+
+                method = target.rsplit("/", 1)[-1]
+                if method == "getUpdates":
+                    result = await self.get_updates(params)
+                elif method == "sendMessage":
+                    result = self.send_message(params)
+                else:
+                    result = {"ok": False, "error_code": 404, "description": "Not Found"}
+                body = json.dumps(result).encode("utf-8")
+                writer.write(f"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                             f"Content-Length: {len(body)}\r\n\r\n".encode("latin-1") + body)
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            self.writers.discard(writer)
+            writer.close()
+
+def tagged_analyzer(text: str) -> Dict:
+    """analyze_symptoms, with the message echoed in the reply so ordering can be checked"""
+    analysis = analyze_symptoms(text.split(" #")[0])
+    return dict(analysis, disclaimer=f"[{text}]")
+
+async def run_benchmark(chats: int, messages: int, rate: float, chat_interval: float,
+                        analysis_workers: int, port: int = 0) -> Dict:
+    fake = FakeBotAPIServer(rate, chat_interval)
+    server = await asyncio.start_server(fake.handle_connection, "127.0.0.1", port)
+    port = server.sockets[0].getsockname()[1]
+
+    bot = TelegramBot("benchmark", base_url=f"http://127.0.0.1:{port}", poll_timeout=1,
+                      analysis_workers=analysis_workers, analyzer=tagged_analyzer,
+                      allowed_chat_ids=range(1, chats + 1))
+    bot.outbox = Outbox(bot.api, rate=rate, per_chat_interval=chat_interval)
+
+    fake.expected = chats * messages
+    injected_at = {}
+    for i in range(messages):
+        for chat_id in range(1, chats + 1):
+            text = f"{SAMPLE_SYMPTOMS[(chat_id + i) % len(SAMPLE_SYMPTOMS)]} #{i}"
+            injected_at[(chat_id, i)] = time.monotonic()
+            fake.add_message(chat_id, text)
+
+    started = time.monotonic()
+    bot_task = asyncio.create_task(bot.run())
+    await fake.all_sent.wait()
+    wall = time.monotonic() - started
+    bot_task.cancel()
+    try:
+        await bot_task
+    except asyncio.CancelledError:
+        pass
+    server.close()
+    await fake.close_connections()
+    await server.wait_closed()
+
+    latencies, in_order = [], True
+    for chat_id in range(1, chats + 1):
+        tags = [reply.rsplit("#", 1)[-1].rstrip("]") for reply in fake.sent[chat_id]]
+        in_order = in_order and tags == [str(i) for i in range(messages)]
+        for i, sent_at in enumerate(fake.sent_at[chat_id]):
+            latencies.append((sent_at - injected_at[(chat_id, i)]) * 1000)
+
+    return {
+        "replies": fake.total_sent,
+        "seconds": wall,
+        "replies_per_second": fake.total_sent / wall if wall else 0.0,
+        "p50_ms": percentile(latencies, 50),
+        "p99_ms": percentile(latencies, 99),
+        "rate_limited": fake.rate_limited,
+        "in_order": in_order
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Telegram bot against a fake Bot API")
+    parser.add_argument("--chats", type=int, default=100)
+    parser.add_argument("--messages", type=int, default=3, help="messages per chat")
+    parser.add_argument("--rate", type=float, default=GLOBAL_RATE, help="global send limit, messages/s")
+    parser.add_argument("--chat-interval", type=float, default=PER_CHAT_INTERVAL,
+                        help="minimum seconds between messages to one chat")
+    parser.add_argument("--workers", type=int, default=4, help="analysis worker threads")
+    args = parser.parse_args()
+
+    report = asyncio.run(run_benchmark(args.chats, args.messages, args.rate, args.chat_interval, args.workers))
+    print(f"{report['replies']} replies in {report['seconds']:.2f}s ({report['replies_per_second']:.1f} replies/s)")
+    print(f"latency p50 {report['p50_ms']:.0f} ms, p99 {report['p99_ms']:.0f} ms")
+    print(f"rate limited: {report['rate_limited']}, per-chat order kept: {report['in_order']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+"""Telegram bot for the symptom checker and medication reminders.
+
+- Updates are long-polled with getUpdates. TELEGRAM_API_URL can point the
+  bot at a local fake server (see telegram_benchmark.py).
+- Each chat gets its own queue and worker, so different chats are handled
+  concurrently while messages from one chat are answered in order.
+- analyze_symptoms runs in a thread pool, off the event loop.
+- Replies go through an outbox that sends in batches, no faster than the
+  Bot API limits (30 messages/s overall, 1 message/s per chat).
+- Only chats listed in TELEGRAM_ALLOWED_CHAT_IDS (comma-separated) are
+  answered; /reminders shows this household's medication, so messages from
+  any other chat are ignored.
+
+    TELEGRAM_BOT_TOKEN=... TELEGRAM_ALLOWED_CHAT_IDS=123456789 python -m src.integrations.telegram_bot
+"""
+import asyncio
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Deque, Dict, Iterable, List, Optional, Set, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.ai.symptom_analyzer import analyze_symptoms
+from src.storage.local_db import get_active_reminders
+
+TELEGRAM_API_URL = os.getenv("TELEGRAM_API_URL", "https://api.telegram.org")
+TELEGRAM_ALLOWED_CHAT_IDS = os.getenv("TELEGRAM_ALLOWED_CHAT_IDS", "")
+POLL_TIMEOUT = 30
+MAX_CONCURRENT_CHATS = 64
+ANALYSIS_WORKERS = 4
+HTTP_WORKERS = 16
+GLOBAL_RATE = 30.0  # messages per second
+PER_CHAT_INTERVAL = 1.0  # seconds between messages to one chat
+SEND_BATCH_SIZE = 30
+
+HELP_TEXT = (
+    "👋 I'm your Health Copilot.\n\n"
+    "Describe your symptoms (e.g. \"fever 101 and headache\") and I'll suggest what to do.\n"
+    "/reminders - your active medication reminders\n"
+    "/help - this message\n\n"
+    "⚠️ This is NOT a medical diagnosis. Consult a doctor for proper medical advice."
+)
+
+def parse_chat_ids(value: str) -> Set[int]:
+    """'123, -100456' -> {123, -100456}"""
+    return {int(part) for part in value.split(",") if part.strip()}
+
+class BotAPIError(Exception):
+    def __init__(self, description: str, retry_after: float = None):
+        super().__init__(description)
+        self.retry_after = retry_after
+
+class BotAPI:
+    """Bot API calls over a pooled requests.Session, run in worker threads"""
+
+    def __init__(self, token: str, base_url: str = TELEGRAM_API_URL, max_workers: int = HTTP_WORKERS):
+        self.url = f"{base_url.rstrip('/')}/bot{token}"
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bot-api")
+
+    def _post(self, method: str, params: Dict, http_timeout: float):
+        response = self.session.post(f"{self.url}/{method}", json=params, timeout=http_timeout)
+        data = response.json()
+        if not data.get("ok"):
+            retry_after = (data.get("parameters") or {}).get("retry_after")
+            raise BotAPIError(data.get("description", f"{method} failed"), retry_after)
+        return data["result"]
+
+    async def call(self, method: str, http_timeout: float = 10.0, **params):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self._post, method, params, http_timeout)
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+        self.session.close()
+
+class Outbox:
+    """Queue of outgoing messages sent in rate-limited batches, in order within each chat"""
+
+    def __init__(self, api: BotAPI, rate: float = GLOBAL_RATE, per_chat_interval: float = PER_CHAT_INTERVAL,
+                 batch_size: int = SEND_BATCH_SIZE):
+        self.api = api
+        self.rate = rate
+        self.per_chat_interval = per_chat_interval
+        self.batch_size = batch_size
+        self.pending: Deque[Tuple[int, str]] = deque()
+        self.next_allowed: Dict[int, float] = {}
+        self.wakeup = asyncio.Event()
+        self.sent = 0
+        self.on_sent: Optional[Callable[[int, str], None]] = None
+
+    def put(self, chat_id: int, text: str):
+        self.pending.append((chat_id, text))
+        self.wakeup.set()
+
+    def _take_batch(self, now: float, limit: int) -> List[Tuple[int, str]]:
+        """Oldest messages whose chat may be messaged now, at most one per chat"""
+        batch, deferred, chats = [], deque(), set()
+        while self.pending and len(batch) < limit:
+            chat_id, text = self.pending.popleft()
+            if chat_id in chats or self.next_allowed.get(chat_id, 0.0) > now:
+                deferred.append((chat_id, text))
+                continue
+            chats.add(chat_id)
+            batch.append((chat_id, text))
+        # Deferred messages keep their place ahead of newer ones
+        deferred.extend(self.pending)
+        self.pending = deferred
+        return batch
+
+    async def _send(self, chat_id: int, text: str):
+        try:
+            await self.api.call("sendMessage", chat_id=chat_id, text=text)
+            self.next_allowed[chat_id] = time.monotonic() + self.per_chat_interval
+            self.sent += 1
+            if self.on_sent:
+                self.on_sent(chat_id, text)
+        except BotAPIError as e:
+            if e.retry_after is None:
+                print(f"⚠️ sendMessage to {chat_id} failed: {e}")
+                return
+            self.next_allowed[chat_id] = time.monotonic() + e.retry_after
+            self.pending.appendleft((chat_id, text))
+        except requests.RequestException as e:
+            print(f"⚠️ sendMessage to {chat_id} failed: {e}")
+
+    async def run(self):
+        interval = self.batch_size / self.rate
+        while True:
+            if not self.pending:
+                self.wakeup.clear()
+                await self.wakeup.wait()
+            batch = self._take_batch(time.monotonic(), self.batch_size)
+            if batch:
+                await asyncio.gather(*(self._send(chat_id, text) for chat_id, text in batch))
+            # A full batch uses up one interval of the global budget, counted from
+            # its last delivery so no window of that length holds two batches
+            await asyncio.sleep(interval * len(batch) / self.batch_size if batch else 0.05)
+
+class TelegramBot:
+    def __init__(self, token: str, base_url: str = TELEGRAM_API_URL, poll_timeout: int = POLL_TIMEOUT,
+                 analysis_workers: int = ANALYSIS_WORKERS, max_concurrent_chats: int = MAX_CONCURRENT_CHATS,
+                 analyzer: Callable[[str], Dict] = analyze_symptoms, allowed_chat_ids: Iterable[int] = None):
+        self.api = BotAPI(token, base_url)
+        self.allowed_chat_ids = set(parse_chat_ids(TELEGRAM_ALLOWED_CHAT_IDS) if allowed_chat_ids is None
+                                    else allowed_chat_ids)
+        self.outbox = Outbox(self.api)
+        self.poll_timeout = poll_timeout
+        self.analyzer = analyzer
+        self.analysis_pool = ThreadPoolExecutor(max_workers=analysis_workers, thread_name_prefix="analysis")
+        self.chat_slots = asyncio.Semaphore(max_concurrent_chats)
+        self.chat_queues: Dict[int, asyncio.Queue] = {}
+        self.offset = 0
+        self._tasks = set()
+
+    # Dispatch: one worker per chat with queued messages; it exits when the queue drains
+    def dispatch(self, update: Dict):
+        message = update.get("message") or update.get("edited_message")
+        if not message or "text" not in message:
+            return
+        chat_id = message["chat"]["id"]
+        if chat_id not in self.allowed_chat_ids:
+            return
+        queue = self.chat_queues.get(chat_id)
+        if queue is None:
+            queue = self.chat_queues[chat_id] = asyncio.Queue()
+            task = asyncio.create_task(self._chat_worker(chat_id, queue))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        queue.put_nowait(message)
+
+    async def _chat_worker(self, chat_id: int, queue: asyncio.Queue):
+        async with self.chat_slots:
+            while not queue.empty():
+                message = queue.get_nowait()
+                try:
+                    reply = await self.handle_message(message)
+                except Exception as e:
+                    print(f"⚠️ Failed to handle message from {chat_id}: {e}")
+                    reply = "⚠️ Something went wrong. Please try again."
+                if reply:
+                    self.outbox.put(chat_id, reply)
+        del self.chat_queues[chat_id]
+
+    async def handle_message(self, message: Dict) -> str:
+        text = message["text"].strip()
+        command = text.split()[0].split("@")[0].lower() if text.startswith("/") else None
+        if command in ("/start", "/help"):
+            return HELP_TEXT
+        if command == "/reminders":
+            reminders = await asyncio.to_thread(get_active_reminders)
+            return format_reminders(reminders)
+        if command:
+            return "Unknown command. Send /help for what I can do."
+        loop = asyncio.get_running_loop()
+        analysis = await loop.run_in_executor(self.analysis_pool, self.analyzer, text)
+        return format_analysis(analysis)
+
+    async def poll(self):
+        while True:
+            try:
+                updates = await self.api.call(
+                    "getUpdates", http_timeout=self.poll_timeout + 10,
+                    offset=self.offset, timeout=self.poll_timeout, allowed_updates=["message", "edited_message"]
+                )
+            except (BotAPIError, requests.RequestException, ValueError) as e:
+                print(f"⚠️ getUpdates failed: {e}")
+                await asyncio.sleep(getattr(e, "retry_after", None) or 1.0)
+                continue
+            for update in updates:
+                self.offset = max(self.offset, update["update_id"] + 1)
+                self.dispatch(update)
+
+    async def run(self):
+        print("✅ Telegram bot polling for updates")
+        sender = asyncio.create_task(self.outbox.run())
+        try:
+            await self.poll()
+        finally:
+            sender.cancel()
+            self.close()
+
+    def close(self):
+        self.analysis_pool.shutdown(wait=False)
+        self.api.close()
+
+def format_analysis(analysis: Dict) -> str:
+    if analysis.get("emergency"):
+        lines = [f"🚨 {analysis.get('message', 'This may be an emergency.')}", analysis.get("action", "")]
+    else:
+        lines = [f"Severity: {analysis.get('severity', 'unknown').title()}"]
+        if analysis.get("temperature_status"):
+            lines.append(f"🌡️ {analysis['temperature_status']}")
+        conditions = analysis.get("possible_conditions") or []
+        if conditions:
+            lines.append("\nPossible conditions:")
+            lines.extend(f"• {c['name']}" for c in conditions[:3])
+    recommendations = analysis.get("recommendations") or []
+    if recommendations:
+        lines.append("\nWhat to do:")
+        lines.extend(f"• {r}" for r in recommendations[:5])
+    lines.append(f"\n{analysis.get('disclaimer', '')}")
+    return "\n".join(line for line in lines if line is not None).strip()
+
+def format_reminders(reminders: List[Dict]) -> str:
+    if not reminders:
+        return "No active reminders. Add one in the Health Copilot app."
+    lines = ["⏰ Active reminders:"]
+    for reminder in reminders:
+        lines.append(f"• {reminder['medicine']} {reminder.get('dosage', '')} at {', '.join(reminder.get('times', []))}")
+    return "\n".join(lines)
+
+def main():
+    token = os.getenv("TELEGRAM_BOT_TOKEN")
+    if not token:
+        print("⚠️ Set TELEGRAM_BOT_TOKEN to run the bot")
+        return
+    if not parse_chat_ids(TELEGRAM_ALLOWED_CHAT_IDS):
+        print("⚠️ Set TELEGRAM_ALLOWED_CHAT_IDS to the chats the bot may answer")
+        return
+    try:
+        asyncio.run(TelegramBot(token).run())
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
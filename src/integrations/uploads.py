@@ -0,0 +1,143 @@
+"""Memory-bounded handling of uploaded prescription files.
+
+Uploads are copied to disk in fixed-size chunks while being hashed, and
+stored under their SHA-256 so identical files are kept once. Pages are
+produced one at a time: JPEGs decode at reduced scale through Pillow's draft
+mode, other images are shrunk as soon as they load, and PDFs are rendered
+page by page (requires pypdfium2). Peak memory is one page, not one file.
+Stored uploads are deleted after UPLOAD_RETENTION_SECONDS.
+"""
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from typing import BinaryIO, Iterator, NamedTuple, Union
+
+from PIL import Image, ImageSequence
+
+UPLOAD_DIR = os.path.join("data", "uploads")
+CHUNK_SIZE = 1024 * 1024
+MAX_UPLOAD_BYTES = 25 * 1024 * 1024
+MAX_PAGE_SIDE = 1600
+MAX_PAGES = 30
+ALLOWED_EXTENSIONS = {".jpg", ".jpeg", ".png", ".pdf"}
+UPLOAD_RETENTION_SECONDS = 24 * 3600
+UPLOAD_PURGE_INTERVAL = 3600
+_last_upload_purge = 0.0
+
+try:
+    import pypdfium2 as pdfium
+except ImportError:
+    pdfium = None
+
+# pdfium is not thread-safe: one document operation at a time per process
+_pdfium_lock = threading.Lock()
+
+class StoredUpload(NamedTuple):
+    path: str
+    sha256: str
+    size: int
+    kind: str  # "image" or "pdf"
+
+def purge_uploads(dest_dir: str = UPLOAD_DIR, max_age_seconds: float = UPLOAD_RETENTION_SECONDS) -> int:
+    """Delete uploads (and abandoned partial writes) older than max_age_seconds; returns how many"""
+    cutoff = time.time() - max_age_seconds
+    removed = 0
+    try:
+        entries = list(os.scandir(dest_dir))
+    except FileNotFoundError:
+        return 0
+    for entry in entries:
+        try:
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                os.unlink(entry.path)
+                removed += 1
+        except FileNotFoundError:
+            pass  # removed by another process
+    return removed
+
+def save_upload(upload: Union[bytes, BinaryIO], name: str = None, dest_dir: str = UPLOAD_DIR,
+                chunk_size: int = CHUNK_SIZE, max_bytes: int = MAX_UPLOAD_BYTES) -> StoredUpload:
+    """Stream an upload to disk, hashing as it goes; raises ValueError if too large or of the wrong type"""
+    name = name or getattr(upload, "name", "") or ""
+    extension = os.path.splitext(name)[1].lower()
+    if extension and extension not in ALLOWED_EXTENSIONS:
+        raise ValueError(f"Unsupported file type: {extension}")
+    if isinstance(upload, (bytes, bytearray)):
+        chunks = (upload[i:i + chunk_size] for i in range(0, len(upload), chunk_size))
+    else:
+        if hasattr(upload, "seek"):
+            upload.seek(0)
+        chunks = iter(lambda: upload.read(chunk_size), b"")
+
+    global _last_upload_purge
+    if time.monotonic() - _last_upload_purge > UPLOAD_PURGE_INTERVAL:
+        _last_upload_purge = time.monotonic()
+        purge_uploads(dest_dir)
+
+    os.makedirs(dest_dir, exist_ok=True)
+    digest = hashlib.sha256()
+    size = 0
+    head = b""
+    fd, tmp_path = tempfile.mkstemp(dir=dest_dir, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for chunk in chunks:
+                size += len(chunk)
+                if size > max_bytes:
+                    raise ValueError(f"File is larger than {max_bytes // (1024 * 1024)} MB")
+                if len(head) < 8:
+                    head += chunk[:8]
+                digest.update(chunk)
+                f.write(chunk)
+        sha256 = digest.hexdigest()
+        kind = "pdf" if head.startswith(b"%PDF") else "image"
+        path = os.path.join(dest_dir, sha256 + (".pdf" if kind == "pdf" else extension or ".img"))
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return StoredUpload(path, sha256, size, kind)
+
+def iter_image_pages(path: str, max_side: int = MAX_PAGE_SIDE) -> Iterator[Image.Image]:
+    """Frames of an image file, each no larger than max_side"""
+    with Image.open(path) as image:
+        # JPEG: let the decoder scale down by 1/2, 1/4 or 1/8 instead of decoding full size
+        image.draft("L", (max_side, max_side))
+        for i, frame in enumerate(ImageSequence.Iterator(image)):
+            if i >= MAX_PAGES:
+                break
+            page = frame.copy()
+            page.thumbnail((max_side, max_side))
+            yield page
+
+def iter_pdf_pages(path: str, max_side: int = MAX_PAGE_SIDE) -> Iterator[Image.Image]:
+    """Render PDF pages one at a time, scaled so the longest side is max_side"""
+    if pdfium is None:
+        raise ValueError("PDF prescriptions need pypdfium2 (pip install pypdfium2)")
+    with _pdfium_lock:
+        try:
+            document = pdfium.PdfDocument(path)
+        except pdfium.PdfiumError as e:
+            raise ValueError(f"Could not read PDF: {e}")
+        page_count = min(len(document), MAX_PAGES)
+    try:
+        for index in range(page_count):
+            with _pdfium_lock:
+                page = document[index]
+                try:
+                    width, height = page.get_size()
+                    scale = max_side / max(width, height, 1)
+                    image = page.render(scale=scale, grayscale=True).to_pil()
+                finally:
+                    page.close()
+            yield image
+    finally:
+        with _pdfium_lock:
+            document.close()
+
+def iter_pages(stored: StoredUpload, max_side: int = MAX_PAGE_SIDE) -> Iterator[Image.Image]:
+    if stored.kind == "pdf":
+        return iter_pdf_pages(stored.path, max_side)
+    return iter_image_pages(stored.path, max_side)
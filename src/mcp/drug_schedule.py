@@ -0,0 +1,142 @@
+"""Prescription requirement lookup over the drug schedule dataset.
+
+Generic names, brands, listed misspellings and catalogue medicines are
+normalized into one hash table. Unlisted typos are caught by a second table
+of single-character deletions (each key and each query contributes at most
+len(name) variants), so every lookup is a bounded number of dict probes.
+
+A name may mention several drugs ('Crocin + Azithral'): every run of words is
+resolved and the most restrictive schedule found wins.
+"""
+import json
+import os
+import re
+from typing import Dict, Iterable, List, Optional
+
+from src.storage.local_db import cached_for_catalogue
+
+SCHEDULE_FILE = os.path.join(os.path.dirname(__file__), "..", "..", "data", "drug_schedules.json")
+MIN_TYPO_KEY_LENGTH = 5
+MAX_QUERY_TOKENS = 6
+# Most restrictive last; unknown schedules rank with OTC
+SCHEDULE_ORDER = ["OTC", "H", "H1", "X"]
+
+_SEPARATORS = re.compile(r"[+&/,()\-]")
+_NON_ALNUM = re.compile(r"[^a-z0-9 ]")
+_STRENGTH = re.compile(r"^\d+(\.\d+)?(mg|mcg|g|ml|iu|%)?$")
+_FORM_WORDS = {"tablet", "tablets", "tab", "tabs", "capsule", "capsules", "cap", "caps",
+               "syrup", "suspension", "injection", "strip", "strips"}
+
+def _tokens(name: str) -> List[str]:
+    text = _NON_ALNUM.sub("", _SEPARATORS.sub(" ", name.lower()))
+    return [t for t in text.split() if t not in _FORM_WORDS and not _STRENGTH.match(t)]
+
+def normalize_drug_name(name: str) -> str:
+    """'Dolo 650' -> 'dolo', 'Amoxicillin + Clavulanic Acid' -> 'amoxicillinclavulanicacid'"""
+    return "".join(_tokens(name))
+
+def _deletions(key: str) -> Iterable[str]:
+    return (key[:i] + key[i + 1:] for i in range(len(key)))
+
+def _schedule_rank(drug: Dict) -> int:
+    schedule = drug["schedule"]
+    return SCHEDULE_ORDER.index(schedule) if schedule in SCHEDULE_ORDER else 0
+
+class DrugScheduleIndex:
+    def __init__(self, dataset: Dict, catalogue: Dict = None):
+        self.schedules = dataset["schedules"]
+        self.exact: Dict[str, Dict] = {}
+        self.typos: Dict[str, Optional[Dict]] = {}
+
+        for drug in dataset["drugs"]:
+            for name in [drug["generic"], *drug.get("brands", []), *drug.get("misspellings", [])]:
+                self._add(name, drug)
+        for word, schedule in dataset.get("classes", {}).items():
+            self._add(word, {"generic": None, "schedule": schedule, "class": word.capitalize()})
+
+        # Catalogue medicines not in the schedule dataset are sold over the counter
+        for medicines in (catalogue or {}).values():
+            for med in medicines:
+                drug = {"generic": med.get("generic", med["name"]), "schedule": "OTC", "class": None}
+                for name in [med["name"], *med.get("brands", [])]:
+                    if normalize_drug_name(name) not in self.exact:
+                        self._add(name, drug)
+
+    def _add(self, name: str, drug: Dict):
+        key = normalize_drug_name(name)
+        if not key:
+            return
+        self.exact.setdefault(key, drug)
+        if len(key) >= MIN_TYPO_KEY_LENGTH:
+            for variant in (key, *_deletions(key)):
+                # None marks a variant shared by different drugs
+                if self.typos.get(variant, drug) is not drug:
+                    self.typos[variant] = None
+                else:
+                    self.typos[variant] = drug
+
+    def _fuzzy(self, key: str) -> Optional[Dict]:
+        if len(key) < MIN_TYPO_KEY_LENGTH:
+            return None
+        for variant in (key, *_deletions(key)):
+            drug = self.typos.get(variant)
+            if drug is not None:
+                return drug
+        return None
+
+    def matches(self, name: str) -> List[Dict]:
+        """Every schedule entry a name refers to: exact hits for each run of words,
+        and a fuzzy hit for runs with no exact match"""
+        tokens = _tokens(name)[:MAX_QUERY_TOKENS]
+        found = []
+        for start in range(len(tokens)):
+            for end in range(len(tokens), start, -1):
+                key = "".join(tokens[start:end])
+                drug = self.exact.get(key) or self._fuzzy(key)
+                if drug is not None and drug not in found:
+                    found.append(drug)
+        return found
+
+    def lookup(self, name: str) -> Optional[Dict]:
+        """Most restrictive schedule entry among the medicines a name, brand or misspelling
+        refers to; None if unknown"""
+        return max(self.matches(name), key=_schedule_rank, default=None)
+
+    def check(self, medicine_name: str) -> Dict:
+        drug = self.lookup(medicine_name)
+        schedule = drug["schedule"] if drug else "OTC"
+        requires_rx = self.schedules[schedule]["prescription_required"]
+        return {
+            "medicine": medicine_name,
+            "prescription_required": requires_rx,
+            "schedule": drug["schedule"] if drug else None,
+            "generic": drug["generic"] if drug else None,
+            "category": self.schedules[schedule]["label"],
+            "message": "Upload prescription to proceed" if requires_rx else "Can be ordered without prescription"
+        }
+
+    def validate_cart(self, medicine_names: List[str]) -> Dict:
+        """Check a whole cart; one lookup per distinct name"""
+        checks = {}
+        for name in medicine_names:
+            if name not in checks:
+                checks[name] = self.check(name)
+        items = [checks[name] for name in medicine_names]
+        rx_items = [item["medicine"] for item in items if item["prescription_required"]]
+        return {
+            "items": items,
+            "prescription_required": bool(rx_items),
+            "prescription_items": rx_items,
+            "message": "Upload prescription to proceed" if rx_items else "Can be ordered without prescription"
+        }
+
+def load_drug_schedules(path: str = SCHEDULE_FILE) -> Dict:
+    # No fallback: without the dataset every medicine would pass as OTC, so a
+    # missing or corrupt file is an error (and nothing is cached until it loads)
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def _build_index(catalogue: Dict) -> DrugScheduleIndex:
+    return DrugScheduleIndex(load_drug_schedules(), catalogue)
+
+get_drug_schedule_index = cached_for_catalogue(_build_index)
@@ -0,0 +1,62 @@
+import math
+import re
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+EARTH_RADIUS_KM = 6371.0088
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance in km"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+def parse_eta_minutes(delivery_time: str) -> Optional[Tuple[int, int]]:
+    """'15-20 min' -> (15, 20), '2-4 hours' -> (120, 240)"""
+    match = re.match(r"\s*(\d+)\s*(?:-\s*(\d+))?\s*(min|minute|minutes|hour|hours|hr|hrs)\b", delivery_time or "")
+    if not match:
+        return None
+    low = int(match.group(1))
+    high = int(match.group(2) or low)
+    factor = 60 if match.group(3).startswith("h") else 1
+    return low * factor, high * factor
+
+class GridIndex:
+    """Uniform lat/lon grid for radius queries over many points"""
+
+    def __init__(self, cell_deg: float = 0.05):
+        self.cell_deg = cell_deg
+        self.cells: Dict[Tuple[int, int], List[Tuple[float, float, str]]] = defaultdict(list)
+
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        return int(math.floor(lat / self.cell_deg)), int(math.floor(lon / self.cell_deg))
+
+    def add(self, key: str, lat: float, lon: float):
+        self.cells[self._cell(lat, lon)].append((lat, lon, key))
+
+    def remove(self, key: str, lat: float, lon: float):
+        cell = self.cells.get(self._cell(lat, lon))
+        if cell:
+            cell[:] = [entry for entry in cell if entry[2] != key]
+
+    def within(self, lat: float, lon: float, radius_km: float) -> Iterable[Tuple[str, float]]:
+        """(key, distance_km) for every point within radius_km"""
+        lat_span = radius_km / 111.32
+        lon_span = radius_km / (111.32 * max(math.cos(math.radians(lat)), 1e-6))
+        min_row, min_col = self._cell(lat - lat_span, lon - lon_span)
+        max_row, max_col = self._cell(lat + lat_span, lon + lon_span)
+        box_cells = (max_row - min_row + 1) * (max_col - min_col + 1)
+        if box_cells > len(self.cells):
+            # A wide radius spans more cells than are occupied: scan the occupied ones instead
+            cells = [points for (row, col), points in self.cells.items()
+                     if min_row <= row <= max_row and min_col <= col <= max_col]
+        else:
+            cells = [self.cells.get((row, col), ()) for row in range(min_row, max_row + 1)
+                     for col in range(min_col, max_col + 1)]
+        for points in cells:
+            for point_lat, point_lon, key in points:
+                distance = haversine_km(lat, lon, point_lat, point_lon)
+                if distance <= radius_km:
+                    yield key, distance
@@ -0,0 +1,190 @@
+"""Load-test client for the pharmacy MCP server.
+
+Fires concurrent tools/call requests and reports p50/p99 latency per tool.
+
+    python -m src.mcp.load_test --transport stdio --requests 2000 --concurrency 50
+    python -m src.mcp.load_test --transport http --url http://127.0.0.1:8765/mcp
+
+With --transport stdio the server is started as a subprocess; with http it
+must already be running.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import os
+import random
+import sys
+import time
+from typing import Dict, List
+from urllib.parse import urlsplit
+
+SAMPLE_MEDICINES = ["Paracetamol", "Crocin", "Ibuprofen", "Cetirizine", "Omeprazole",
+                    "Loperamide", "Azithromycin", "Amoxicillin", "Dolo 650"]
+PHARMACY_IDS = ["ph_001", "ph_002", "ph_003", "ph_004"]
+
+def sample_call(rng: random.Random, order_ids: List[str]) -> Dict:
+    tool = rng.choice(["search_medicine", "place_order", "track_order", "check_prescription_required"])
+    medicine = rng.choice(SAMPLE_MEDICINES)
+    if tool == "place_order":
+        arguments = {"medicine": medicine, "pharmacy_id": rng.choice(PHARMACY_IDS), "quantity": rng.randint(1, 3)}
+    elif tool == "track_order":
+        arguments = {"order_id": rng.choice(order_ids)}
+    else:
+        arguments = {"medicine_name": medicine}
+    return {"name": tool, "arguments": arguments}
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile"""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+class StdioClient:
+    def __init__(self):
+        self.process = None
+        self.pending: Dict[int, asyncio.Future] = {}
+        self.ids = itertools.count(1)
+
+    async def start(self):
+        root = os.path.join(os.path.dirname(__file__), '..', '..')
+        self.process = await asyncio.create_subprocess_exec(
+            sys.executable, "-m", "src.mcp.server", "--transport", "stdio",
+            cwd=root, stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE,
+            limit=2 ** 22
+        )
+        self._reader = asyncio.create_task(self._read_loop())
+
+    async def _read_loop(self):
+        while True:
+            line = await self.process.stdout.readline()
+            if not line:
+                break
+            message = json.loads(line)
+            future = self.pending.pop(message.get("id"), None)
+            if future and not future.done():
+                future.set_result(message)
+
+    async def request(self, method: str, params: Dict = None) -> Dict:
+        msg_id = next(self.ids)
+        future = asyncio.get_running_loop().create_future()
+        self.pending[msg_id] = future
+        message = {"jsonrpc": "2.0", "id": msg_id, "method": method, "params": params or {}}
+        self.process.stdin.write((json.dumps(message) + "\n").encode("utf-8"))
+        await self.process.stdin.drain()
+        return await future
+
+    async def close(self):
+        self.process.stdin.close()
+        await self.process.wait()
+        self._reader.cancel()
+
+class HTTPClient:
+    """Keep-alive HTTP/1.1 connections to POST /mcp, one request at a time per connection"""
+
+    def __init__(self, url: str, connections: int):
+        parts = urlsplit(url)
+        self.host, self.port, self.path = parts.hostname, parts.port or 80, parts.path or "/mcp"
+        self.connections = connections
+        self.pool: asyncio.Queue = None
+        self.ids = itertools.count(1)
+
+    async def start(self):
+        self.pool = asyncio.Queue()
+        for _ in range(self.connections):
+            self.pool.put_nowait(await asyncio.open_connection(self.host, self.port))
+
+    async def request(self, method: str, params: Dict = None) -> Dict:
+        body = json.dumps({"jsonrpc": "2.0", "id": next(self.ids), "method": method,
+                           "params": params or {}}).encode("utf-8")
+        reader, writer = await self.pool.get()
+        try:
+            writer.write(
+                f"POST {self.path} HTTP/1.1\r\nHost: {self.host}\r\nContent-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n\r\n".encode("latin-1") + body
+            )
+            await writer.drain()
+            await reader.readline()
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                if name.strip().lower() == "content-length":
+                    length = int(value.strip())
+            return json.loads(await reader.readexactly(length))
+        finally:
+            self.pool.put_nowait((reader, writer))
+
+    async def close(self):
+        while not self.pool.empty():
+            _, writer = self.pool.get_nowait()
+            writer.close()
+
+async def run_load_test(client, total: int, concurrency: int, seed: int = 0) -> Dict[str, Dict]:
+    await client.start()
+    await client.request("initialize", {"protocolVersion": "2024-11-05", "capabilities": {},
+                                        "clientInfo": {"name": "load-test", "version": "1.0.0"}})
+    # Orders to track
+    order_ids = []
+    for pharmacy_id in PHARMACY_IDS:
+        response = await client.request("tools/call", {
+            "name": "place_order", "arguments": {"medicine": SAMPLE_MEDICINES[0], "pharmacy_id": pharmacy_id}
+        })
+        order_ids.append(response["result"]["structuredContent"]["result"]["order_id"])
+    rng = random.Random(seed)
+    calls = [sample_call(rng, order_ids) for _ in range(total)]
+    latencies: Dict[str, List[float]] = {}
+    errors: Dict[str, int] = {}
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(call: Dict):
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.request("tools/call", call)
+            elapsed = (time.perf_counter() - start) * 1000
+        latencies.setdefault(call["name"], []).append(elapsed)
+        if "error" in response or response.get("result", {}).get("isError"):
+            errors[call["name"]] = errors.get(call["name"], 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(call) for call in calls))
+    wall = time.perf_counter() - started
+    await client.close()
+
+    report = {
+        tool: {
+            "count": len(values),
+            "errors": errors.get(tool, 0),
+            "p50_ms": percentile(values, 50),
+            "p99_ms": percentile(values, 99)
+        }
+        for tool, values in sorted(latencies.items())
+    }
+    report["_total"] = {"count": total, "seconds": wall, "requests_per_second": total / wall if wall else 0.0}
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the pharmacy MCP server")
+    parser.add_argument("--transport", choices=["stdio", "http"], default="stdio")
+    parser.add_argument("--url", default="http://127.0.0.1:8765/mcp")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    client = StdioClient() if args.transport == "stdio" else HTTPClient(args.url, args.concurrency)
+    report = asyncio.run(run_load_test(client, args.requests, args.concurrency, args.seed))
+
+    total = report.pop("_total")
+    print(f"{'tool':<30}{'count':>8}{'errors':>8}{'p50 ms':>10}{'p99 ms':>10}")
+    for tool, stats in report.items():
+        print(f"{tool:<30}{stats['count']:>8}{stats['errors']:>8}{stats['p50_ms']:>10.2f}{stats['p99_ms']:>10.2f}")
+    print(f"\n{total['count']} requests in {total['seconds']:.2f}s ({total['requests_per_second']:.0f} req/s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""Order lifecycle: Confirmed → Preparing → Out for Delivery → Delivered.
+
+Each order gets a schedule when it is placed (stage times are fractions of
+the pharmacy's delivery ETA). A background ticker advances orders whose next
+stage is due; tracking also catches an order up on read, so the status is
+right even when no ticker is running.
+
+ORDER_SIMULATION_SPEED=60 makes one simulated minute pass every second.
+"""
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional
+
+from src.storage import local_db
+
+ORDER_STATES = [
+    ("confirmed", "Order Confirmed"),
+    ("preparing", "Pharmacy Preparing"),
+    ("out_for_delivery", "Out for Delivery"),
+    ("delivered", "Delivered"),
+]
+# When each stage is reached, as a fraction of the delivery ETA
+STAGE_FRACTIONS = (0.0, 0.2, 0.5, 1.0)
+DEFAULT_ETA_MINUTES = 120
+SIMULATION_SPEED = float(os.getenv("ORDER_SIMULATION_SPEED", "1"))
+DEFAULT_TICK_SECONDS = 5.0
+
+class OrderLifecycle:
+    def __init__(self, speed: float = SIMULATION_SPEED, clock: Callable[[], datetime] = datetime.now):
+        self.speed = speed
+        self.clock = clock
+        self._ticker: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def _eta(self, eta_minutes: int = None) -> timedelta:
+        return timedelta(minutes=eta_minutes or DEFAULT_ETA_MINUTES) / self.speed
+
+    def estimated_delivery(self, eta_minutes: int = None) -> datetime:
+        return self.clock() + self._eta(eta_minutes)
+
+    def create(self, order_id: str, pharmacy_id: str, eta_minutes: int = None) -> Dict:
+        """Persist a new confirmed order with its stage schedule"""
+        return local_db.add_order_tracking(self.new_tracking(order_id, pharmacy_id, eta_minutes))
+
+    def new_tracking(self, order_id: str, pharmacy_id: str, eta_minutes: int = None) -> Dict:
+        """Tracking record for a new confirmed order with its stage schedule (not yet stored)"""
+        now = self.clock()
+        eta = self._eta(eta_minutes)
+        timeline = [
+            {"state": state, "status": label, "due_at": (now + eta * fraction).isoformat(), "completed_at": None}
+            for (state, label), fraction in zip(ORDER_STATES, STAGE_FRACTIONS)
+        ]
+        timeline[0]["completed_at"] = timeline[0]["due_at"]
+        tracking = {
+            "order_id": order_id,
+            "pharmacy_id": pharmacy_id,
+            "state_index": 0,
+            "status": ORDER_STATES[0][0],
+            "created_at": now.isoformat(),
+            "updated_at": now.isoformat(),
+            "next_due_at": timeline[1]["due_at"],
+            "timeline": timeline
+        }
+        return tracking
+
+    @staticmethod
+    def _advanced(tracking: Dict, now: datetime) -> Optional[Dict]:
+        """tracking moved forward to the last stage due by `now`; None if no stage is due"""
+        timeline = [dict(stage) for stage in tracking["timeline"]]
+        index = tracking["state_index"]
+        now_iso = now.isoformat()
+        while index + 1 < len(timeline) and timeline[index + 1]["due_at"] <= now_iso:
+            index += 1
+            timeline[index]["completed_at"] = timeline[index]["due_at"]
+        if index == tracking["state_index"]:
+            return None
+        return dict(
+            tracking,
+            state_index=index,
+            status=timeline[index]["state"],
+            updated_at=timeline[index]["completed_at"],
+            next_due_at=timeline[index + 1]["due_at"] if index + 1 < len(timeline) else None,
+            timeline=timeline
+        )
+
+    def _catch_up(self, tracking: Dict, now: datetime) -> Dict:
+        """Advance a tracking record to the last stage due by `now`; persists only on change"""
+        if self._advanced(tracking, now) is None:
+            return tracking
+        delivered = []
+
+        def apply(current: Optional[Dict]) -> Optional[Dict]:
+            # Recomputed from the stored record, so a stale `tracking` (read before
+            # the ticker or another reader advanced it) can never move it backwards
+            if current is None:
+                return None
+            updated = self._advanced(current, now)
+            if updated is not None and updated["next_due_at"] is None:
+                delivered.append(updated)
+            return updated
+
+        updated = local_db.modify_order_tracking(tracking["order_id"], apply) or tracking
+        # Only the transaction that reached the last stage marks the order delivered
+        if delivered and updated.get("local_order_id"):
+            local_db.update_order_status(updated["local_order_id"], "delivered")
+        return updated
+
+    def advance(self, order_id: str) -> Optional[Dict]:
+        tracking = local_db.get_order_tracking(order_id)
+        if tracking is None:
+            return None
+        return self._catch_up(tracking, self.clock())
+
+    def tick(self) -> int:
+        """Advance every order with a stage due now; returns how many were due"""
+        now = self.clock()
+        due = local_db.get_due_order_tracking(now.isoformat())
+        for tracking in due:
+            self._catch_up(tracking, now)
+        return len(due)
+
+    def _run(self, interval: float):
+        while not self._stop.wait(interval):
+            try:
+                self.tick()
+            except Exception as e:
+                print(f"⚠️ Order ticker error: {e}")
+
+    def start_ticker(self, interval: float = DEFAULT_TICK_SECONDS):
+        """Start the background ticker thread (no-op if already running)"""
+        if self._ticker and self._ticker.is_alive():
+            return
+        self._stop.clear()
+        self._ticker = threading.Thread(target=self._run, args=(interval,), name="order-ticker", daemon=True)
+        self._ticker.start()
+
+    def stop_ticker(self):
+        self._stop.set()
+        if self._ticker:
+            self._ticker.join()
+            self._ticker = None
+
+    def track(self, order_id: str) -> Optional[Dict]:
+        """Tracking view used by PharmacyMCPServer.track_order"""
+        tracking = self.advance(order_id)
+        if tracking is None:
+            return None
+        current = tracking["timeline"][tracking["state_index"]]
+        return {
+            "order_id": order_id,
+            "status": current["status"],
+            "last_updated": _clock_time(tracking["updated_at"]),
+            "timeline": [
+                {
+                    "status": step["status"],
+                    "time": _clock_time(step["completed_at"] or step["due_at"]),
+                    "completed": step["completed_at"] is not None
+                }
+                for step in tracking["timeline"]
+            ]
+        }
+
+def _clock_time(iso: str) -> str:
+    return datetime.fromisoformat(iso).strftime("%I:%M %p")
@@ -1,10 +1,158 @@
-from typing import Dict, List
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+import heapq
+import json
+import os
 import random
-from datetime import datetime, timedelta
+import time
+
+from src.mcp.drug_schedule import get_drug_schedule_index
+from src.mcp.geo import GridIndex, parse_eta_minutes
+from src.mcp.order_lifecycle import OrderLifecycle
+from src.storage.local_db import (
+    add_order_tracking, add_order_tracking_operation, claim_idempotency_key, get_medicine_database, new_id
+)
+
+INVENTORY_FILE = os.path.join("data", "pharmacy_inventory.json")
+
+# Used when the caller gives no location
+DEFAULT_LOCATION = (19.0760, 72.8777)
+DEFAULT_SEARCH_RADIUS_KM = 10.0
+DEFAULT_STREAM_DEADLINE = 10.0
+
+# search_nearby ranks by total cost in rupees, pricing distance and waiting time
+RUPEES_PER_KM = 10.0
+RUPEES_PER_ETA_MINUTE = 1.0
+
+def normalize_medicine_name(name: str) -> str:
+    return " ".join(name.lower().split())
+
+class InventoryModel:
+    """Deterministic price, stock and discount per (pharmacy, medicine).
+
+    Entries are generated from a random source seeded per medicine and per
+    pharmacy, so the same seed always yields the same inventory. Known
+    catalogue names are precomputed; other names are generated on first
+    lookup and memoized. Pass rng_factory to drive simulations from a
+    different random source.
+    """
+
+    def __init__(self, pharmacy_ids: List[str], seed: int = 0,
+                 rng_factory: Callable[[str], random.Random] = None,
+                 medicine_names: List[str] = None):
+        self.pharmacy_ids = list(pharmacy_ids)
+        self._known_ids = set(self.pharmacy_ids)
+        self.seed = seed
+        self.rng_factory = rng_factory or (lambda key: random.Random(f"{self.seed}:{key}"))
+        self.table: Dict[Tuple[str, str], Dict] = {}
+        self._base_prices: Dict[str, int] = {}
+        for name in medicine_names or []:
+            self.stock_for(name)
+
+    def add_pharmacy(self, pharmacy_id: str):
+        if pharmacy_id not in self._known_ids:
+            self._known_ids.add(pharmacy_id)
+            self.pharmacy_ids.append(pharmacy_id)
+
+    def _generate(self, pharmacy_id: str, medicine_key: str) -> Dict:
+        base_price = self._base_prices.get(medicine_key)
+        if base_price is None:
+            base_price = self.rng_factory(medicine_key).randint(50, 500)
+            self._base_prices[medicine_key] = base_price
+        rng = self.rng_factory(f"{pharmacy_id}:{medicine_key}")
+        entry = {
+            "price": int(base_price * rng.uniform(0.8, 1.2)),
+            "in_stock": rng.choice([True, True, True, False]),
+            "quantity_available": rng.randint(5, 50),
+            "discount": rng.choice([0, 5, 10, 15])
+        }
+        self.table[(pharmacy_id, medicine_key)] = entry
+        return entry
+
+    def lookup(self, pharmacy_id: str, medicine_name: str) -> Optional[Dict]:
+        key = normalize_medicine_name(medicine_name)
+        entry = self.table.get((pharmacy_id, key))
+        if entry is None and pharmacy_id in self._known_ids:
+            entry = self._generate(pharmacy_id, key)
+        return entry
+
+    def stock_for(self, medicine_name: str) -> Dict[str, Dict]:
+        """Inventory entries for every pharmacy, keyed by pharmacy id"""
+        return {pid: self.lookup(pid, medicine_name) for pid in self.pharmacy_ids}
+
+    def save(self, path: str = INVENTORY_FILE):
+        rows = [dict(entry, pharmacy_id=pid, medicine=medicine) for (pid, medicine), entry in self.table.items()]
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"seed": self.seed, "entries": rows}, f, indent=2, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path: str, pharmacy_ids: List[str]) -> "InventoryModel":
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        model = cls(pharmacy_ids, seed=data.get("seed", 0))
+        for row in data.get("entries", []):
+            row = dict(row)
+            key = (row.pop("pharmacy_id"), normalize_medicine_name(row.pop("medicine")))
+            model.table[key] = row
+        return model
+
+def _catalogue_medicine_names() -> List[str]:
+    try:
+        catalogue = get_medicine_database()
+    except Exception:
+        return []
+    names = []
+    for medicines in catalogue.values():
+        for med in medicines:
+            names.append(med["name"])
+            names.extend(med.get("brands", []))
+    return names
 
 class PharmacyMCPServer:
-    def __init__(self):
-        self.pharmacies = self._initialize_pharmacies()
+    def __init__(self, seed: int = 0, rng_factory: Callable[[str], random.Random] = None,
+                 inventory: InventoryModel = None, lifecycle: OrderLifecycle = None):
+        self.pharmacies = []
+        self.pharmacy_index: Dict[str, Dict] = {}
+        self.geo_index = GridIndex()
+        self.online_pharmacies: List[Dict] = []
+        self._search_cache: Dict[tuple, List[Dict]] = {}
+        for pharmacy in self._initialize_pharmacies():
+            self._index_pharmacy(pharmacy)
+        
+        pharmacy_ids = [p['id'] for p in self.pharmacies]
+        if inventory is None:
+            if rng_factory is None and os.path.exists(INVENTORY_FILE):
+                inventory = InventoryModel.load(INVENTORY_FILE, pharmacy_ids)
+            else:
+                inventory = InventoryModel(pharmacy_ids, seed, rng_factory, _catalogue_medicine_names())
+        self.inventory = inventory
+        self.lifecycle = lifecycle or OrderLifecycle()
+    
+    def _index_pharmacy(self, pharmacy: Dict):
+        eta = parse_eta_minutes(pharmacy.get('delivery_time', ''))
+        pharmacy.setdefault('eta_minutes', eta[1] if eta else None)
+        self.pharmacies.append(pharmacy)
+        self.pharmacy_index[pharmacy['id']] = pharmacy
+        if pharmacy.get('lat') is None or pharmacy.get('lon') is None:
+            self.online_pharmacies.append(pharmacy)
+        else:
+            self.geo_index.add(pharmacy['id'], pharmacy['lat'], pharmacy['lon'])
+    
+    def add_pharmacies(self, pharmacies: List[Dict]):
+        """Register more stores; those with lat/lon go into the spatial index"""
+        for pharmacy in pharmacies:
+            if pharmacy['id'] in self.pharmacy_index:
+                continue
+            self._index_pharmacy(pharmacy)
+            self.inventory.add_pharmacy(pharmacy['id'])
+        self._search_cache.clear()
+    
+    def get_pharmacy(self, pharmacy_id: str) -> Optional[Dict]:
+        return self.pharmacy_index.get(pharmacy_id)
+    
+    def pharmacies_near(self, lat: float, lon: float, radius_km: float) -> List[Tuple[Dict, Optional[float]]]:
+        """(pharmacy, distance_km) for stores in range, plus online pharmacies (distance None)"""
+        nearby = [(self.pharmacy_index[pid], distance) for pid, distance in self.geo_index.within(lat, lon, radius_km)]
+        return nearby + [(pharmacy, None) for pharmacy in self.online_pharmacies]
     
     def _initialize_pharmacies(self) -> List[Dict]:
         return [
@@ -13,6 +161,8 @@ class PharmacyMCPServer:
                 "name": "Apollo Pharmacy",
                 "location": "Near You",
                 "distance": "0.5 km",
+                "lat": 19.0795,
+                "lon": 72.8800,
                 "rating": 4.5,
                 "delivery_time": "15-20 min",
                 "delivery_fee": 0
@@ -22,6 +172,8 @@ class PharmacyMCPServer:
                 "name": "MedPlus",
                 "location": "City Center",
                 "distance": "1.2 km",
+                "lat": 19.0868,
+                "lon": 72.8777,
                 "rating": 4.3,
                 "delivery_time": "25-30 min",
                 "delivery_fee": 20
@@ -31,6 +183,8 @@ class PharmacyMCPServer:
                 "name": "1mg",
                 "location": "Online",
                 "distance": "N/A",
+                "lat": None,
+                "lon": None,
                 "rating": 4.7,
                 "delivery_time": "60-90 min",
                 "delivery_fee": 0
@@ -40,75 +194,125 @@ class PharmacyMCPServer:
                 "name": "PharmEasy",
                 "location": "Online",
                 "distance": "N/A",
+                "lat": None,
+                "lon": None,
                 "rating": 4.6,
                 "delivery_time": "2-4 hours",
                 "delivery_fee": 0
             }
         ]
     
-    def search_medicine(self, medicine_name: str) -> List[Dict]:
-        results = []
-        base_price = random.randint(50, 500)
-        
-        for pharmacy in self.pharmacies:
-            price_variation = random.uniform(0.8, 1.2)
-            price = int(base_price * price_variation)
-            
-            results.append({
+    def _offers(self, medicine_name: str, lat: float, lon: float, radius_km: float) -> Iterator[Dict]:
+        for pharmacy, distance_km in self.pharmacies_near(lat, lon, radius_km):
+            entry = self.inventory.lookup(pharmacy['id'], medicine_name)
+            yield {
                 "pharmacy": pharmacy,
                 "medicine_name": medicine_name,
-                "price": price,
-                "in_stock": random.choice([True, True, True, False]),
-                "quantity_available": random.randint(5, 50),
-                "discount": random.choice([0, 5, 10, 15])
-            })
+                "distance_km": distance_km,
+                **entry
+            }
+    
+    def stream_search(self, medicine_name: str, lat: float = None, lon: float = None,
+                      radius_km: float = DEFAULT_SEARCH_RADIUS_KM,
+                      deadline: float = DEFAULT_STREAM_DEADLINE) -> Iterator[Dict]:
+        """Yield each pharmacy's offer as soon as it is ready, stopping at the deadline (seconds)"""
+        if lat is None or lon is None:
+            lat, lon = DEFAULT_LOCATION
+        stop_at = time.monotonic() + deadline
+        for offer in self._offers(medicine_name, lat, lon, radius_km):
+            if time.monotonic() > stop_at:
+                return
+            yield offer
+    
+    def search_medicine(self, medicine_name: str, lat: float = None, lon: float = None,
+                        radius_km: float = DEFAULT_SEARCH_RADIUS_KM) -> List[Dict]:
+        # Only stores within radius_km (via the spatial index) plus online pharmacies
+        if lat is None or lon is None:
+            lat, lon = DEFAULT_LOCATION
+        
+        # Inventory is deterministic, so results can be cached per query
+        key = (medicine_name, lat, lon, radius_km)
+        cached = self._search_cache.get(key)
+        if cached is not None:
+            return list(cached)
         
-        return sorted(results, key=lambda x: x['price'])
+        results = sorted(self._offers(medicine_name, lat, lon, radius_km), key=lambda x: x['price'])
+        if len(self._search_cache) > 4096:
+            self._search_cache.clear()
+        self._search_cache[key] = results
+        return list(results)
     
-    def place_order(self, medicine: str, pharmacy_id: str, quantity: int = 1) -> Dict:
-        pharmacy = next((p for p in self.pharmacies if p['id'] == pharmacy_id), None)
+    def search_nearby(self, lat: float, lon: float, radius_km: float, medicine: str,
+                      k: int = 5, include_online: bool = True) -> List[Dict]:
+        """The k best in-stock offers near (lat, lon), ranked by distance, price and ETA.
+        
+        Each offer's rank_cost is the discounted price plus delivery fee, plus
+        RUPEES_PER_KM per km and RUPEES_PER_ETA_MINUTE per minute of ETA.
+        """
+        offers = []
+        for pharmacy, distance_km in self.pharmacies_near(lat, lon, radius_km):
+            if distance_km is None and not include_online:
+                continue
+            entry = self.inventory.lookup(pharmacy['id'], medicine)
+            if not entry or not entry['in_stock']:
+                continue
+            final_price = int(entry['price'] * (1 - entry['discount'] / 100)) + pharmacy['delivery_fee']
+            eta = pharmacy.get('eta_minutes') or 0
+            cost = final_price + RUPEES_PER_KM * (distance_km or 0) + RUPEES_PER_ETA_MINUTE * eta
+            offers.append({
+                "pharmacy": pharmacy,
+                "medicine_name": medicine,
+                "distance_km": distance_km,
+                "final_price": final_price,
+                "eta_minutes": eta,
+                "rank_cost": round(cost, 2),
+                **entry
+            })
+        return heapq.nsmallest(k, offers, key=lambda offer: (offer['rank_cost'], offer['pharmacy']['id']))
+    
+    def place_order(self, medicine: str, pharmacy_id: str, quantity: int = 1,
+                    idempotency_key: str = None) -> Dict:
+        """Place an order; a repeated idempotency_key returns the original order instead"""
+        pharmacy = self.pharmacy_index.get(pharmacy_id)
         
         if not pharmacy:
             return {"error": "Pharmacy not found"}
         
+        order_id = new_id("ORD")
+        estimated_delivery = self.lifecycle.estimated_delivery(pharmacy.get('eta_minutes'))
         order = {
-            "order_id": f"ORD{random.randint(10000, 99999)}",
+            "order_id": order_id,
             "medicine": medicine,
             "quantity": quantity,
             "pharmacy": pharmacy['name'],
             "delivery_time": pharmacy['delivery_time'],
             "delivery_fee": pharmacy['delivery_fee'],
             "status": "confirmed",
-            "estimated_delivery": (datetime.now() + timedelta(hours=2)).strftime("%I:%M %p")
+            "estimated_delivery": estimated_delivery.strftime("%I:%M %p")
         }
         
+        tracking = self.lifecycle.new_tracking(order_id, pharmacy_id, pharmacy.get('eta_minutes'))
+        if idempotency_key:
+            # The tracking record is stored with the claim, so a claimed order is always trackable
+            claimed = claim_idempotency_key("place_order", idempotency_key, order,
+                                            writes=[add_order_tracking_operation(tracking)])
+            if claimed["order_id"] != order_id:
+                return claimed
+        else:
+            add_order_tracking(tracking)
         return order
     
     def track_order(self, order_id: str) -> Dict:
-        statuses = ["Order Confirmed", "Pharmacy Preparing", "Out for Delivery", "Delivered"]
-        current_status = random.choice(statuses)
-        
-        return {
-            "order_id": order_id,
-            "status": current_status,
-            "last_updated": datetime.now().strftime("%I:%M %p"),
-            "timeline": [
-                {"status": "Order Confirmed", "time": "10:30 AM", "completed": True},
-                {"status": "Pharmacy Preparing", "time": "10:45 AM", "completed": current_status != "Order Confirmed"},
-                {"status": "Out for Delivery", "time": "11:15 AM", "completed": current_status in ["Out for Delivery", "Delivered"]},
-                {"status": "Delivered", "time": "12:00 PM", "completed": current_status == "Delivered"}
-            ]
-        }
+        tracking = self.lifecycle.track(order_id)
+        if tracking is None:
+            return {"error": "Order not found"}
+        return tracking
     
     def check_prescription_required(self, medicine_name: str) -> Dict:
-        rx_keywords = ["antibiotic", "azithromycin", "amoxicillin", "steroid", "prednis"]
-        requires_rx = any(keyword in medicine_name.lower() for keyword in rx_keywords)
-        
-        return {
-            "medicine": medicine_name,
-            "prescription_required": requires_rx,
-            "category": "Prescription Medicine" if requires_rx else "Over-the-Counter (OTC)",
-            "message": "Upload prescription to proceed" if requires_rx else "Can be ordered without prescription"
-        }
+        return get_drug_schedule_index().check(medicine_name)
+    
+    def validate_cart(self, medicines: List[str]) -> Dict:
+        """Prescription check for every medicine in a cart"""
+        return get_drug_schedule_index().validate_cart(medicines)
 
 pharmacy_mcp = PharmacyMCPServer()
\ No newline at end of file
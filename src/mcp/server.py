@@ -0,0 +1,382 @@
+"""MCP transport for the pharmacy tools.
+
+Serves PharmacyMCPServer's tools as Model Context Protocol JSON-RPC over:
+- stdio: one JSON message per line on stdin/stdout;
+- HTTP: `POST /mcp` answers JSON-RPC directly, and `GET /sse` plus
+  `POST /messages?session_id=...` implement the HTTP+SSE transport.
+
+Every request is dispatched as its own asyncio task and tool calls run in
+worker threads, so slow tools do not hold up other clients.
+
+    python -m src.mcp.server --transport stdio
+    python -m src.mcp.server --transport http --port 8765
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import uuid
+from typing import Callable, Dict, Optional
+from urllib.parse import parse_qs, urlsplit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.mcp.pharmacy_server import PharmacyMCPServer, pharmacy_mcp
+
+PROTOCOL_VERSION = "2024-11-05"
+SERVER_INFO = {"name": "pharmacy-mcp", "version": "1.0.0"}
+
+# JSON-RPC error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+
+TOOLS = [
+    {
+        "name": "search_medicine",
+        "description": "Search pharmacies for a medicine and compare price, stock and discount",
+        "inputSchema": {
+            "type": "object",
+            "properties": {"medicine_name": {"type": "string"}},
+            "required": ["medicine_name"]
+        }
+    },
+    {
+        "name": "search_nearby",
+        "description": "Best in-stock offers near a location, ranked by distance, price and delivery time",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "lat": {"type": "number"},
+                "lon": {"type": "number"},
+                "radius_km": {"type": "number"},
+                "medicine": {"type": "string"},
+                "k": {"type": "integer", "minimum": 1}
+            },
+            "required": ["lat", "lon", "radius_km", "medicine"]
+        }
+    },
+    {
+        "name": "place_order",
+        "description": "Place an order for a medicine at a pharmacy",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "medicine": {"type": "string"},
+                "pharmacy_id": {"type": "string"},
+                "quantity": {"type": "integer", "minimum": 1},
+                "idempotency_key": {"type": "string", "description": "Retries with the same key return the original order"}
+            },
+            "required": ["medicine", "pharmacy_id"]
+        }
+    },
+    {
+        "name": "track_order",
+        "description": "Get the delivery status and timeline of an order",
+        "inputSchema": {
+            "type": "object",
+            "properties": {"order_id": {"type": "string"}},
+            "required": ["order_id"]
+        }
+    },
+    {
+        "name": "check_prescription_required",
+        "description": "Check whether a medicine needs a prescription",
+        "inputSchema": {
+            "type": "object",
+            "properties": {"medicine_name": {"type": "string"}},
+            "required": ["medicine_name"]
+        }
+    },
+    {
+        "name": "validate_cart",
+        "description": "Check which medicines in a cart need a prescription",
+        "inputSchema": {
+            "type": "object",
+            "properties": {"medicines": {"type": "array", "items": {"type": "string"}}},
+            "required": ["medicines"]
+        }
+    }
+]
+
+_JSON_TYPES = {
+    "string": (str,),
+    "number": (int, float),
+    "integer": (int,),
+    "boolean": (bool,),
+    "array": (list,),
+    "object": (dict,)
+}
+
+def _check_value(schema: Dict, value, path: str) -> Optional[str]:
+    expected = schema.get("type")
+    if expected:
+        # bool is an int subclass but not a JSON number
+        if not isinstance(value, _JSON_TYPES[expected]) or (expected != "boolean" and isinstance(value, bool)):
+            return f"{path} must be of type {expected}"
+    if "minimum" in schema and value < schema["minimum"]:
+        return f"{path} must be at least {schema['minimum']}"
+    if "maximum" in schema and value > schema["maximum"]:
+        return f"{path} must be at most {schema['maximum']}"
+    if expected == "array" and "items" in schema:
+        for i, item in enumerate(value):
+            error = _check_value(schema["items"], item, f"{path}[{i}]")
+            if error:
+                return error
+    return None
+
+def validate_arguments(schema: Dict, arguments) -> Optional[str]:
+    """Check tool arguments against its inputSchema; returns the first problem, or None"""
+    if not isinstance(arguments, dict):
+        return "arguments must be an object"
+    properties = schema.get("properties", {})
+    missing = [name for name in schema.get("required", []) if name not in arguments]
+    if missing:
+        return f"missing required argument(s): {', '.join(missing)}"
+    for name, value in arguments.items():
+        if name not in properties:
+            return f"unexpected argument: {name}"
+        error = _check_value(properties[name], value, name)
+        if error:
+            return error
+    return None
+
+class MCPDispatcher:
+    """Routes JSON-RPC messages to PharmacyMCPServer tools"""
+
+    def __init__(self, pharmacy: PharmacyMCPServer = None):
+        self.pharmacy = pharmacy or pharmacy_mcp
+        self.tools: Dict[str, Callable] = {tool["name"]: getattr(self.pharmacy, tool["name"]) for tool in TOOLS}
+        self.schemas: Dict[str, Dict] = {tool["name"]: tool["inputSchema"] for tool in TOOLS}
+
+    @staticmethod
+    def _error(msg_id, code: int, message: str) -> Dict:
+        return {"jsonrpc": "2.0", "id": msg_id, "error": {"code": code, "message": message}}
+
+    async def _call_tool(self, params: Dict) -> Dict:
+        name = params.get("name")
+        if name not in self.tools:
+            raise KeyError(name)
+        arguments = params.get("arguments") or {}
+        error = validate_arguments(self.schemas[name], arguments)
+        if error:
+            return {"content": [{"type": "text", "text": f"Invalid arguments: {error}"}], "isError": True}
+        # Anything raised by the tool itself is an internal error, reported by handle()
+        result = await asyncio.to_thread(self.tools[name], **arguments)
+        is_error = isinstance(result, dict) and "error" in result
+        return {
+            "content": [{"type": "text", "text": json.dumps(result, ensure_ascii=False)}],
+            "structuredContent": {"result": result},
+            "isError": is_error
+        }
+
+    async def handle(self, message) -> Optional[Dict]:
+        """Handle one JSON-RPC message; returns None for notifications"""
+        if not isinstance(message, dict) or message.get("jsonrpc") != "2.0" or "method" not in message:
+            return self._error(message.get("id") if isinstance(message, dict) else None,
+                               INVALID_REQUEST, "Invalid request")
+        msg_id = message.get("id")
+        method = message["method"]
+        params = message.get("params") or {}
+        is_notification = "id" not in message
+
+        try:
+            if method == "initialize":
+                result = {
+                    "protocolVersion": PROTOCOL_VERSION,
+                    "capabilities": {"tools": {"listChanged": False}},
+                    "serverInfo": SERVER_INFO
+                }
+            elif method == "ping":
+                result = {}
+            elif method == "tools/list":
+                result = {"tools": TOOLS}
+            elif method == "tools/call":
+                try:
+                    result = await self._call_tool(params)
+                except KeyError:
+                    return self._error(msg_id, INVALID_PARAMS, f"Unknown tool: {params.get('name')}")
+            elif method.startswith("notifications/"):
+                return None
+            else:
+                return None if is_notification else self._error(msg_id, METHOD_NOT_FOUND, f"Method not found: {method}")
+        except Exception as e:
+            return None if is_notification else self._error(msg_id, INTERNAL_ERROR, str(e))
+
+        return None if is_notification else {"jsonrpc": "2.0", "id": msg_id, "result": result}
+
+    async def handle_raw(self, raw: str) -> Optional[str]:
+        try:
+            message = json.loads(raw)
+        except json.JSONDecodeError:
+            return json.dumps(self._error(None, PARSE_ERROR, "Parse error"))
+        if isinstance(message, list):
+            responses = await asyncio.gather(*(self.handle(m) for m in message))
+            responses = [r for r in responses if r is not None]
+            return json.dumps(responses, ensure_ascii=False) if responses else None
+        response = await self.handle(message)
+        return json.dumps(response, ensure_ascii=False) if response is not None else None
+
+# stdio transport
+async def serve_stdio(dispatcher: MCPDispatcher, output=None):
+    """Serve JSON-RPC lines from stdin, writing responses to `output` (default stdout).
+
+    Nothing else may be written to `output`: main() points sys.stdout at stderr
+    so diagnostics printed anywhere in the app stay out of the protocol stream.
+    """
+    output = output or sys.stdout
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader(limit=2 ** 22)
+    await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+    write_lock = asyncio.Lock()
+    pending = set()
+
+    async def respond(line: str):
+        response = await dispatcher.handle_raw(line)
+        if response is not None:
+            async with write_lock:
+                output.write(response + "\n")
+                output.flush()
+
+    while True:
+        line = await reader.readline()
+        if not line:
+            break
+        line = line.decode("utf-8").strip()
+        if line:
+            task = asyncio.create_task(respond(line))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+
+    if pending:
+        await asyncio.gather(*pending)
+
+# HTTP transport
+class HTTPTransport:
+    def __init__(self, dispatcher: MCPDispatcher):
+        self.dispatcher = dispatcher
+        self.sessions: Dict[str, asyncio.Queue] = {}
+
+    @staticmethod
+    async def _read_request(reader: asyncio.StreamReader):
+        request_line = await reader.readline()
+        if not request_line:
+            return None
+        method, target, _ = request_line.decode("latin-1").split(" ", 2)
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        length = int(headers.get("content-length", 0))
+        body = await reader.readexactly(length) if length else b""
+        return method, target, headers, body
+
+    @staticmethod
+    def _response(status: str, body: bytes = b"", content_type: str = "application/json",
+                  keep_alive: bool = True) -> bytes:
+        headers = [
+            f"HTTP/1.1 {status}",
+            f"Content-Type: {content_type}",
+            f"Content-Length: {len(body)}",
+            "Connection: keep-alive" if keep_alive else "Connection: close"
+        ]
+        return ("\r\n".join(headers) + "\r\n\r\n").encode("latin-1") + body
+
+    async def _stream_sse(self, writer: asyncio.StreamWriter):
+        session_id = uuid.uuid4().hex
+        queue = asyncio.Queue()
+        self.sessions[session_id] = queue
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+                     b"Cache-Control: no-cache\r\nConnection: keep-alive\r\n\r\n")
+        writer.write(f"event: endpoint\ndata: /messages?session_id={session_id}\n\n".encode())
+        await writer.drain()
+        try:
+            while True:
+                message = await queue.get()
+                writer.write(f"event: message\ndata: {message}\n\n".encode("utf-8"))
+                await writer.drain()
+        finally:
+            self.sessions.pop(session_id, None)
+
+    async def _post_to_session(self, queue: asyncio.Queue, body: str):
+        response = await self.dispatcher.handle_raw(body)
+        if response is not None:
+            await queue.put(response)
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+                method, target, headers, body = request
+                url = urlsplit(target)
+
+                if method == "POST" and url.path == "/mcp":
+                    response = await self.dispatcher.handle_raw(body.decode("utf-8"))
+                    if response is None:
+                        writer.write(self._response("202 Accepted"))
+                    else:
+                        writer.write(self._response("200 OK", response.encode("utf-8")))
+                elif method == "GET" and url.path == "/sse":
+                    await self._stream_sse(writer)
+                    break
+                elif method == "POST" and url.path == "/messages":
+                    session_id = parse_qs(url.query).get("session_id", [None])[0]
+                    queue = self.sessions.get(session_id)
+                    if queue is None:
+                        writer.write(self._response("404 Not Found", b'{"error": "Unknown session"}'))
+                    else:
+                        asyncio.create_task(self._post_to_session(queue, body.decode("utf-8")))
+                        writer.write(self._response("202 Accepted"))
+                else:
+                    writer.write(self._response("404 Not Found", b'{"error": "Not found"}'))
+                await writer.drain()
+
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+async def serve_http(dispatcher: MCPDispatcher, host: str = "127.0.0.1", port: int = 8765,
+                     ready: asyncio.Event = None):
+    transport = HTTPTransport(dispatcher)
+    server = await asyncio.start_server(transport.handle_connection, host, port)
+    print(f"✅ Pharmacy MCP server listening on http://{host}:{port}", file=sys.stderr)
+    if ready:
+        ready.set()
+    async with server:
+        await server.serve_forever()
+
+def main():
+    parser = argparse.ArgumentParser(description="Pharmacy MCP server")
+    parser.add_argument("--transport", choices=["stdio", "http"], default="stdio")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    protocol_out = sys.stdout
+    if args.transport == "stdio":
+        # stdout carries the JSON-RPC frames; every print goes to stderr instead
+        sys.stdout = sys.stderr
+
+    dispatcher = MCPDispatcher()
+    dispatcher.pharmacy.lifecycle.start_ticker()
+    try:
+        if args.transport == "stdio":
+            asyncio.run(serve_stdio(dispatcher, protocol_out))
+        else:
+            asyncio.run(serve_http(dispatcher, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
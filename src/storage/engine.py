@@ -0,0 +1,441 @@
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+from contextlib import ExitStack, contextmanager
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to the in-process lock only
+    fcntl = None
+
+# Collection name -> document fields mirrored into indexed columns.
+# "status_default" is used when a document lacks the status field.
+DEFAULT_INDEXES = {
+    "health_records": {"timestamp": "timestamp", "status": "severity"},
+    "orders": {"timestamp": "order_date", "status": "status"},
+    "reminders": {"timestamp": "created_at", "status": "active", "status_default": True},
+    "order_tracking": {"timestamp": "next_due_at", "status": "status"},
+    "idempotency_keys": {"timestamp": "expires_at", "status": "scope"},
+    "adherence_events": {"timestamp": "day", "status": "reminder_id"},
+    "adherence_stats": {"timestamp": "updated_at", "status": "reminder_id"},
+    "collection_stats": {"timestamp": "updated_at", "status": "id"},
+}
+
+class StorageEngine:
+    """Document store for the app's collections, indexed by id, timestamp and status"""
+
+    def __init__(self, indexes: Dict[str, Dict[str, str]] = None):
+        self.indexes = dict(DEFAULT_INDEXES if indexes is None else indexes)
+
+    def _index_fields(self, collection: str) -> Dict[str, str]:
+        return self.indexes.get(collection, {"timestamp": "timestamp", "status": "status"})
+
+    def _status_of(self, collection: str, doc: Dict) -> Any:
+        fields = self._index_fields(collection)
+        return doc.get(fields["status"], fields.get("status_default"))
+
+    def insert(self, collection: str, doc: Dict) -> Dict:
+        raise NotImplementedError
+
+    def insert_unique(self, collection: str, doc: Dict, replace_before: str = None) -> Dict:
+        """Atomically insert doc unless its id exists; returns the stored document.
+
+        An existing document whose timestamp is before `replace_before` is replaced.
+        """
+        raise NotImplementedError
+
+    def get(self, collection: str, doc_id: str) -> Optional[Dict]:
+        raise NotImplementedError
+
+    def get_many(self, collection: str, doc_ids: List[str]) -> Dict[str, Dict]:
+        """Documents by id; missing ids are left out"""
+        docs = {doc_id: self.get(collection, doc_id) for doc_id in set(doc_ids)}
+        return {doc_id: doc for doc_id, doc in docs.items() if doc is not None}
+
+    def update(self, collection: str, doc_id: str, changes: Dict) -> Optional[Dict]:
+        raise NotImplementedError
+
+    def modify(self, collection: str, doc_id: str,
+               apply: Callable[[Optional[Dict]], Optional[Dict]]) -> Optional[Dict]:
+        """Atomically replace a document (or create it) with apply(current); returns the stored document.
+
+        `current` is None when the id does not exist; if apply returns None nothing is written.
+        """
+        return self.modify_many([(collection, doc_id, apply)])[0]
+
+    def modify_many(self, operations: List[Tuple[str, str, Callable[[Optional[Dict]], Optional[Dict]]]]
+                    ) -> List[Optional[Dict]]:
+        """Several modify() calls as one transaction, applied in order; returns each stored document.
+
+        Either every change is written or, if an apply raises, none is.
+        """
+        raise NotImplementedError
+
+    def find(self, collection: str, status: Any = None, since: str = None, until: str = None,
+             newest_first: bool = False, limit: int = None) -> List[Dict]:
+        """Documents in insertion order (or newest first), optionally filtered"""
+        raise NotImplementedError
+
+    def count(self, collection: str, status: Any = None) -> int:
+        raise NotImplementedError
+
+    def count_by_status(self, collection: str) -> Dict[Any, int]:
+        """Number of documents per status value"""
+        raise NotImplementedError
+
+    def purge(self, collection: str, until: str) -> int:
+        """Delete documents whose timestamp is before `until`; returns how many"""
+        raise NotImplementedError
+
+class JSONStorageEngine(StorageEngine):
+    """Original layout: one JSON array per collection, rewritten on every write.
+
+    Read-modify-write cycles hold an exclusive lock on `<collection>.json.lock`
+    and the file is replaced atomically, so concurrent writers never lose updates.
+    """
+
+    def __init__(self, data_dir: str, indexes: Dict[str, Dict[str, str]] = None):
+        super().__init__(indexes)
+        self.data_dir = data_dir
+        self._lock = threading.RLock()
+
+    def _path(self, collection: str) -> str:
+        return os.path.join(self.data_dir, f"{collection}.json")
+
+    def _load(self, collection: str) -> List[Dict]:
+        path = self._path(collection)
+        if not os.path.exists(path):
+            return []
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except json.JSONDecodeError:
+            return []
+
+    def _save(self, collection: str, docs: List[Dict]):
+        os.makedirs(self.data_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.data_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(docs, f, indent=2, ensure_ascii=False)
+            os.replace(tmp_path, self._path(collection))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    @contextmanager
+    def _locked(self, collection: str):
+        os.makedirs(self.data_dir, exist_ok=True)
+        with self._lock, open(self._path(collection) + ".lock", 'a') as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def insert(self, collection: str, doc: Dict) -> Dict:
+        with self._locked(collection):
+            docs = self._load(collection)
+            docs.append(doc)
+            self._save(collection, docs)
+        return doc
+
+    def insert_unique(self, collection: str, doc: Dict, replace_before: str = None) -> Dict:
+        timestamp = self._index_fields(collection)["timestamp"]
+        with self._locked(collection):
+            docs = self._load(collection)
+            for i, existing in enumerate(docs):
+                if existing.get('id') != doc['id']:
+                    continue
+                if replace_before is None or (existing.get(timestamp) or '') >= replace_before:
+                    return existing
+                docs[i] = doc
+                break
+            else:
+                docs.append(doc)
+            self._save(collection, docs)
+        return doc
+
+    def get(self, collection: str, doc_id: str) -> Optional[Dict]:
+        return next((d for d in self._load(collection) if d.get('id') == doc_id), None)
+
+    def get_many(self, collection: str, doc_ids: List[str]) -> Dict[str, Dict]:
+        wanted = set(doc_ids)
+        return {d['id']: d for d in self._load(collection) if d.get('id') in wanted}
+
+    def update(self, collection: str, doc_id: str, changes: Dict) -> Optional[Dict]:
+        with self._locked(collection):
+            docs = self._load(collection)
+            doc = next((d for d in docs if d.get('id') == doc_id), None)
+            if doc is None:
+                return None
+            doc.update(changes)
+            self._save(collection, docs)
+        return doc
+
+    def modify_many(self, operations: List[Tuple[str, str, Callable[[Optional[Dict]], Optional[Dict]]]]
+                    ) -> List[Optional[Dict]]:
+        # Lock every collection involved, in name order so concurrent transactions cannot deadlock.
+        # Files are only written once every apply has succeeded; each is replaced atomically, but a
+        # crash between two replacements can still leave one collection written and not the other.
+        collections = sorted({collection for collection, _, _ in operations})
+        with ExitStack() as stack:
+            for collection in collections:
+                stack.enter_context(self._locked(collection))
+            loaded = {collection: self._load(collection) for collection in collections}
+            positions = {collection: {d.get('id'): i for i, d in enumerate(docs)}
+                         for collection, docs in loaded.items()}
+            changed, results = set(), []
+            for collection, doc_id, apply in operations:
+                docs = loaded[collection]
+                index = positions[collection].get(doc_id)
+                current = docs[index] if index is not None else None
+                doc = apply(current)
+                if doc is None:
+                    results.append(current)
+                    continue
+                if index is None:
+                    positions[collection][doc_id] = len(docs)
+                    docs.append(doc)
+                else:
+                    docs[index] = doc
+                changed.add(collection)
+                results.append(doc)
+            for collection in collections:
+                if collection in changed:
+                    self._save(collection, loaded[collection])
+        return results
+
+    def find(self, collection: str, status: Any = None, since: str = None, until: str = None,
+             newest_first: bool = False, limit: int = None) -> List[Dict]:
+        fields = self._index_fields(collection)
+        docs = self._load(collection)
+        if status is not None:
+            docs = [d for d in docs if self._status_of(collection, d) == status]
+        if since is not None:
+            docs = [d for d in docs if (d.get(fields["timestamp"]) or '') >= since]
+        if until is not None:
+            docs = [d for d in docs if d.get(fields["timestamp"]) is not None and d[fields["timestamp"]] < until]
+        if newest_first:
+            docs = sorted(docs, key=lambda d: d.get(fields["timestamp"], ''), reverse=True)
+        return docs[:limit] if limit is not None else docs
+
+    def count(self, collection: str, status: Any = None) -> int:
+        return len(self.find(collection, status=status))
+
+    def count_by_status(self, collection: str) -> Dict[Any, int]:
+        counts = {}
+        for doc in self._load(collection):
+            status = self._status_of(collection, doc)
+            counts[status] = counts.get(status, 0) + 1
+        return counts
+
+    def purge(self, collection: str, until: str) -> int:
+        timestamp = self._index_fields(collection)["timestamp"]
+        with self._locked(collection):
+            docs = self._load(collection)
+            kept = [d for d in docs if d.get(timestamp) is None or d[timestamp] >= until]
+            if len(kept) != len(docs):
+                self._save(collection, kept)
+        return len(docs) - len(kept)
+
+class SQLiteStorageEngine(StorageEngine):
+    """Embedded SQLite store: one table per collection with indexed id, timestamp and status.
+
+    Each write touches a single row. Existing `<collection>.json` files in
+    `legacy_dir` are imported the first time their table is created.
+    """
+
+    def __init__(self, path: str, indexes: Dict[str, Dict[str, str]] = None, legacy_dir: str = None):
+        super().__init__(indexes)
+        self.path = path
+        self.legacy_dir = legacy_dir
+        self._ready = set()
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _table(self, collection: str) -> str:
+        if not collection.isidentifier():
+            raise ValueError(f"Invalid collection name: {collection}")
+        if collection not in self._ready:
+            with self._lock, self._connect() as conn:
+                conn.execute("BEGIN IMMEDIATE")
+                exists = conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (collection,)
+                ).fetchone()
+                if not exists:
+                    conn.execute(
+                        f"CREATE TABLE {collection} ("
+                        "id TEXT PRIMARY KEY, ts TEXT, status, data TEXT NOT NULL)"
+                    )
+                    conn.execute(f"CREATE INDEX idx_{collection}_ts ON {collection} (ts)")
+                    conn.execute(f"CREATE INDEX idx_{collection}_status ON {collection} (status, ts)")
+                    self._import_legacy(conn, collection)
+            # Marked ready only after the commit, or other threads would use the table before it exists
+            self._ready.add(collection)
+        return collection
+
+    def _import_legacy(self, conn: sqlite3.Connection, collection: str):
+        if not self.legacy_dir:
+            return
+        docs = JSONStorageEngine(self.legacy_dir)._load(collection)
+        conn.executemany(
+            f"INSERT OR REPLACE INTO {collection} (id, ts, status, data) VALUES (?, ?, ?, ?)",
+            [self._row(collection, doc) for doc in docs if doc.get('id')]
+        )
+
+    def _row(self, collection: str, doc: Dict) -> tuple:
+        fields = self._index_fields(collection)
+        return (
+            doc['id'],
+            doc.get(fields["timestamp"]),
+            self._status_of(collection, doc),
+            json.dumps(doc, ensure_ascii=False)
+        )
+
+    def insert(self, collection: str, doc: Dict) -> Dict:
+        table = self._table(collection)
+        with self._connect() as conn:
+            conn.execute(
+                f"INSERT INTO {table} (id, ts, status, data) VALUES (?, ?, ?, ?)",
+                self._row(collection, doc)
+            )
+        return doc
+
+    def insert_unique(self, collection: str, doc: Dict, replace_before: str = None) -> Dict:
+        table = self._table(collection)
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(f"SELECT ts, data FROM {table} WHERE id = ?", (doc['id'],)).fetchone()
+            if row and (replace_before is None or (row[0] or '') >= replace_before):
+                return json.loads(row[1])
+            conn.execute(
+                f"INSERT OR REPLACE INTO {table} (id, ts, status, data) VALUES (?, ?, ?, ?)",
+                self._row(collection, doc)
+            )
+        return doc
+
+    def get(self, collection: str, doc_id: str) -> Optional[Dict]:
+        table = self._table(collection)
+        with self._connect() as conn:
+            row = conn.execute(f"SELECT data FROM {table} WHERE id = ?", (doc_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def get_many(self, collection: str, doc_ids: List[str]) -> Dict[str, Dict]:
+        table = self._table(collection)
+        doc_ids = list(set(doc_ids))
+        docs = {}
+        with self._connect() as conn:
+            # Stay under SQLite's bound-parameter limit
+            for i in range(0, len(doc_ids), 500):
+                chunk = doc_ids[i:i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                for doc_id, data in conn.execute(
+                    f"SELECT id, data FROM {table} WHERE id IN ({placeholders})", chunk
+                ):
+                    docs[doc_id] = json.loads(data)
+        return docs
+
+    def update(self, collection: str, doc_id: str, changes: Dict) -> Optional[Dict]:
+        table = self._table(collection)
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(f"SELECT data FROM {table} WHERE id = ?", (doc_id,)).fetchone()
+            if not row:
+                return None
+            doc = json.loads(row[0])
+            doc.update(changes)
+            _, ts, status, data = self._row(collection, doc)
+            conn.execute(
+                f"UPDATE {table} SET ts = ?, status = ?, data = ? WHERE id = ?",
+                (ts, status, data, doc_id)
+            )
+        return doc
+
+    def modify_many(self, operations: List[Tuple[str, str, Callable[[Optional[Dict]], Optional[Dict]]]]
+                    ) -> List[Optional[Dict]]:
+        # Tables are created up front: creating one inside the transaction would wait on itself
+        tables = [self._table(collection) for collection, _, _ in operations]
+        results = []
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            for (collection, doc_id, apply), table in zip(operations, tables):
+                row = conn.execute(f"SELECT data FROM {table} WHERE id = ?", (doc_id,)).fetchone()
+                current = json.loads(row[0]) if row else None
+                doc = apply(current)
+                if doc is None:
+                    results.append(current)
+                    continue
+                _, ts, status, data = self._row(collection, doc)
+                if row:
+                    # UPDATE rather than REPLACE keeps the rowid, and so the insertion order
+                    conn.execute(
+                        f"UPDATE {table} SET ts = ?, status = ?, data = ? WHERE id = ?",
+                        (ts, status, data, doc_id)
+                    )
+                else:
+                    conn.execute(
+                        f"INSERT INTO {table} (id, ts, status, data) VALUES (?, ?, ?, ?)",
+                        (doc_id, ts, status, data)
+                    )
+                results.append(doc)
+        return results
+
+    def _where(self, status: Any, since: str, until: str):
+        clauses, params = [], []
+        if status is not None:
+            clauses.append("status = ?")
+            params.append(status)
+        if since is not None:
+            clauses.append("ts >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("ts < ?")
+            params.append(until)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def find(self, collection: str, status: Any = None, since: str = None, until: str = None,
+             newest_first: bool = False, limit: int = None) -> List[Dict]:
+        table = self._table(collection)
+        where, params = self._where(status, since, until)
+        order = " ORDER BY ts DESC" if newest_first else " ORDER BY rowid"
+        if limit is not None:
+            order += " LIMIT ?"
+            params.append(limit)
+        with self._connect() as conn:
+            rows = conn.execute(f"SELECT data FROM {table}{where}{order}", params).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def count(self, collection: str, status: Any = None) -> int:
+        table = self._table(collection)
+        where, params = self._where(status, None, None)
+        with self._connect() as conn:
+            return conn.execute(f"SELECT COUNT(*) FROM {table}{where}", params).fetchone()[0]
+
+    def count_by_status(self, collection: str) -> Dict[Any, int]:
+        table = self._table(collection)
+        with self._connect() as conn:
+            return dict(conn.execute(f"SELECT status, COUNT(*) FROM {table} GROUP BY status").fetchall())
+
+    def purge(self, collection: str, until: str) -> int:
+        table = self._table(collection)
+        with self._connect() as conn:
+            return conn.execute(f"DELETE FROM {table} WHERE ts < ?", (until,)).rowcount
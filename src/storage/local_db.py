@@ -1,7 +1,13 @@
 import json
 import os
-from datetime import datetime
-from typing import List, Dict, Optional
+import secrets
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, List, Dict, Optional, Tuple, TypeVar
+
+from src.storage.engine import StorageEngine, JSONStorageEngine, SQLiteStorageEngine
+from src.storage.reminder_schedule import next_occurrence, occurrence_key, schedule_from_reminder
 
 DATA_DIR = "data"
 
@@ -25,72 +31,545 @@ def save_json(filename: str, data):
     with open(filepath, 'w', encoding='utf-8') as f:
         json.dump(data, f, indent=2, ensure_ascii=False)
 
+# Storage engine for records, orders and reminders
+# STORAGE_ENGINE=json keeps the original one-file-per-collection layout
+STORAGE_ENGINE = os.getenv("STORAGE_ENGINE", "sqlite")
+DB_FILE = "health_copilot.db"
+
+_engine = None
+
+def get_engine() -> StorageEngine:
+    global _engine
+    if _engine is None:
+        ensure_data_dir()
+        if STORAGE_ENGINE == "json":
+            _engine = JSONStorageEngine(DATA_DIR)
+        else:
+            _engine = SQLiteStorageEngine(os.path.join(DATA_DIR, DB_FILE), legacy_dir=DATA_DIR)
+    return _engine
+
+def set_engine(engine: StorageEngine):
+    """Swap the storage engine, e.g. for simulations"""
+    global _engine, _reminders_migrated
+    _engine = engine
+    _reminders_migrated = False
+
+# IDs: prefix + 26-char ULID (48-bit ms timestamp, 80-bit random).
+# IDs sort by creation time; within one millisecond the random part is
+# incremented so IDs from this process stay strictly increasing.
+_CROCKFORD = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+_id_lock = threading.Lock()
+_last_ms = 0
+_last_rand = 0
+
+def _encode_base32(value: int, length: int) -> str:
+    chars = []
+    for _ in range(length):
+        chars.append(_CROCKFORD[value & 31])
+        value >>= 5
+    return "".join(reversed(chars))
+
+def new_id(prefix: str) -> str:
+    """Allocate a time-ordered, collision-resistant ID like rec_01HV..."""
+    global _last_ms, _last_rand
+    with _id_lock:
+        now_ms = int(time.time() * 1000)
+        if now_ms <= _last_ms:
+            now_ms = _last_ms
+            rand = (_last_rand + 1) & ((1 << 80) - 1)
+        else:
+            rand = secrets.randbits(80)
+        _last_ms, _last_rand = now_ms, rand
+    return f"{prefix}_{_encode_base32(now_ms, 10)}{_encode_base32(rand, 16)}"
+
+# Collection Stats
+# Document counts per collection, in total and per indexed status (severity
+# for health records, status for orders, active for reminders). Every insert
+# or status change adjusts them in the same transaction as the write, so
+# reading them is one lookup. Missing counts, or counts stored by an older
+# version, are built from the status index inside the transaction that first
+# needs them, so no write can land between the count and its storage.
+STATS_COLLECTIONS = ("health_records", "orders", "reminders")
+STATS_VERSION = 2
+
+def _status_key(status) -> str:
+    """Counts key for a status. SQLite hands boolean statuses back as 1/0, so booleans are keyed that way too."""
+    return str(int(status)) if isinstance(status, bool) else str(status)
+
+def _build_counts(collection: str) -> Dict:
+    # Counts the collection as committed: a write earlier in the same transaction is not included yet
+    by_status = {}
+    for status, n in get_engine().count_by_status(collection).items():
+        by_status[_status_key(status)] = by_status.get(_status_key(status), 0) + n
+    return {
+        'id': collection,
+        'version': STATS_VERSION,
+        'total': sum(by_status.values()),
+        'by_status': by_status,
+        'updated_at': datetime.now().isoformat()
+    }
+
+def _count_operation(collection: str, change: Dict) -> Tuple:
+    """modify_many operation applying `change` to a collection's counts; it must follow the write it counts.
+
+    `change` is {'added': bool, 'old': status, 'new': status}, filled in by that
+    write's apply, and left empty if the write changed nothing.
+    """
+    def apply(stats: Optional[Dict]) -> Optional[Dict]:
+        if not change or (not change['added'] and change['old'] == change['new']):
+            return None
+        if stats is None or stats.get('version') != STATS_VERSION:
+            stats = _build_counts(collection)
+        by_status = stats['by_status']
+        if change['added']:
+            stats['total'] += 1
+        else:
+            old = _status_key(change['old'])
+            by_status[old] = by_status.get(old, 0) - 1
+        new = _status_key(change['new'])
+        by_status[new] = by_status.get(new, 0) + 1
+        stats['updated_at'] = datetime.now().isoformat()
+        return stats
+
+    return ("collection_stats", collection, apply)
+
+def _insert_counted(collection: str, doc: Dict, status) -> Dict:
+    """Insert doc and count it under `status` in one transaction"""
+    def insert(current: Optional[Dict]) -> Dict:
+        if current is not None:
+            raise ValueError(f"Duplicate id in {collection}: {doc['id']}")
+        return doc
+
+    get_engine().modify_many([
+        (collection, doc['id'], insert),
+        _count_operation(collection, {'added': True, 'old': None, 'new': status})
+    ])
+    return doc
+
+def _update_counted(collection: str, doc_id: str, status_field: str, status, changes: Dict) -> Optional[Dict]:
+    """Set a document's status (plus `changes`) and move it between counts in one transaction"""
+    change = {}
+
+    def update(doc: Optional[Dict]) -> Optional[Dict]:
+        if doc is None:
+            return None
+        change.update(added=False, old=get_engine()._status_of(collection, doc), new=status)
+        return dict(doc, **changes, **{status_field: status})
+
+    return get_engine().modify_many([
+        (collection, doc_id, update),
+        _count_operation(collection, change)
+    ])[0]
+
+def get_collection_stats(collection: str) -> Dict:
+    """{'total': n, 'by_status': {status key: n}} for one collection"""
+    stats = get_engine().get("collection_stats", collection)
+    if stats is None or stats.get('version') != STATS_VERSION:
+        def build(current: Optional[Dict]) -> Optional[Dict]:
+            if current is not None and current.get('version') == STATS_VERSION:
+                return None  # built by another process meanwhile
+            return _build_counts(collection)
+
+        # Listing the counted collection (unchanged) holds back its writers while counting
+        _, stats = get_engine().modify_many([
+            (collection, "", lambda doc: None),
+            ("collection_stats", collection, build)
+        ])
+    return stats
+
+def get_dashboard_stats() -> Dict[str, int]:
+    health_records, orders, reminders = (get_collection_stats(c) for c in STATS_COLLECTIONS)
+    return {
+        'health_records': health_records['total'],
+        'records_by_severity': {k: v for k, v in health_records['by_status'].items() if v and k != 'None'},
+        'orders': orders['total'],
+        'pending_orders': orders['by_status'].get('pending', 0),
+        'active_reminders': reminders['by_status'].get(_status_key(True), 0)
+    }
+
 # Health Records
 def add_health_record(record: Dict):
-    records = load_json("health_records.json")
-    record['id'] = f"rec_{len(records) + 1}_{int(datetime.now().timestamp())}"
+    record['id'] = new_id("rec")
     record['timestamp'] = datetime.now().isoformat()
-    records.append(record)
-    save_json("health_records.json", records)
-    return record
+    return _insert_counted("health_records", record, record.get('severity'))
 
 def get_health_records() -> List[Dict]:
-    return load_json("health_records.json")
+    return get_engine().find("health_records")
+
+def get_health_record(record_id: str) -> Optional[Dict]:
+    return get_engine().get("health_records", record_id)
 
 def get_recent_records(limit: int = 10) -> List[Dict]:
-    records = get_health_records()
-    return sorted(records, key=lambda x: x.get('timestamp', ''), reverse=True)[:limit]
+    return get_engine().find("health_records", newest_first=True, limit=limit)
+
+def get_records_between(since: str = None, until: str = None) -> List[Dict]:
+    return get_engine().find("health_records", since=since, until=until)
+
+# Idempotency Keys
+# A retried write with the same key gets the first write's result instead of
+# writing again. Keys expire after IDEMPOTENCY_TTL_SECONDS; expired rows are
+# purged through the expires_at index at most once per purge interval.
+IDEMPOTENCY_TTL_SECONDS = 24 * 3600
+IDEMPOTENCY_PURGE_INTERVAL = 3600
+_last_idempotency_purge = 0.0
+
+def claim_idempotency_key(scope: str, key: str, result: Dict, ttl_seconds: int = IDEMPOTENCY_TTL_SECONDS,
+                          writes: List[Tuple] = ()) -> Dict:
+    """Record `result` under (scope, key) unless a live claim exists; returns the stored result.
+
+    `writes` are modify_many operations for what the key stands for. They run in
+    the claim's transaction and only if this call made the claim, so a claim is
+    never stored without them.
+    """
+    global _last_idempotency_purge
+    now = datetime.now()
+    if time.monotonic() - _last_idempotency_purge > IDEMPOTENCY_PURGE_INTERVAL:
+        _last_idempotency_purge = time.monotonic()
+        get_engine().purge("idempotency_keys", now.isoformat())
+    record = {
+        'id': f"{scope}:{key}",
+        'scope': scope,
+        'created_at': now.isoformat(),
+        'expires_at': (now + timedelta(seconds=ttl_seconds)).isoformat(),
+        'result': result
+    }
+    claimed = []
+
+    def claim(current: Optional[Dict]) -> Optional[Dict]:
+        if current is not None and (current.get('expires_at') or '') >= record['created_at']:
+            return None
+        claimed.append(record)
+        return record
+
+    def if_claimed(apply: Callable[[Optional[Dict]], Optional[Dict]]):
+        return lambda current: apply(current) if claimed else None
+
+    operations = [("idempotency_keys", record['id'], claim)]
+    operations += [(collection, doc_id, if_claimed(apply)) for collection, doc_id, apply in writes]
+    return get_engine().modify_many(operations)[0]['result']
 
 # Medicine Orders
-def add_order(order: Dict):
-    orders = load_json("orders.json")
-    order['id'] = f"ord_{len(orders) + 1}_{int(datetime.now().timestamp())}"
+def add_order(order: Dict, idempotency_key: str = None):
+    order['id'] = new_id("ord")
     order['order_date'] = datetime.now().isoformat()
     order['status'] = 'pending'
-    orders.append(order)
-    save_json("orders.json", orders)
-    return order
+    if idempotency_key:
+        claimed = claim_idempotency_key("add_order", idempotency_key, {'id': order['id']})
+        if claimed['id'] != order['id']:
+            # Retried submission: return the original order
+            return get_order(claimed['id']) or dict(order, id=claimed['id'])
+    if order.get('order_id'):
+        # Link the pharmacy's tracking record so delivery updates reach this order
+        tracking = update_order_tracking(order['order_id'], {'local_order_id': order['id']})
+        if tracking and tracking.get('status') == 'delivered':
+            order['status'] = 'delivered'
+    return _insert_counted("orders", order, order['status'])
 
 def get_orders() -> List[Dict]:
-    return load_json("orders.json")
+    return get_engine().find("orders")
+
+def get_order(order_id: str) -> Optional[Dict]:
+    return get_engine().get("orders", order_id)
+
+def get_recent_orders(limit: int = 10) -> List[Dict]:
+    return get_engine().find("orders", newest_first=True, limit=limit)
+
+def get_orders_by_status(status: str) -> List[Dict]:
+    return get_engine().find("orders", status=status)
 
 def update_order_status(order_id: str, status: str):
-    orders = get_orders()
-    for order in orders:
-        if order['id'] == order_id:
-            order['status'] = status
-            order['updated_at'] = datetime.now().isoformat()
-            break
-    save_json("orders.json", orders)
+    _update_counted("orders", order_id, 'status', status, {'updated_at': datetime.now().isoformat()})
+
+# Order Tracking
+# Keyed by the pharmacy order id (ORD...); `next_due_at` is the indexed
+# timestamp, so due orders are found without scanning delivered ones.
+def add_order_tracking(tracking: Dict):
+    tracking['id'] = tracking['order_id']
+    return get_engine().insert("order_tracking", tracking)
+
+def add_order_tracking_operation(tracking: Dict) -> Tuple:
+    """add_order_tracking as a modify_many operation"""
+    tracking['id'] = tracking['order_id']
+    return ("order_tracking", tracking['id'], lambda current: tracking)
+
+def get_order_tracking(order_id: str) -> Optional[Dict]:
+    return get_engine().get("order_tracking", order_id)
+
+def update_order_tracking(order_id: str, changes: Dict) -> Optional[Dict]:
+    return get_engine().update("order_tracking", order_id, changes)
+
+def modify_order_tracking(order_id: str, apply: Callable[[Optional[Dict]], Optional[Dict]]) -> Optional[Dict]:
+    """Replace a tracking record with apply(current) atomically (see StorageEngine.modify)"""
+    return get_engine().modify("order_tracking", order_id, apply)
+
+def get_due_order_tracking(now: str) -> List[Dict]:
+    return get_engine().find("order_tracking", until=now)
 
 # Reminders
+# Each reminder carries a compact `schedule` (see reminder_schedule.py)
+# alongside its display `times`. The next dose is computed from the schedule
+# on read, so there is no stored due time to go stale.
 def add_reminder(reminder: Dict):
-    reminders = load_json("reminders.json")
-    reminder['id'] = f"rem_{len(reminders) + 1}_{int(datetime.now().timestamp())}"
+    reminder['id'] = new_id("rem")
     reminder['created_at'] = datetime.now().isoformat()
     reminder['active'] = True
-    reminders.append(reminder)
-    save_json("reminders.json", reminders)
+    if 'schedule' not in reminder:
+        reminder['schedule'] = schedule_from_reminder(reminder)
+    reminder.setdefault('settled_until', int(time.time()))
+    return _insert_counted("reminders", reminder, reminder['active'])
+
+_reminders_migrated = False
+
+def _migrate_reminder(reminder: Optional[Dict]) -> Optional[Dict]:
+    if reminder is None or ('schedule' in reminder and 'settled_until' in reminder and 'next_due' not in reminder):
+        return None
+    reminder.setdefault('schedule', schedule_from_reminder(reminder))
+    # Doses before adherence tracking are not counted as missed
+    reminder.setdefault('settled_until', int(time.time()))
+    reminder.pop('next_due', None)  # stored by earlier versions, never kept current
     return reminder
 
+def migrate_reminders() -> int:
+    """Bring reminders saved by earlier versions up to date; returns how many changed"""
+    global _reminders_migrated
+    migrated = 0
+    for reminder in get_engine().find("reminders"):
+        if _migrate_reminder(dict(reminder)) is not None:
+            get_engine().modify("reminders", reminder['id'], _migrate_reminder)
+            migrated += 1
+    _reminders_migrated = True
+    return migrated
+
 def get_active_reminders() -> List[Dict]:
-    reminders = load_json("reminders.json")
-    return [r for r in reminders if r.get('active', True)]
+    if not _reminders_migrated:
+        migrate_reminders()
+    return get_engine().find("reminders", status=True)
+
+def next_dose_at(reminder: Dict, after: int = None) -> Optional[int]:
+    """Unix timestamp of the reminder's next dose after `after` (default: now), None once it has ended"""
+    return next_occurrence(reminder['schedule'], int(time.time()) if after is None else after)
+
+def get_reminders_since(since: str) -> List[Dict]:
+    """Reminders created at or after `since` (ISO timestamp), via the created_at index"""
+    return get_engine().find("reminders", since=since)
+
+def get_reminder(reminder_id: str) -> Optional[Dict]:
+    return get_engine().get("reminders", reminder_id)
+
+def get_reminders(reminder_ids: List[str]) -> Dict[str, Dict]:
+    return get_engine().get_many("reminders", reminder_ids)
 
 def deactivate_reminder(reminder_id: str):
-    reminders = load_json("reminders.json")
+    _update_counted("reminders", reminder_id, 'active', False, {})
+
+# Adherence
+# One event per dose occurrence, id "<reminder id>:<day>:<minutes>", indexed
+# by reminder id and day. Counters in adherence_stats (one document per
+# reminder plus ADHERENCE_TOTAL) are updated in the same transaction as each
+# event, so pages read aggregates without scanning events. Streaks count
+# consecutive doses taken, in the order they were recorded. Doses not marked
+# taken within DOSE_WINDOW_SECONDS are recorded as missed by
+# settle_missed_doses (run by the reminder scheduler and the Reminders page).
+ADHERENCE_TOTAL = "all"
+DOSE_WINDOW_SECONDS = 3 * 3600
+MAX_SETTLE_OCCURRENCES = 1000
+
+def dose_event_id(reminder_id: str, day: str, minutes: int) -> str:
+    return f"{reminder_id}:{day}:{minutes:04d}"
+
+def _empty_adherence(stats_id: str) -> Dict:
+    return {
+        'id': stats_id,
+        'reminder_id': stats_id,
+        'taken': 0,
+        'missed': 0,
+        'current_streak': 0,
+        'best_streak': 0,
+        'day': None,
+        'taken_today': 0,
+        'missed_today': 0,
+        'updated_at': None
+    }
+
+def _count_dose(stats: Optional[Dict], stats_id: str, day: str, status: str, was_missed: bool, now: str) -> Dict:
+    stats = stats or _empty_adherence(stats_id)
+    if was_missed:
+        stats['missed'] -= 1
+    stats[status] += 1
+    if status == 'taken':
+        stats['current_streak'] += 1
+        stats['best_streak'] = max(stats['best_streak'], stats['current_streak'])
+    else:
+        stats['current_streak'] = 0
+    # Daily counters follow the latest day seen; late events for earlier days only hit the totals
+    if stats['day'] is None or day > stats['day']:
+        stats.update(day=day, taken_today=0, missed_today=0)
+    if day == stats['day']:
+        if was_missed:
+            stats['missed_today'] -= 1
+        stats[f"{status}_today"] += 1
+    stats['updated_at'] = now
+    return stats
+
+def _dose_operations(reminder_id: str, day: str, minutes: int, status: str, now: str) -> List[Tuple]:
+    """modify_many operations recording one dose event and counting it"""
+    change = {}
+
+    def apply(existing: Optional[Dict]) -> Optional[Dict]:
+        if existing is None:
+            change['was_missed'] = False
+            return {
+                'id': dose_event_id(reminder_id, day, minutes),
+                'reminder_id': reminder_id,
+                'day': day,
+                'minutes': minutes,
+                'status': status,
+                'recorded_at': now
+            }
+        if existing['status'] == 'missed' and status == 'taken':
+            change['was_missed'] = True
+            return dict(existing, status='taken', recorded_at=now)
+        return None
+
+    def count(stats_id: str):
+        # Runs after apply in the same transaction: counts only if the event changed
+        return lambda stats: _count_dose(stats, stats_id, day, status, change['was_missed'], now) if change else None
+
+    return [
+        ("adherence_events", dose_event_id(reminder_id, day, minutes), apply),
+        ("adherence_stats", reminder_id, count(reminder_id)),
+        ("adherence_stats", ADHERENCE_TOTAL, count(ADHERENCE_TOTAL))
+    ]
+
+def record_dose(reminder_id: str, day: str, minutes: int, status: str = 'taken') -> Dict:
+    """Record a dose as 'taken' or 'missed'; returns the stored event.
+
+    Recording an occurrence again changes nothing, except that a missed dose
+    can still be marked taken.
+    """
+    operations = _dose_operations(reminder_id, day, minutes, status, datetime.now().isoformat())
+    return get_engine().modify_many(operations)[0]
+
+def settle_missed_doses(reminders: List[Dict], now: int = None) -> int:
+    """Record doses of these reminders that passed DOSE_WINDOW_SECONDS without being taken as missed;
+    returns how many. Each reminder keeps `settled_until`, so every occurrence is checked once."""
+    now = int(time.time()) if now is None else now
+    cutoff = now - DOSE_WINDOW_SECONDS
+    pending, settled = {}, {}
     for reminder in reminders:
-        if reminder['id'] == reminder_id:
-            reminder['active'] = False
-            break
-    save_json("reminders.json", reminders)
+        after = reminder.get('settled_until', now)
+        last = after
+        for _ in range(MAX_SETTLE_OCCURRENCES):
+            occurrence = next_occurrence(reminder['schedule'], last)
+            if occurrence is None or occurrence > cutoff:
+                break
+            day, minutes = occurrence_key(reminder['schedule'], occurrence)
+            pending[dose_event_id(reminder['id'], day, minutes)] = (reminder['id'], day, minutes)
+            last = occurrence
+        if last != after:
+            settled[reminder['id']] = last
+            reminder['settled_until'] = last
+    if not settled:
+        return 0
+
+    # One transaction for every missed dose and the reminders' new settled_until
+    recorded = get_dose_events(list(pending))
+    missed = [dose for event_id, dose in pending.items() if event_id not in recorded]
+    recorded_at = datetime.now().isoformat()
+    operations = []
+    for reminder_id, day, minutes in missed:
+        operations.extend(_dose_operations(reminder_id, day, minutes, 'missed', recorded_at))
+    for reminder_id, last in settled.items():
+        operations.append(("reminders", reminder_id, lambda reminder, last=last: dict(
+            reminder, settled_until=max(last, reminder.get('settled_until') or 0)
+        ) if reminder else None))
+    get_engine().modify_many(operations)
+    return len(missed)
+
+def get_dose_events(event_ids: List[str]) -> Dict[str, Dict]:
+    return get_engine().get_many("adherence_events", event_ids)
+
+def get_dose_events_for_day(day: str, reminder_id: str = None) -> List[Dict]:
+    """Events recorded for one day (ISO date), via the day index"""
+    next_day = (datetime.fromisoformat(day) + timedelta(days=1)).date().isoformat()
+    return get_engine().find("adherence_events", status=reminder_id, since=day, until=next_day)
+
+def get_adherence_stats(reminder_ids: List[str]) -> Dict[str, Dict]:
+    """Counters per reminder id; reminders without events get zeroed counters"""
+    stats = get_engine().get_many("adherence_stats", reminder_ids)
+    return {reminder_id: stats.get(reminder_id) or _empty_adherence(reminder_id) for reminder_id in reminder_ids}
+
+def get_adherence_summary() -> Dict:
+    """Counters across all reminders"""
+    return get_engine().get("adherence_stats", ADHERENCE_TOTAL) or _empty_adherence(ADHERENCE_TOTAL)
+
+def adherence_rate(stats: Dict) -> Optional[float]:
+    """Share of recorded doses that were taken, or None before any are recorded"""
+    recorded = stats['taken'] + stats['missed']
+    return stats['taken'] / recorded if recorded else None
+
+def doses_today(stats: Dict, day: str) -> Dict[str, int]:
+    if stats['day'] != day:
+        return {'taken': 0, 'missed': 0}
+    return {'taken': stats['taken_today'], 'missed': stats['missed_today']}
 
 # Medicine Database
+# Parsed catalogue shared by the whole process; reloaded only when the
+# file's mtime or size changes. Callers must treat it as read-only.
+_medicine_lock = threading.Lock()
+_medicine_cache = {"stamp": None, "data": None, "version": 0}
+
+def _medicine_file_stamp():
+    try:
+        st = os.stat(os.path.join(DATA_DIR, "medicine_database.json"))
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
 def get_medicine_database() -> Dict:
-    db = load_json("medicine_database.json")
-    if not db:
-        return initialize_medicine_database()
-    return db
+    stamp = _medicine_file_stamp()
+    if stamp is not None and stamp == _medicine_cache["stamp"]:
+        return _medicine_cache["data"]
+    with _medicine_lock:
+        stamp = _medicine_file_stamp()
+        if stamp is None or stamp != _medicine_cache["stamp"]:
+            db = load_json("medicine_database.json")
+            if not db:
+                db = initialize_medicine_database()
+                stamp = _medicine_file_stamp()
+            _medicine_cache.update(stamp=stamp, data=db, version=_medicine_cache["version"] + 1)
+        return _medicine_cache["data"]
+
+def get_medicine_database_version() -> int:
+    """Increases every time the catalogue is (re)loaded"""
+    get_medicine_database()
+    return _medicine_cache["version"]
+
+def invalidate_medicine_database():
+    """Force the next get_medicine_database() call to re-read the file"""
+    with _medicine_lock:
+        _medicine_cache["stamp"] = None
+
+T = TypeVar("T")
+
+def cached_for_catalogue(builder: Callable[[Dict], T]) -> Callable[[], T]:
+    """Getter for builder(catalogue), rebuilt only when the catalogue changes.
+
+    A builder that raises leaves nothing cached, so the next call retries.
+    """
+    lock = threading.Lock()
+    cache = {"version": None, "value": None}
+
+    def get() -> T:
+        version = get_medicine_database_version()
+        if cache["version"] != version:
+            with lock:
+                if cache["version"] != version:
+                    cache["value"] = builder(get_medicine_database())
+                    cache["version"] = version
+        return cache["value"]
+
+    return get
 
 def initialize_medicine_database():
     medicines = {
@@ -0,0 +1,120 @@
+"""Compact reminder schedules.
+
+A schedule stores times of day as minutes since midnight plus a recurrence
+rule, in the reminder's timezone (None means the server's local time):
+
+    {"minutes": [480, 1260], "freq": "daily", "interval": 1, "weekdays": None,
+     "start": "2024-05-01", "start_minute": 615, "until": "2024-05-08", "tz": None}
+
+`until` is exclusive. Occurrences are Unix timestamps (int seconds), so due
+checks and ordering are integer comparisons.
+"""
+import re
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    from zoneinfo import ZoneInfo
+except ImportError:  # Python < 3.9
+    ZoneInfo = None
+
+MINUTES_PER_DAY = 24 * 60
+MAX_SEARCH_DAYS = 366
+
+_TIME_PATTERN = re.compile(r"^\s*(\d{1,2}):(\d{2})\s*([AaPp][Mm])?\s*$")
+
+def parse_minutes(value: str) -> Optional[int]:
+    """'8:00 AM' -> 480, '20:30' -> 1230; None if unparseable"""
+    match = _TIME_PATTERN.match(value or "")
+    if not match:
+        return None
+    hour, minute = int(match.group(1)), int(match.group(2))
+    if match.group(3):
+        if not 1 <= hour <= 12:
+            return None
+        hour = hour % 12 + (12 if match.group(3).lower() == "pm" else 0)
+    if hour > 23 or minute > 59:
+        return None
+    return hour * 60 + minute
+
+def format_minutes(minutes: int) -> str:
+    """480 -> '8:00 AM'"""
+    hour, minute = divmod(minutes, 60)
+    return f"{hour % 12 or 12}:{minute:02d} {'AM' if hour < 12 else 'PM'}"
+
+@lru_cache(maxsize=64)
+def _zone(name: Optional[str]):
+    return ZoneInfo(name) if name and ZoneInfo else None
+
+def _timestamp(day: date, minutes: int, tz: Optional[str]) -> int:
+    hour, minute = divmod(minutes, 60)
+    return int(datetime(day.year, day.month, day.day, hour, minute, tzinfo=_zone(tz)).timestamp())
+
+def build_schedule(times: Iterable[str], start: datetime, duration_days: int = None,
+                   freq: str = "daily", interval: int = 1, weekdays: List[int] = None,
+                   tz: str = None) -> Dict:
+    minutes = sorted({m for m in (parse_minutes(t) for t in times) if m is not None})
+    return {
+        "minutes": minutes,
+        "freq": freq,
+        "interval": max(1, int(interval)),
+        "weekdays": sorted(weekdays) if weekdays else None,
+        "start": start.date().isoformat(),
+        "start_minute": start.hour * 60 + start.minute,
+        "until": (start.date() + timedelta(days=int(duration_days))).isoformat() if duration_days else None,
+        "tz": tz
+    }
+
+def schedule_from_reminder(reminder: Dict) -> Dict:
+    """Schedule for a reminder stored with display times ('8:00 AM') only"""
+    start = datetime.fromisoformat(reminder.get('start_date') or reminder['created_at'])
+    return build_schedule(reminder.get('times', []), start, reminder.get('duration_days'))
+
+def occurs_on(schedule: Dict, day: date) -> bool:
+    start = date.fromisoformat(schedule["start"])
+    if day < start or (schedule["until"] and day >= date.fromisoformat(schedule["until"])):
+        return False
+    if schedule["weekdays"] and day.weekday() not in schedule["weekdays"]:
+        return False
+    if schedule["freq"] == "weekly":
+        return (day - start).days // 7 % schedule["interval"] == 0
+    return (day - start).days % schedule["interval"] == 0
+
+def minutes_on(schedule: Dict, day: date) -> List[int]:
+    """Times of day (minutes) the schedule fires on `day`"""
+    if not occurs_on(schedule, day):
+        return []
+    if day.isoformat() == schedule["start"]:
+        return [m for m in schedule["minutes"] if m >= schedule["start_minute"]]
+    return schedule["minutes"]
+
+def occurrence_key(schedule: Dict, timestamp: int) -> Tuple[str, int]:
+    """(day, minutes) of an occurrence timestamp, in the schedule's timezone"""
+    moment = datetime.fromtimestamp(timestamp, _zone(schedule["tz"]))
+    return moment.date().isoformat(), moment.hour * 60 + moment.minute
+
+def current_dose(schedule: Dict, now: datetime) -> Optional[int]:
+    """Today's dose (minutes) to mark as taken: the latest one already due, else the next one"""
+    today = minutes_on(schedule, now.date())
+    minute = now.hour * 60 + now.minute
+    due = [m for m in today if m <= minute]
+    if due:
+        return due[-1]
+    return today[0] if today else None
+
+def next_occurrence(schedule: Dict, after: int) -> Optional[int]:
+    """First occurrence strictly after the Unix timestamp `after`, or None once the schedule has ended"""
+    if not schedule["minutes"]:
+        return None
+    day = max(datetime.fromtimestamp(after, _zone(schedule["tz"])).date(), date.fromisoformat(schedule["start"]))
+    until = date.fromisoformat(schedule["until"]) if schedule["until"] else None
+    for _ in range(MAX_SEARCH_DAYS):
+        if until and day >= until:
+            return None
+        for minutes in minutes_on(schedule, day):
+            timestamp = _timestamp(day, minutes, schedule["tz"])
+            if timestamp > after:
+                return timestamp
+        day += timedelta(days=1)
+    return None
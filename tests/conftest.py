@@ -0,0 +1,21 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.storage import local_db
+from src.storage.engine import JSONStorageEngine, SQLiteStorageEngine
+
+@pytest.fixture(params=["sqlite", "json"])
+def engine(request, tmp_path):
+    """A fresh storage engine of each kind, installed as local_db's engine for the test"""
+    if request.param == "sqlite":
+        engine = SQLiteStorageEngine(str(tmp_path / "test.db"))
+    else:
+        engine = JSONStorageEngine(str(tmp_path))
+    previous = local_db._engine
+    local_db.set_engine(engine)
+    yield engine
+    local_db.set_engine(previous)
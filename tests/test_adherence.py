@@ -0,0 +1,135 @@
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.integrations import reminder_scheduler
+from src.integrations.reminder_scheduler import ReminderScheduler
+from src.storage import local_db
+
+START = datetime(2026, 3, 2, 7, 0)
+
+def add_reminder(times=("8:00 AM", "8:00 PM"), days=3):
+    return local_db.add_reminder({
+        'medicine': 'Paracetamol', 'dosage': '1 tablet', 'times': list(times), 'duration_days': days,
+        'start_date': START.isoformat(), 'settled_until': int(START.timestamp())
+    })
+
+def test_concurrent_records_of_one_dose_count_once(engine):
+    reminder = add_reminder()
+    threads = [threading.Thread(target=local_db.record_dose, args=(reminder['id'], '2026-03-02', 480))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = local_db.get_adherence_stats([reminder['id']])[reminder['id']]
+    assert (stats['taken'], stats['missed'], stats['current_streak']) == (1, 0, 1)
+    assert local_db.get_adherence_summary()['taken'] == 1
+
+def test_missed_dose_can_still_be_marked_taken(engine):
+    reminder = add_reminder()
+    local_db.record_dose(reminder['id'], '2026-03-02', 480)
+    local_db.record_dose(reminder['id'], '2026-03-02', 1200, 'missed')
+    local_db.record_dose(reminder['id'], '2026-03-02', 1200, 'taken')
+    local_db.record_dose(reminder['id'], '2026-03-02', 1200, 'missed')  # no effect
+
+    stats = local_db.get_adherence_stats([reminder['id']])[reminder['id']]
+    assert (stats['taken'], stats['missed']) == (2, 0)
+    assert local_db.doses_today(stats, '2026-03-02') == {'taken': 2, 'missed': 0}
+    assert local_db.adherence_rate(stats) == 1.0
+
+def test_event_and_counters_are_written_together(engine, monkeypatch):
+    reminder = add_reminder()
+
+    def fail(*args):
+        raise RuntimeError("counter update failed")
+
+    monkeypatch.setattr(local_db, "_count_dose", fail)
+    with pytest.raises(RuntimeError):
+        local_db.record_dose(reminder['id'], '2026-03-02', 480)
+
+    assert local_db.get_dose_events([local_db.dose_event_id(reminder['id'], '2026-03-02', 480)]) == {}
+
+def test_settle_records_untaken_doses_once(engine):
+    reminder = add_reminder()
+    local_db.record_dose(reminder['id'], '2026-03-02', 480)
+    now = int(datetime(2026, 3, 3, 12, 0).timestamp())
+
+    # 8 AM (taken), 8 PM, next 8 AM are past the window; next 8 PM is not due yet
+    assert local_db.settle_missed_doses([reminder], now) == 2
+    assert local_db.settle_missed_doses(local_db.get_active_reminders(), now) == 0
+
+    stats = local_db.get_adherence_stats([reminder['id']])[reminder['id']]
+    assert (stats['taken'], stats['missed'], stats['best_streak']) == (1, 2, 1)
+
+def test_scheduler_fires_and_settles_finished_reminders(engine):
+    reminder = add_reminder(times=("8:00 AM",), days=1)
+    clock = [START]
+    fired = []
+
+    class Notifier:
+        def notify(self, reminder, fire_at):
+            fired.append(fire_at)
+
+    scheduler = ReminderScheduler(notifier=Notifier(), clock=lambda: clock[0])
+    scheduler.load()
+    clock[0] = START.replace(hour=8)
+    scheduler.run_pending()
+    assert fired == [START.replace(hour=8)]
+
+    clock[0] += timedelta(seconds=local_db.DOSE_WINDOW_SECONDS + 5)
+    scheduler.sync()
+
+    stats = local_db.get_adherence_stats([reminder['id']])[reminder['id']]
+    assert stats['missed'] == 1
+
+def test_failed_reminder_read_keeps_due_doses(engine, monkeypatch):
+    add_reminder(times=("8:00 AM",), days=1)
+    clock = [START]
+    fired = []
+
+    class Notifier:
+        def notify(self, reminder, fire_at):
+            fired.append(fire_at)
+
+    def locked(reminder_ids):
+        raise sqlite3.OperationalError("database is locked")
+
+    scheduler = ReminderScheduler(notifier=Notifier(), clock=lambda: clock[0])
+    scheduler.load()
+    clock[0] = START.replace(hour=8)
+    with monkeypatch.context() as patch:
+        patch.setattr(reminder_scheduler, "get_reminders", locked)
+        with pytest.raises(sqlite3.OperationalError):
+            scheduler.run_pending()
+
+    scheduler.run_pending()
+    assert fired == [START.replace(hour=8)]
+
+def test_scheduler_thread_survives_firing_errors(engine, monkeypatch):
+    add_reminder(times=("8:00 AM",), days=1)
+    fired = threading.Event()
+    failures = []
+
+    class Notifier:
+        def notify(self, reminder, fire_at):
+            fired.set()
+
+    def flaky(reminder_ids):
+        if not failures:
+            failures.append(reminder_ids)
+            raise sqlite3.OperationalError("database is locked")
+        return local_db.get_reminders(reminder_ids)
+
+    monkeypatch.setattr(reminder_scheduler, "RETRY_SECONDS", 0.01)
+    monkeypatch.setattr(reminder_scheduler, "get_reminders", flaky)
+    scheduler = ReminderScheduler(notifier=Notifier(), clock=lambda: START.replace(hour=8))
+    scheduler.start()
+    try:
+        assert fired.wait(2)
+    finally:
+        scheduler.stop()
+    assert failures
@@ -0,0 +1,69 @@
+import threading
+
+from src.storage import local_db
+
+def test_counts_are_built_for_documents_stored_before_counting(engine):
+    for i in range(3):
+        engine.insert("reminders", {'id': f"rem_old{i}", 'medicine': 'Paracetamol', 'active': True,
+                                    'created_at': '2026-01-01T08:00:00'})
+    engine.insert("reminders", {'id': "rem_done", 'medicine': 'Cetirizine', 'active': False,
+                                'created_at': '2026-01-01T08:00:00'})
+
+    assert local_db.get_dashboard_stats()['active_reminders'] == 3
+
+def test_deactivating_a_reminder_stored_before_counting(engine):
+    engine.insert("reminders", {'id': "rem_old", 'medicine': 'Paracetamol', 'active': True,
+                                'created_at': '2026-01-01T08:00:00'})
+
+    local_db.deactivate_reminder("rem_old")
+    local_db.deactivate_reminder("rem_old")  # already inactive: no change
+
+    stats = local_db.get_collection_stats("reminders")
+    assert stats['total'] == 1
+    assert stats['by_status'].get('1', 0) == 0 and stats['by_status']['0'] == 1
+
+def test_counts_from_an_older_version_are_rebuilt(engine):
+    local_db.add_reminder({'medicine': 'Paracetamol', 'times': ["8:00 AM"], 'duration_days': 3})
+    engine.modify("collection_stats", "reminders",
+                  lambda stats: {'id': 'reminders', 'total': 1, 'by_status': {'True': 1}})
+
+    assert local_db.get_dashboard_stats()['active_reminders'] == 1
+    local_db.add_reminder({'medicine': 'Cetirizine', 'times': ["9:00 PM"], 'duration_days': 3})
+    assert local_db.get_collection_stats("reminders")['by_status'] == {'1': 2}
+
+def test_concurrent_orders_are_all_counted(engine):
+    threads = [threading.Thread(target=local_db.add_order, args=({'medicine': 'Paracetamol'},))
+               for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = local_db.get_dashboard_stats()
+    assert (stats['orders'], stats['pending_orders']) == (10, 10)
+
+def test_status_changes_move_orders_between_counts(engine):
+    orders = [local_db.add_order({'medicine': 'Paracetamol'}) for _ in range(3)]
+    local_db.update_order_status(orders[0]['id'], 'delivered')
+    local_db.update_order_status("ord_missing", 'delivered')
+
+    stats = local_db.get_collection_stats("orders")
+    assert stats['total'] == 3
+    assert stats['by_status'] == {'pending': 2, 'delivered': 1}
+
+def test_records_by_severity(engine):
+    for severity in ('mild', 'mild', 'severe', None):
+        local_db.add_health_record({'symptoms': 'headache', 'severity': severity})
+
+    stats = local_db.get_dashboard_stats()
+    assert stats['health_records'] == 4
+    assert stats['records_by_severity'] == {'mild': 2, 'severe': 1}
+
+def test_count_by_status(engine):
+    for i, status in enumerate(['pending', 'pending', 'delivered']):
+        engine.insert("orders", {'id': f"ord_{i}", 'status': status, 'order_date': '2026-03-01T10:00:00'})
+    engine.insert("reminders", {'id': "rem_1", 'created_at': '2026-03-01T08:00:00'})
+
+    assert engine.count_by_status("orders") == {'pending': 2, 'delivered': 1}
+    # Missing status falls back to the collection's default; SQLite hands booleans back as 1/0
+    assert engine.count_by_status("reminders") == {True: 1}
@@ -0,0 +1,57 @@
+import pytest
+
+from src.mcp import drug_schedule
+from src.storage import local_db
+from src.mcp.drug_schedule import DrugScheduleIndex, get_drug_schedule_index, load_drug_schedules
+
+@pytest.fixture(scope="module")
+def index():
+    return get_drug_schedule_index()
+
+@pytest.mark.parametrize("name, schedule", [
+    ("Paracetamol and Azithromycin", "H1"),
+    ("Crocin + Azithral", "H1"),
+    ("azithromicin and dolo", "H1"),
+    ("Dolo 650 with Amoxicillin", "H"),
+    ("prednisolone", "H"),
+    ("Augmentin", "H1"),
+    ("Augmentin 625", "H1"),
+    ("Amoxicillin + Clavulanic Acid", "H1"),
+    ("Azithral 500 for throat infection", "H1"),
+])
+def test_most_restrictive_schedule_wins(index, name, schedule):
+    result = index.check(name)
+
+    assert result["schedule"] == schedule
+    assert result["prescription_required"] is True
+
+@pytest.mark.parametrize("name", ["Dolo 650", "paracetmol", "Crocin Advance", "Cetirizine 10mg tablet"])
+def test_otc_medicines_need_no_prescription(index, name):
+    assert index.check(name)["prescription_required"] is False
+
+def test_unknown_names_are_not_matched(index):
+    assert index.lookup("xyzzy") is None
+
+def test_validate_cart_flags_rx_items():
+    index = DrugScheduleIndex(load_drug_schedules())
+
+    cart = index.validate_cart(["Dolo 650", "Crocin + Azithral", "Dolo 650"])
+
+    assert cart["prescription_required"] is True
+    assert cart["prescription_items"] == ["Crocin + Azithral"]
+    assert len(cart["items"]) == 3
+
+def test_schedules_load_from_any_working_directory(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    assert DrugScheduleIndex(load_drug_schedules()).check("Amoxicillin")["prescription_required"] is True
+
+def test_unreadable_schedules_raise_and_are_not_cached(tmp_path, monkeypatch):
+    local_db.invalidate_medicine_database()
+    missing = str(tmp_path / "missing.json")
+    monkeypatch.setattr(drug_schedule, "load_drug_schedules", lambda: load_drug_schedules(missing))
+
+    with pytest.raises(OSError):
+        get_drug_schedule_index()
+    monkeypatch.setattr(drug_schedule, "load_drug_schedules", load_drug_schedules)
+    assert get_drug_schedule_index().check("Amoxicillin")["prescription_required"] is True
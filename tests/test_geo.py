@@ -0,0 +1,23 @@
+import random
+
+from src.mcp.geo import GridIndex, haversine_km
+
+def test_within_matches_a_full_scan_for_any_radius():
+    rng = random.Random(7)
+    points = {str(i): (8 + rng.random() * 28, 68 + rng.random() * 29) for i in range(500)}
+    index = GridIndex()
+    for key, (lat, lon) in points.items():
+        index.add(key, lat, lon)
+
+    for radius_km in (5, 50, 500, 3000):
+        found = dict(index.within(12.97, 77.59, radius_km))
+        expected = {key for key, (lat, lon) in points.items() if haversine_km(12.97, 77.59, lat, lon) <= radius_km}
+        assert set(found) == expected
+
+def test_removed_points_are_not_returned():
+    index = GridIndex()
+    index.add("a", 12.97, 77.59)
+    index.add("b", 12.98, 77.60)
+    index.remove("a", 12.97, 77.59)
+
+    assert [key for key, _ in index.within(12.97, 77.59, 3000)] == ["b"]
@@ -0,0 +1,82 @@
+import threading
+
+import pytest
+
+from src.mcp import pharmacy_server
+from src.mcp.pharmacy_server import PharmacyMCPServer
+from src.storage import local_db
+
+def order(i, status='pending', day=1):
+    return {'id': f"ord_{i}", 'medicine': 'Paracetamol', 'status': status, 'order_date': f"2026-03-{day:02d}T10:00:00"}
+
+def run_concurrently(target, args_list):
+    threads = [threading.Thread(target=target, args=args) for args in args_list]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+def test_insert_unique_has_one_winner(engine):
+    stored = []
+    run_concurrently(lambda i: stored.append(engine.insert_unique("orders", dict(order(0), medicine=f"m{i}"))),
+                     [(i,) for i in range(8)])
+
+    assert engine.count("orders") == 1
+    assert {d['medicine'] for d in stored} == {engine.get("orders", "ord_0")['medicine']}
+
+def test_insert_unique_replaces_only_documents_before_the_cutoff(engine):
+    engine.insert("orders", order(0, day=1))
+
+    kept = engine.insert_unique("orders", order(0, 'delivered', day=5), replace_before="2026-03-01")
+    assert kept['status'] == 'pending'
+    replaced = engine.insert_unique("orders", order(0, 'delivered', day=5), replace_before="2026-03-02")
+    assert replaced['status'] == 'delivered'
+    assert engine.count("orders") == 1
+
+def test_purge_removes_documents_before_cutoff(engine):
+    for day in (1, 2, 3):
+        engine.insert("orders", order(day, day=day))
+
+    assert engine.purge("orders", "2026-03-03") == 2
+    assert [d['id'] for d in engine.find("orders")] == ["ord_3"]
+
+def test_idempotency_key_is_claimed_once(engine):
+    claimed = []
+    run_concurrently(lambda i: claimed.append(local_db.claim_idempotency_key("test", "key", {'n': i})),
+                     [(i,) for i in range(8)])
+
+    assert len({c['n'] for c in claimed}) == 1
+
+def test_expired_idempotency_key_can_be_claimed_again(engine):
+    local_db.claim_idempotency_key("test", "key", {'n': 1}, ttl_seconds=-1)
+
+    assert local_db.claim_idempotency_key("test", "key", {'n': 2}) == {'n': 2}
+    assert local_db.claim_idempotency_key("test", "key", {'n': 3}) == {'n': 2}
+
+def test_retried_order_returns_the_original(engine):
+    first = local_db.add_order({'medicine': 'Paracetamol'}, idempotency_key="submit-1")
+    retried = local_db.add_order({'medicine': 'Paracetamol'}, idempotency_key="submit-1")
+    other = local_db.add_order({'medicine': 'Paracetamol'}, idempotency_key="submit-2")
+
+    assert retried['id'] == first['id'] != other['id']
+    assert len(local_db.get_orders()) == 2
+
+def test_failed_order_placement_does_not_keep_the_key(engine, monkeypatch):
+    pharmacy = PharmacyMCPServer()
+    pharmacy_id = next(iter(pharmacy.pharmacy_index))
+
+    def failing_operation(tracking):
+        def apply(current):
+            raise OSError("disk full")
+        return ("order_tracking", tracking['order_id'], apply)
+
+    with monkeypatch.context() as patch:
+        patch.setattr(pharmacy_server, "add_order_tracking_operation", failing_operation)
+        with pytest.raises(OSError):
+            pharmacy.place_order("Paracetamol", pharmacy_id, idempotency_key="submit-1")
+
+    order = pharmacy.place_order("Paracetamol", pharmacy_id, idempotency_key="submit-1")
+    retried = pharmacy.place_order("Paracetamol", pharmacy_id, idempotency_key="submit-1")
+
+    assert retried["order_id"] == order["order_id"]
+    assert pharmacy.track_order(order["order_id"])["status"] == "Order Confirmed"
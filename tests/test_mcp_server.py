@@ -0,0 +1,60 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+
+from src.mcp.server import INTERNAL_ERROR, MCPDispatcher
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+
+class FakePharmacy:
+    def __getattr__(self, name):
+        return lambda **arguments: {"tool": name, "arguments": arguments}
+
+    def track_order(self, order_id):
+        raise TypeError("bug inside the tool")
+
+def call(dispatcher, name, arguments):
+    return asyncio.run(dispatcher.handle({
+        "jsonrpc": "2.0", "id": 1, "method": "tools/call", "params": {"name": name, "arguments": arguments}
+    }))
+
+def test_arguments_are_checked_against_the_tool_schema():
+    dispatcher = MCPDispatcher(FakePharmacy())
+
+    for arguments in ({}, {"medicine_name": 5}, {"medicine_name": "Dolo", "dose": 2}):
+        result = call(dispatcher, "check_prescription_required", arguments)["result"]
+        assert result["isError"] is True
+        assert result["content"][0]["text"].startswith("Invalid arguments")
+
+    result = call(dispatcher, "place_order", {"medicine": "Dolo", "pharmacy_id": "ph_001", "quantity": 0})["result"]
+    assert result["isError"] is True
+    result = call(dispatcher, "validate_cart", {"medicines": ["Dolo", 3]})["result"]
+    assert result["isError"] is True
+    result = call(dispatcher, "search_nearby", {"lat": 12.9, "lon": 77.6, "radius_km": 5, "medicine": "Dolo"})["result"]
+    assert result["isError"] is False
+
+def test_errors_inside_a_tool_are_internal_errors():
+    response = call(MCPDispatcher(FakePharmacy()), "track_order", {"order_id": "ORD1"})
+
+    assert response["error"]["code"] == INTERNAL_ERROR
+
+def test_stdio_keeps_diagnostics_off_stdout(tmp_path):
+    script = (
+        "import sys\n"
+        "from src.mcp import server\n"
+        "server.pharmacy_mcp.check_prescription_required = "
+        "lambda medicine_name: print('diagnostic') or {'ok': True}\n"
+        "sys.argv = ['server', '--transport', 'stdio']\n"
+        "server.main()\n"
+    )
+    request = {"jsonrpc": "2.0", "id": 1, "method": "tools/call",
+               "params": {"name": "check_prescription_required", "arguments": {"medicine_name": "Dolo"}}}
+    env = dict(os.environ, PYTHONPATH=os.path.abspath(ROOT))
+    done = subprocess.run([sys.executable, "-c", script], input=json.dumps(request) + "\n", cwd=tmp_path,
+                          env=env, capture_output=True, text=True, timeout=30)
+
+    lines = done.stdout.splitlines()
+    assert [json.loads(line)["id"] for line in lines] == [1]
+    assert "diagnostic" in done.stderr
@@ -0,0 +1,23 @@
+from src.ai.medicine_recommender import MedicineRecommender
+from src.ai.symptom_analyzer import get_medicine_recommendations
+from src.storage.local_db import get_medicine_database
+
+def test_recommendations_stay_in_the_requested_category():
+    catalogue = get_medicine_database()
+    fever_names = {med["name"] for med in catalogue["pain_fever"]}
+
+    medicines = get_medicine_recommendations("pain_fever", "fever and headache and cough", 30)
+
+    assert medicines
+    assert {med["name"] for med in medicines} <= fever_names
+
+def test_only_category_ranks_within_category():
+    recommender = MedicineRecommender(get_medicine_database())
+
+    wide = recommender.recommend("fever and headache and cough", 30, category="pain_fever")
+    narrow = recommender.recommend("fever and headache and cough", 30, category="pain_fever", only_category=True)
+
+    assert {r["category"] for r in narrow} == {"pain_fever"}
+    assert [r["medicine"]["name"] for r in narrow] == [
+        r["medicine"]["name"] for r in wide if r["category"] == "pain_fever"
+    ]
@@ -0,0 +1,40 @@
+from datetime import datetime, timedelta
+
+from src.mcp.order_lifecycle import OrderLifecycle
+from src.storage import local_db
+
+START = datetime(2026, 3, 2, 10, 0)
+
+def test_stale_catch_up_never_moves_an_order_back(engine):
+    clock = [START]
+    lifecycle = OrderLifecycle(speed=1, clock=lambda: clock[0])
+    lifecycle.create("ORD1", "ph_001", eta_minutes=100)
+    stale = local_db.get_order_tracking("ORD1")
+
+    clock[0] = START + timedelta(minutes=60)
+    assert lifecycle.tick() == 1
+    assert local_db.get_order_tracking("ORD1")["status"] == "out_for_delivery"
+
+    # A reader that loaded the record at 30 minutes finishes after the ticker
+    result = lifecycle._catch_up(stale, START + timedelta(minutes=30))
+
+    assert result["status"] == "out_for_delivery"
+    assert local_db.get_order_tracking("ORD1")["status"] == "out_for_delivery"
+
+def test_delivery_marks_the_local_order_delivered_once(engine, monkeypatch):
+    clock = [START]
+    lifecycle = OrderLifecycle(speed=1, clock=lambda: clock[0])
+    lifecycle.create("ORD1", "ph_001", eta_minutes=100)
+    order = local_db.add_order({'medicine': 'Paracetamol', 'order_id': "ORD1"})
+    stale = local_db.get_order_tracking("ORD1")
+    marked = []
+    update_order_status = local_db.update_order_status
+    monkeypatch.setattr(local_db, "update_order_status",
+                        lambda order_id, status: marked.append(order_id) or update_order_status(order_id, status))
+
+    clock[0] = START + timedelta(minutes=120)
+    lifecycle.tick()
+    lifecycle._catch_up(stale, clock[0])
+
+    assert marked == [order['id']]
+    assert local_db.get_order(order['id'])['status'] == 'delivered'
@@ -0,0 +1,181 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.integrations.pharmacy_api import CircuitBreaker, PharmacyAPIClient
+
+class FakeResponse:
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {"price": 120, "in_stock": True, "quantity_available": 12, "discount": 5}
+
+class FakeSession:
+    def __init__(self):
+        self.requests = 0
+
+    def mount(self, prefix, adapter):
+        pass
+
+    def get(self, url, params=None, timeout=None):
+        self.requests += 1
+        return FakeResponse()
+
+    def close(self):
+        pass
+
+def make_client():
+    session = FakeSession()
+    endpoint = {"pharmacy": {"id": "ph1", "name": "Test Pharmacy"}, "base_url": "http://pharmacy.test"}
+    return PharmacyAPIClient([endpoint], session=session), endpoint, session
+
+def test_fetch_offer_returns_a_copy_of_the_cached_offer():
+    client, endpoint, session = make_client()
+    try:
+        first = client.fetch_offer(endpoint, "Paracetamol")
+        first["price"] = 1
+        first["annotated"] = True
+
+        second = client.fetch_offer(endpoint, "paracetamol")
+        second["price"] = 2
+
+        third = client.fetch_offer(endpoint, "Paracetamol")
+    finally:
+        client.close()
+
+    assert session.requests == 1
+    assert third["price"] == 120
+    assert "annotated" not in third
+
+class StubPharmacy:
+    """Local pharmacy endpoint in a thread; `respond(n)` gives (status, body, delay) for the n-th request"""
+
+    def __init__(self, price=120, respond=None):
+        self.requests = 0
+        self.respond = respond or (lambda n: (200, {"price": price, "in_stock": True, "quantity_available": 5}, 0))
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub.requests += 1
+                status, body, delay = stub.respond(stub.requests)
+                time.sleep(delay)
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True)
+        self.thread.start()
+
+    def endpoint(self, pharmacy_id):
+        return {"pharmacy": {"id": pharmacy_id, "name": f"Pharmacy {pharmacy_id}"},
+                "base_url": f"http://127.0.0.1:{self.server.server_port}"}
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+@pytest.fixture
+def stubs():
+    started = []
+
+    def start(*args, **kwargs):
+        stub = StubPharmacy(*args, **kwargs)
+        started.append(stub)
+        return stub
+
+    yield start
+    for stub in started:
+        stub.close()
+
+def failing(status):
+    return lambda n: (status, {"error": "unavailable"}, 0)
+
+def test_search_fans_out_to_every_pharmacy(stubs):
+    slow = lambda price: (lambda n: (200, {"price": price}, 0.3))
+    endpoints = [stubs(respond=slow(price)).endpoint(f"ph{price}") for price in (150, 90, 120)]
+    client = PharmacyAPIClient(endpoints)
+    try:
+        start = time.monotonic()
+        offers = client.search_medicine("Paracetamol")
+        elapsed = time.monotonic() - start
+    finally:
+        client.close()
+
+    assert [offer["price"] for offer in offers] == [90, 120, 150]
+    assert elapsed < 0.8  # concurrent, not 3 x 0.3 s
+
+def test_server_errors_are_retried(stubs):
+    stub = stubs(respond=lambda n: (503, {}, 0) if n <= 2 else (200, {"price": 80}, 0))
+    client = PharmacyAPIClient([stub.endpoint("ph1")], retries=2)
+    try:
+        offer = client.fetch_offer(client.endpoints[0], "Paracetamol")
+    finally:
+        client.close()
+
+    assert offer["price"] == 80
+    assert stub.requests == 3
+
+def test_circuit_breaker_opens_and_half_opens(stubs):
+    healthy = []
+    stub = stubs(respond=lambda n: (200, {"price": 80}, 0) if healthy else (500, {}, 0))
+    client = PharmacyAPIClient([stub.endpoint("ph1")], failure_threshold=2, reset_timeout=0.2)
+    endpoint = client.endpoints[0]
+    breaker = client.breakers["ph1"]
+    try:
+        assert client.fetch_offer(endpoint, "Paracetamol") is None
+        assert client.fetch_offer(endpoint, "Paracetamol") is None
+        assert breaker.state == CircuitBreaker.OPEN
+        assert client.fetch_offer(endpoint, "Paracetamol") is None
+        assert stub.requests == 2  # open: no request made
+
+        time.sleep(0.25)
+        assert client.fetch_offer(endpoint, "Paracetamol") is None  # half-open trial fails
+        assert (breaker.state, stub.requests) == (CircuitBreaker.OPEN, 3)
+
+        time.sleep(0.25)
+        healthy.append(True)
+        assert client.fetch_offer(endpoint, "Paracetamol")["price"] == 80
+        assert breaker.state == CircuitBreaker.CLOSED
+    finally:
+        client.close()
+
+def test_offers_are_cached_until_the_ttl_expires(stubs):
+    stub = stubs(price=100)
+    client = PharmacyAPIClient([stub.endpoint("ph1")], cache_ttl=0.2)
+    endpoint = client.endpoints[0]
+    try:
+        client.fetch_offer(endpoint, "Paracetamol")
+        client.fetch_offer(endpoint, " paracetamol ")
+        assert stub.requests == 1
+        time.sleep(0.25)
+        client.fetch_offer(endpoint, "Paracetamol")
+        assert stub.requests == 2
+    finally:
+        client.close()
+
+def test_stream_search_stops_at_the_deadline(stubs):
+    fast = stubs(price=100)
+    slow = stubs(respond=lambda n: (200, {"price": 50}, 1.0))
+    client = PharmacyAPIClient([slow.endpoint("slow"), fast.endpoint("fast")])
+    try:
+        start = time.monotonic()
+        offers = list(client.stream_search("Paracetamol", deadline=0.3))
+        elapsed = time.monotonic() - start
+    finally:
+        client.close()
+
+    assert [offer["pharmacy"]["id"] for offer in offers] == ["fast"]
+    assert elapsed < 0.8
@@ -0,0 +1,56 @@
+from datetime import date, datetime
+
+from src.storage import local_db
+from src.storage.reminder_schedule import (
+    build_schedule, current_dose, format_minutes, minutes_on, next_occurrence, parse_minutes
+)
+
+def test_parse_and_format_minutes():
+    assert parse_minutes("8:00 AM") == 480
+    assert parse_minutes("12:30 AM") == 30
+    assert parse_minutes("12:00 PM") == 720
+    assert parse_minutes("20:30") == 1230
+    assert parse_minutes("13:00 PM") is None
+    assert format_minutes(1260) == "9:00 PM"
+
+def test_start_day_skips_times_already_past():
+    schedule = build_schedule(["8:00 AM", "2:00 PM", "9:00 PM"], datetime(2026, 3, 2, 10, 15), duration_days=3)
+
+    assert minutes_on(schedule, date(2026, 3, 2)) == [840, 1260]
+    assert minutes_on(schedule, date(2026, 3, 3)) == [480, 840, 1260]
+    assert minutes_on(schedule, date(2026, 3, 5)) == []  # until is exclusive
+
+def test_every_other_week_on_chosen_weekdays():
+    schedule = build_schedule(["8:00 AM"], datetime(2026, 3, 2), freq="weekly", interval=2, weekdays=[0, 3])
+
+    days = [d for d in range(2, 31) if minutes_on(schedule, date(2026, 3, d))]
+
+    assert days == [2, 5, 16, 19, 30]
+
+def test_next_occurrence_and_end_of_schedule():
+    schedule = build_schedule(["8:00 AM", "9:00 PM"], datetime(2026, 3, 2, 7, 0), duration_days=1)
+    morning = int(datetime(2026, 3, 2, 8, 0).timestamp())
+
+    assert next_occurrence(schedule, morning - 1) == morning
+    assert next_occurrence(schedule, morning) == int(datetime(2026, 3, 2, 21, 0).timestamp())
+    assert next_occurrence(schedule, int(datetime(2026, 3, 2, 21, 0).timestamp())) is None
+
+def test_current_dose_ignores_times_before_the_start():
+    schedule = build_schedule(["8:00 AM", "9:00 PM"], datetime(2026, 3, 2, 10, 0))
+
+    assert current_dose(schedule, datetime(2026, 3, 2, 11, 0)) == 1260
+    assert current_dose(schedule, datetime(2026, 3, 3, 11, 0)) == 480
+
+def test_migration_adds_schedules_and_drops_stored_due_times(engine):
+    engine.insert("reminders", {"id": "rem_legacy", "medicine": "A", "times": ["8:00 AM"], "duration_days": 2,
+                                "start_date": "2026-03-02T07:00:00", "created_at": "2026-03-02T07:00:00",
+                                "active": True})
+    engine.insert("reminders", {"id": "rem_stale", "medicine": "B", "times": ["9:00 AM"], "active": True,
+                                "created_at": "2026-03-02T07:00:00", "next_due": 1,
+                                "schedule": build_schedule(["9:00 AM"], datetime(2026, 3, 2, 7, 0))})
+
+    reminders = {r["id"]: r for r in local_db.get_active_reminders()}
+
+    assert reminders["rem_legacy"]["schedule"]["minutes"] == [480]
+    assert "next_due" not in reminders["rem_stale"]
+    assert local_db.migrate_reminders() == 0
@@ -0,0 +1,87 @@
+import threading
+
+import pytest
+
+def order(i, status='pending', day=1):
+    return {'id': f"ord_{i}", 'medicine': 'Paracetamol', 'status': status, 'order_date': f"2026-03-{day:02d}T10:00:00"}
+
+def run_concurrently(target, args_list):
+    threads = [threading.Thread(target=target, args=args) for args in args_list]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+def test_find_filters_by_status_and_timestamp(engine):
+    for i, (status, day) in enumerate([('pending', 3), ('delivered', 1), ('pending', 2)]):
+        engine.insert("orders", order(i, status, day))
+
+    assert [d['id'] for d in engine.find("orders")] == ["ord_0", "ord_1", "ord_2"]
+    assert [d['id'] for d in engine.find("orders", status='pending')] == ["ord_0", "ord_2"]
+    assert [d['id'] for d in engine.find("orders", since="2026-03-02", until="2026-03-03")] == ["ord_2"]
+    assert [d['id'] for d in engine.find("orders", newest_first=True, limit=2)] == ["ord_0", "ord_2"]
+    assert engine.count("orders", status='pending') == 2
+    assert engine.get("orders", "ord_1")['status'] == 'delivered'
+    assert engine.get("orders", "ord_9") is None
+
+def test_update_changes_indexed_fields(engine):
+    engine.insert("orders", order(0))
+
+    assert engine.update("orders", "ord_0", {'status': 'delivered'})['status'] == 'delivered'
+    assert engine.update("orders", "ord_9", {'status': 'delivered'}) is None
+    assert [d['id'] for d in engine.find("orders", status='delivered')] == ["ord_0"]
+    assert engine.count("orders", status='pending') == 0
+
+def test_concurrent_inserts_are_all_kept(engine):
+    run_concurrently(lambda i: engine.insert("orders", order(i)), [(i,) for i in range(10)])
+
+    assert sorted(d['id'] for d in engine.find("orders")) == sorted(f"ord_{i}" for i in range(10))
+
+def test_modify_creates_updates_and_skips(engine):
+    assert engine.modify("orders", "ord_0", lambda doc: None) is None
+    assert engine.modify("orders", "ord_0", lambda doc: order(0))['status'] == 'pending'
+    assert engine.modify("orders", "ord_0", lambda doc: dict(doc, status='delivered'))['status'] == 'delivered'
+    assert engine.modify("orders", "ord_0", lambda doc: None)['status'] == 'delivered'
+    assert engine.count("orders") == 1
+
+def test_concurrent_modifies_lose_no_updates(engine):
+    engine.insert("orders", dict(order(0), quantity=0))
+    increment = lambda doc: dict(doc, quantity=doc['quantity'] + 1)
+    run_concurrently(lambda: engine.modify("orders", "ord_0", increment), [()] * 10)
+
+    assert engine.get("orders", "ord_0")['quantity'] == 10
+
+def test_modify_many_writes_nothing_if_an_apply_raises(engine):
+    engine.insert("orders", order(0))
+
+    def fail(doc):
+        raise ValueError("rejected")
+
+    with pytest.raises(ValueError):
+        engine.modify_many([
+            ("orders", "ord_0", lambda doc: dict(doc, status='delivered')),
+            ("orders", "ord_1", lambda doc: order(1)),
+            ("reminders", "rem_1", fail),
+        ])
+
+    assert engine.get("orders", "ord_0")['status'] == 'pending'
+    assert engine.get("orders", "ord_1") is None
+
+def test_modify_many_sees_earlier_operations(engine):
+    results = engine.modify_many([
+        ("orders", "ord_0", lambda doc: dict(order(0), quantity=1)),
+        ("orders", "ord_0", lambda doc: dict(doc, quantity=doc['quantity'] + 1)),
+        ("reminders", "rem_1", lambda doc: {'id': "rem_1", 'created_at': '2026-03-01T08:00:00'}),
+    ])
+
+    assert [r['id'] for r in results] == ["ord_0", "ord_0", "rem_1"]
+    assert engine.get("orders", "ord_0")['quantity'] == 2
+    assert engine.get("reminders", "rem_1") is not None
+
+def test_get_many_skips_missing_ids(engine):
+    for i in range(3):
+        engine.insert("orders", order(i))
+
+    docs = engine.get_many("orders", ["ord_0", "ord_2", "ord_9", "ord_0"])
+    assert sorted(docs) == ["ord_0", "ord_2"]
+    assert docs["ord_2"]['id'] == "ord_2"
@@ -0,0 +1,92 @@
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+
+from src.ai import symptom_analyzer
+
+MODEL_REPLY = json.dumps({"severity": "mild", "possible_conditions": [], "recommendations": ["Rest"]})
+
+class FakeModel:
+    def __init__(self):
+        self.calls = 0
+
+    def generate_content(self, prompt):
+        self.calls += 1
+        return type("Response", (), {"text": MODEL_REPLY})()
+
+class BrokenCache:
+    def get(self, key):
+        raise sqlite3.OperationalError("database is locked")
+
+    def put(self, key, text):
+        raise sqlite3.OperationalError("database is locked")
+
+def test_cache_failure_falls_through_to_model(monkeypatch):
+    fake = FakeModel()
+    monkeypatch.setattr(symptom_analyzer, "GEMINI_AVAILABLE", True)
+    monkeypatch.setattr(symptom_analyzer, "model", fake, raising=False)
+    monkeypatch.setattr(symptom_analyzer, "get_response_cache", BrokenCache)
+
+    analysis = symptom_analyzer.analyze_symptoms("mild headache since morning")
+
+    assert fake.calls == 1
+    assert analysis["recommendations"] == ["Rest"]
+
+def test_unopenable_cache_falls_through_to_model(monkeypatch):
+    def fail():
+        raise sqlite3.DatabaseError("file is not a database")
+
+    fake = FakeModel()
+    monkeypatch.setattr(symptom_analyzer, "GEMINI_AVAILABLE", True)
+    monkeypatch.setattr(symptom_analyzer, "model", fake, raising=False)
+    monkeypatch.setattr(symptom_analyzer, "get_response_cache", fail)
+
+    analysis = symptom_analyzer.analyze_symptoms("mild headache since morning")
+
+    assert fake.calls == 1
+    assert analysis["recommendations"] == ["Rest"]
+
+def test_async_cache_failure_falls_through_to_model():
+    fake = FakeModel()
+    analysis = asyncio.run(symptom_analyzer.analyze_symptoms_async(
+        "mild headache since morning", ai_model=fake, cache=BrokenCache()
+    ))
+
+    assert fake.calls == 1
+    assert analysis["recommendations"] == ["Rest"]
+
+class SlowModel:
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.lock = threading.Lock()
+        self.in_flight = self.max_in_flight = 0
+
+    def generate_content(self, prompt):
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.seconds)
+        with self.lock:
+            self.in_flight -= 1
+        return type("Response", (), {"text": MODEL_REPLY})()
+
+def test_timed_out_model_calls_keep_their_slot():
+    slow = SlowModel(0.3)
+
+    async def run():
+        semaphore = asyncio.Semaphore(2)
+        for _ in range(3):
+            analyses = await asyncio.gather(*(
+                symptom_analyzer.analyze_symptoms_async(
+                    "mild headache since morning", ai_model=slow, timeout=0.05, semaphore=semaphore
+                )
+                for _ in range(5)
+            ))
+            assert all(a["recommendations"] != ["Rest"] for a in analyses)  # rule-based answers
+        await asyncio.sleep(0.7)
+
+    asyncio.run(run())
+
+    assert slow.max_in_flight == 2
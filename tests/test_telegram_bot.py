@@ -0,0 +1,27 @@
+import asyncio
+
+from src.integrations.telegram_bot import TelegramBot, parse_chat_ids
+
+def update(chat_id, text):
+    return {"update_id": 1, "message": {"message_id": 1, "chat": {"id": chat_id}, "text": text}}
+
+def test_only_allowed_chats_are_answered():
+    async def run():
+        bot = TelegramBot("test", base_url="http://127.0.0.1:9", allowed_chat_ids={42})
+        try:
+            bot.dispatch(update(7, "/reminders"))
+            bot.dispatch(update(42, "/help"))
+            await asyncio.gather(*bot._tasks)
+            return [chat_id for chat_id, _ in bot.outbox.pending]
+        finally:
+            bot.close()
+
+    assert asyncio.run(run()) == [42]
+
+def test_no_chats_are_allowed_by_default(monkeypatch):
+    monkeypatch.setattr("src.integrations.telegram_bot.TELEGRAM_ALLOWED_CHAT_IDS", "")
+    bot = TelegramBot("test", base_url="http://127.0.0.1:9")
+    bot.close()
+
+    assert bot.allowed_chat_ids == set()
+    assert parse_chat_ids(" 123, -100456,") == {123, -100456}
@@ -0,0 +1,48 @@
+import functools
+import io
+import os
+import time
+
+from PIL import Image, PngImagePlugin
+
+from src.integrations import ocr_scanner, uploads
+from src.integrations.ocr_scanner import PrescriptionScanner, StubOCREngine
+
+def prescription_png(text: str) -> bytes:
+    info = PngImagePlugin.PngInfo()
+    info.add_text("prescription", text)
+    buffer = io.BytesIO()
+    Image.new("RGB", (400, 300), "white").save(buffer, "PNG", pnginfo=info)
+    return buffer.getvalue()
+
+def test_scan_reads_pages_and_caches_only_text(tmp_path, monkeypatch):
+    monkeypatch.setattr(ocr_scanner, "save_upload", functools.partial(uploads.save_upload, dest_dir=str(tmp_path)))
+    scanner = PrescriptionScanner(engine=StubOCREngine())
+    upload = prescription_png("Tab Azithral 500 once daily\nDolo 650 SOS")
+
+    first = scanner.scan_one(upload)
+    second = scanner.scan_one(upload)
+
+    assert first["pages"] == 1
+    assert {m["generic"] for m in first["medicines"]} == {"Azithromycin", "Paracetamol"}
+    assert second["cached"] is True and second["text"] == first["text"]
+    assert list(scanner._cache.values()) == [{"page_count": 1, "texts": [first["text"]]}]
+
+def test_scan_reports_unreadable_uploads(tmp_path, monkeypatch):
+    monkeypatch.setattr(ocr_scanner, "save_upload", functools.partial(uploads.save_upload, dest_dir=str(tmp_path)))
+    scanner = PrescriptionScanner(engine=StubOCREngine())
+
+    result = scanner.scan_one(b"not an image")
+
+    assert result["pages"] == 0
+    assert result["error"]
+
+def test_purge_uploads_removes_only_old_files(tmp_path):
+    old = uploads.save_upload(prescription_png("old"), "old.png", dest_dir=str(tmp_path))
+    new = uploads.save_upload(prescription_png("new"), "new.png", dest_dir=str(tmp_path))
+    stale = time.time() - uploads.UPLOAD_RETENTION_SECONDS - 60
+    os.utime(old.path, (stale, stale))
+
+    assert uploads.purge_uploads(str(tmp_path)) == 1
+    assert not os.path.exists(old.path)
+    assert os.path.exists(new.path)